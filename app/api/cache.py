@@ -5,12 +5,104 @@ Marvel cache for storing API responses.
 import os
 
 from dotenv import load_dotenv
+from app.utils.adaptive_ttl import AdaptiveTTL
+from app.utils.bloom_filter import BloomFilter
 from app.utils.cache import Cache
+from app.utils.character_store import CharacterStore
+from app.utils.disk_cache import DiskCache
+from app.utils.shared_cache import SharedCache
+from app.utils.singleflight import SingleFlight
 
 load_dotenv()
 
 CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "1000"))
 CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+CACHE_ADAPTIVE_TTL = os.getenv("CACHE_ADAPTIVE_TTL", "false").lower() == "true"
+CACHE_MIN_TTL = int(os.getenv("CACHE_MIN_TTL", "60"))
+CACHE_MAX_TTL = int(os.getenv("CACHE_MAX_TTL", "86400"))
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "0"))
+CACHE_STALE_IF_ERROR = int(os.getenv("CACHE_STALE_IF_ERROR", "3600"))
+CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", "0"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", "0"))
+CACHE_POLICY = os.getenv("CACHE_POLICY", "lru")
+CACHE_COMPRESS_AFTER = int(os.getenv("CACHE_COMPRESS_AFTER", "0"))
+CACHE_L2_PATH = os.getenv("CACHE_L2_PATH", "")
+CACHE_L2_MAXSIZE = int(os.getenv("CACHE_L2_MAXSIZE", "10000"))
+CACHE_SHARED_PATH = os.getenv("CACHE_SHARED_PATH", "")
+CACHE_SHARED_SLOTS = int(os.getenv("CACHE_SHARED_SLOTS", "16384"))
+CACHE_SHARED_SIZE = int(os.getenv("CACHE_SHARED_SIZE", str(256 * 1024 * 1024)))
+CHARACTER_STORE_SHARED_SIZE = int(
+    os.getenv("CHARACTER_STORE_SHARED_SIZE", str(64 * 1024 * 1024))
+)
+NEGATIVE_CACHE_TTL = int(os.getenv("NEGATIVE_CACHE_TTL", "60"))
+NAME_FILTER_ENABLED = os.getenv("NAME_FILTER_ENABLED", "false").lower() == "true"
+NAME_FILTER_CAPACITY = int(os.getenv("NAME_FILTER_CAPACITY", "10000"))
+NAME_FILTER_ERROR_RATE = float(os.getenv("NAME_FILTER_ERROR_RATE", "0.01"))
+
+
+def make_l2():
+    """
+    Create the second cache tier: shared between worker processes if
+    CACHE_SHARED_PATH is set, else on disk if CACHE_L2_PATH is set.
+    """
+    if CACHE_SHARED_PATH:
+        return SharedCache(
+            CACHE_SHARED_PATH, slots=CACHE_SHARED_SLOTS, data_size=CACHE_SHARED_SIZE
+        )
+    if CACHE_L2_PATH:
+        return DiskCache(CACHE_L2_PATH, maxsize=CACHE_L2_MAXSIZE)
+    return None
+
 
 # Initialize the custom cache
-cache = Cache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+cache = Cache(
+    maxsize=CACHE_MAXSIZE,
+    ttl=CACHE_TTL,
+    stale_ttl=CACHE_STALE_TTL,
+    xfetch_beta=CACHE_XFETCH_BETA,
+    max_bytes=CACHE_MAX_BYTES,
+    policy=CACHE_POLICY,
+    l2=make_l2(),
+    stale_if_error=CACHE_STALE_IF_ERROR,
+    adaptive_ttl=(
+        AdaptiveTTL(ttl=CACHE_TTL, min_ttl=CACHE_MIN_TTL, max_ttl=CACHE_MAX_TTL)
+        if CACHE_ADAPTIVE_TTL
+        else None
+    ),
+    compress_after=CACHE_COMPRESS_AFTER,
+)
+
+# Pages of the character store published by the leader worker for the
+# others, kept apart from the cache entries
+shared_character_store = (
+    SharedCache(
+        f"{CACHE_SHARED_PATH}.characters",
+        slots=1024,
+        data_size=CHARACTER_STORE_SHARED_SIZE,
+    )
+    if CACHE_SHARED_PATH
+    else None
+)
+
+# Registry of in-flight upstream calls, keyed by cache key
+inflight = SingleFlight()
+
+# Local mirror of the character catalog, filled by sync_character_store
+character_store = CharacterStore(
+    name_filter=(
+        BloomFilter(NAME_FILTER_CAPACITY, NAME_FILTER_ERROR_RATE)
+        if NAME_FILTER_ENABLED
+        else None
+    )
+)
+
+
+def response_ttl(response_data: dict):
+    """
+    Get the TTL to cache a Marvel API response with.
+    :return: NEGATIVE_CACHE_TTL for responses without results, otherwise
+        None for the cache's default TTL.
+    """
+    if not response_data.get("data", {}).get("results"):
+        return NEGATIVE_CACHE_TTL
+    return None
@@ -0,0 +1,117 @@
+"""
+Shared upstream HTTP client with connection pool metrics.
+"""
+
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamClient:
+    """
+    Long-lived, pooled httpx client.
+
+    One instance is shared per process so that upstream requests reuse
+    keep-alive connections instead of paying a TCP and TLS handshake per call.
+    """
+
+    def __init__(
+        self,
+        max_connections=20,
+        max_keepalive_connections=10,
+        keepalive_expiry=30.0,
+        http2=False,
+    ):
+        """
+        Initialize the client settings and pool counters.
+        :param max_connections: Maximum number of connections to the upstream host.
+        :param max_keepalive_connections: Maximum number of idle connections kept.
+        :param keepalive_expiry: Seconds an idle connection is kept alive.
+        :param http2: Enable HTTP/2 when the optional ``h2`` package is installed.
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.client = None
+        self.request_count = 0
+        self.new_connection_count = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def open(self) -> httpx.AsyncClient:
+        """
+        Open the underlying client if it is not open yet.
+        """
+        if self.client is None:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # pylint: disable=import-outside-toplevel,unused-import
+                except ImportError:
+                    logger.warning(
+                        "[UpstreamClient] HTTP/2 requested but h2 is not installed."
+                    )
+                    http2 = False
+            self.client = httpx.AsyncClient(limits=self.limits, http2=http2)
+            logger.info("[UpstreamClient] Opened client (http2=%s).", http2)
+        return self.client
+
+    async def close(self):
+        """
+        Close the underlying client and its pooled connections.
+        """
+        if self.client is not None:
+            client, self.client = self.client, None
+            await client.aclose()
+            logger.info("[UpstreamClient] Closed client.")
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a GET request through the shared connection pool.
+        """
+        client = self.open()
+        started = time.perf_counter()
+        trace_state = {"wait_time": None, "new_connection": False}
+
+        async def trace(event_name, _info):
+            # The first started event marks the moment a connection was acquired
+            if trace_state["wait_time"] is None and event_name.endswith(".started"):
+                trace_state["wait_time"] = time.perf_counter() - started
+            if event_name == "connection.connect_tcp.started":
+                trace_state["new_connection"] = True
+
+        try:
+            return await client.get(url, extensions={"trace": trace}, **kwargs)
+        finally:
+            self._record(trace_state)
+
+    def _record(self, trace_state: dict):
+        """
+        Record pool metrics for a finished request.
+        """
+        self.request_count += 1
+        if trace_state["new_connection"]:
+            self.new_connection_count += 1
+        wait_time = trace_state["wait_time"] or 0.0
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def stats(self):
+        """
+        Get connection pool statistics.
+        :return: Dictionary containing request, connection reuse and wait time stats.
+        """
+        reused = self.request_count - self.new_connection_count
+        return {
+            "requests": self.request_count,
+            "new_connections": self.new_connection_count,
+            "reuse_ratio": reused / max(1, self.request_count),
+            "avg_wait_ms": self.total_wait_time * 1000 / max(1, self.request_count),
+            "max_wait_ms": self.max_wait_time * 1000,
+        }
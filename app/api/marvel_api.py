@@ -8,6 +8,10 @@ import time
 import os
 import httpx
 from dotenv import load_dotenv
+from app.api.http_client import UpstreamClient
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.deadlines import DeadlineTracker
+from app.utils.hedging import HedgeBudget, hedged
 
 load_dotenv()
 
@@ -15,6 +19,47 @@ MARVEL_API_BASE_URL = "https://gateway.marvel.com/v1/public/characters"
 MARVEL_API_PUBLIC_KEY = os.getenv("MARVEL_API_PUBLIC_KEY")
 MARVEL_API_PRIVATE_KEY = os.getenv("MARVEL_API_PRIVATE_KEY")
 MARVEL_API_TIMEOUT = float(os.getenv("MARVEL_API_TIMEOUT", "10"))
+MARVEL_API_MAX_CONNECTIONS = int(os.getenv("MARVEL_API_MAX_CONNECTIONS", "20"))
+MARVEL_API_MAX_KEEPALIVE = int(os.getenv("MARVEL_API_MAX_KEEPALIVE", "10"))
+MARVEL_API_KEEPALIVE_EXPIRY = float(os.getenv("MARVEL_API_KEEPALIVE_EXPIRY", "30"))
+MARVEL_API_HTTP2 = os.getenv("MARVEL_API_HTTP2", "false").lower() == "true"
+MARVEL_API_BREAKER_WINDOW = int(os.getenv("MARVEL_API_BREAKER_WINDOW", "50"))
+MARVEL_API_BREAKER_MIN_CALLS = int(os.getenv("MARVEL_API_BREAKER_MIN_CALLS", "10"))
+MARVEL_API_BREAKER_FAILURE_RATE = float(
+    os.getenv("MARVEL_API_BREAKER_FAILURE_RATE", "0.5")
+)
+MARVEL_API_BREAKER_SLOW_CALL = float(os.getenv("MARVEL_API_BREAKER_SLOW_CALL", "5"))
+MARVEL_API_BREAKER_OPEN_SECONDS = float(
+    os.getenv("MARVEL_API_BREAKER_OPEN_SECONDS", "30")
+)
+MARVEL_API_HEDGE_ENABLED = (
+    os.getenv("MARVEL_API_HEDGE_ENABLED", "false").lower() == "true"
+)
+MARVEL_API_HEDGE_BUDGET = float(os.getenv("MARVEL_API_HEDGE_BUDGET", "0.1"))
+
+# Shared connection pool; every request goes to the same host, so the
+# connection limit is also the per-host limit.
+upstream_client = UpstreamClient(
+    max_connections=MARVEL_API_MAX_CONNECTIONS,
+    max_keepalive_connections=MARVEL_API_MAX_KEEPALIVE,
+    keepalive_expiry=MARVEL_API_KEEPALIVE_EXPIRY,
+    http2=MARVEL_API_HTTP2,
+)
+
+# Fails calls fast while the upstream is erroring or slow
+upstream_breaker = CircuitBreaker(
+    window=MARVEL_API_BREAKER_WINDOW,
+    min_calls=MARVEL_API_BREAKER_MIN_CALLS,
+    failure_rate=MARVEL_API_BREAKER_FAILURE_RATE,
+    slow_call_seconds=MARVEL_API_BREAKER_SLOW_CALL,
+    open_seconds=MARVEL_API_BREAKER_OPEN_SECONDS,
+)
+
+# Caps hedged requests to a share of all upstream requests
+hedge_budget = HedgeBudget(ratio=MARVEL_API_HEDGE_BUDGET)
+
+# Counts RPCs that gave up waiting on upstream calls
+upstream_deadlines = DeadlineTracker()
 
 
 def generate_hash(ts: str, private_key: str, public_key: str) -> str:
@@ -40,6 +85,9 @@ async def get_marvel_characters(
 ):
     """
     Asynchronously fetch Marvel characters from the API.
+    Raises CircuitOpenError without calling the API while the circuit is
+    open. With hedging enabled, a call slower than the observed p95 latency
+    is raced against a second one.
     """
     ts = str(int(time.time()))
     hash_value = generate_hash(ts, MARVEL_API_PRIVATE_KEY, MARVEL_API_PUBLIC_KEY)
@@ -71,19 +119,32 @@ async def get_marvel_characters(
     if order_by:
         params["orderBy"] = order_by
 
+    async def send():
+        return await upstream_client.get(
+            MARVEL_API_BASE_URL,
+            params=params,
+            headers=headers or {},
+            timeout=MARVEL_API_TIMEOUT,
+        )
+
+    upstream_breaker.allow()
+    hedge_delay = (
+        upstream_breaker.latency_percentile(0.95) if MARVEL_API_HEDGE_ENABLED else None
+    )
+    started = time.monotonic()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                MARVEL_API_BASE_URL,
-                params=params,
-                headers=headers or {},
-                timeout=MARVEL_API_TIMEOUT,
-            )
-            response.raise_for_status()
-            return response
+        response = await hedged(send, hedge_delay, hedge_budget)
+        response.raise_for_status()
+        upstream_breaker.record(True, time.monotonic() - started)
+        return response
     except httpx.HTTPStatusError as e:
+        # Client errors say nothing about the upstream's health
+        upstream_breaker.record(
+            e.response.status_code < 500, time.monotonic() - started
+        )
         if e.response.status_code == 304:
             return e.response  # Return the 304 response for Etag handling
         raise
     except Exception as e:
+        upstream_breaker.record(False, time.monotonic() - started)
         raise RuntimeError(f"Error fetching Marvel characters: {e}") from e
@@ -0,0 +1,19 @@
+"""
+Admission control for the upstream calls made by the gRPC service.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+from app.utils.admission import AdmissionController
+
+load_dotenv()
+
+ADMISSION_MAX_UPSTREAM = int(os.getenv("ADMISSION_MAX_UPSTREAM", "20"))
+ADMISSION_LATENCY_TARGET = float(os.getenv("ADMISSION_LATENCY_TARGET", "1.0"))
+
+# Queue for upstream calls; cache hits never reach it
+admission_controller = AdmissionController(
+    max_concurrent=ADMISSION_MAX_UPSTREAM, latency_target=ADMISSION_LATENCY_TARGET
+)
@@ -2,162 +2,600 @@
 Marvel service for fetching Marvel characters.
 """
 
+import asyncio
 import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+
 import grpc
+import httpx
+from dotenv import load_dotenv
 
-from app.api.marvel_api import get_marvel_characters
+from app.api.marvel_api import get_marvel_characters, upstream_deadlines
 from app.grpc_services.proto import marvel_pb2
 from app.grpc_services.proto import marvel_pb2_grpc
-from app.api.cache import cache
-from app.utils.cache import generate_cache_key
+from app.grpc_services.transcoder import transcoder_for
+from app.api.cache import (
+    CACHE_MAXSIZE,
+    cache,
+    character_store,
+    inflight,
+    response_ttl,
+)
+from app.utils.admission import AdmissionController, AdmissionRejected
+from app.utils.cache import canonical_params, generate_cache_key
+from app.utils.character_store import empty_response
+from app.utils.page_index import PageIndex
+
+load_dotenv()
+
+CACHE_SERIALIZED_RESPONSES = (
+    os.getenv("CACHE_SERIALIZED_RESPONSES", "true").lower() == "true"
+)
+STREAM_PAGE_SIZE = int(os.getenv("STREAM_PAGE_SIZE", "100"))
+STREAM_CONCURRENCY = int(os.getenv("STREAM_CONCURRENCY", "4"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# Fields a CharacterRequest field mask can select
+CHARACTER_FIELDS = frozenset(marvel_pb2.Character.DESCRIPTOR.fields_by_name)
 
 logger = logging.getLogger(__name__)
 
 
+def serialize_response(response) -> bytes:
+    """
+    Serialize a response message, passing pre-serialized bytes through as-is.
+    """
+    if isinstance(response, bytes):
+        return response
+    return response.SerializeToString()
+
+
+def add_marvel_service_to_server(servicer, server):
+    """
+    Register the Marvel service on a gRPC server.
+    Unlike the generated helper, handlers may return pre-serialized bytes.
+    """
+    rpc_method_handlers = {
+        "GetCharacters": grpc.unary_unary_rpc_method_handler(
+            servicer.GetCharacters,
+            request_deserializer=marvel_pb2.CharacterRequest.FromString,
+            response_serializer=serialize_response,
+        ),
+        "StreamCharacters": grpc.unary_stream_rpc_method_handler(
+            servicer.StreamCharacters,
+            request_deserializer=marvel_pb2.CharacterRequest.FromString,
+            response_serializer=marvel_pb2.Character.SerializeToString,
+        ),
+        "BatchGetCharacters": grpc.unary_unary_rpc_method_handler(
+            servicer.BatchGetCharacters,
+            request_deserializer=marvel_pb2.BatchCharacterRequest.FromString,
+            response_serializer=marvel_pb2.BatchCharacterResponse.SerializeToString,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        "MarvelService", rpc_method_handlers
+    )
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers("MarvelService", rpc_method_handlers)
+
+
 class MarvelService(marvel_pb2_grpc.MarvelServiceServicer):
     """
     Marvel service for fetching Marvel characters.
     """
 
+    def __init__(
+        self,
+        serialized_responses: bool = CACHE_SERIALIZED_RESPONSES,
+        stream_concurrency: int = STREAM_CONCURRENCY,
+        batch_concurrency: int = BATCH_CONCURRENCY,
+        admission: AdmissionController = None,
+    ):
+        """
+        Initialize the service.
+        :param serialized_responses: Serve cache hits as pre-serialized bytes.
+        :param stream_concurrency: Maximum upstream pages fetched at once per stream.
+        :param batch_concurrency: Maximum upstream queries fetched at once per batch.
+        :param admission: Admission controller each upstream call must pass,
+            or None to call the upstream right away.
+        """
+        self.serialized_responses = serialized_responses
+        self.stream_concurrency = stream_concurrency
+        self.batch_concurrency = batch_concurrency
+        self.serialized = OrderedDict()
+        self.page_index = PageIndex()
+        self.admission = admission
+
     async def GetCharacters(
         self, request: marvel_pb2.CharacterRequest, context: grpc.ServicerContext
     ) -> marvel_pb2.CharacterResponse:
         """
         Fetch Marvel characters based on the gRPC request parameters.
-        Uses caching to avoid redundant API calls.
-        """
-        query_params = {
-            "name": request.name,
-            "name_starts_with": request.name_starts_with,
-            "modified_since": request.modified_since,
-            "comics": list(request.comics),
-            "series": list(request.series),
-            "events": list(request.events),
-            "stories": list(request.stories),
-            "order_by": request.order_by,
-            "limit": request.limit,
-            "offset": request.offset,
-        }
+        Uses caching to avoid redundant API calls. If the response's ETag
+        matches the request's if_none_match, a Not Modified response without
+        characters is returned instead. Characters only carry the fields in
+        the request's field mask, if any. The RPC stops waiting on a miss
+        when its deadline passes or it is cancelled; the upstream call is
+        only abandoned once no other RPC is waiting on it.
+        """
+        try:
+            fields = self._character_fields(request)
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return marvel_pb2.CharacterResponse()
 
+        query_params = self._query_params(request)
         cache_key = generate_cache_key(query_params)
-        cached_etag = cache.get_etag(cache_key)
-        headers = {"If-None-Match": cached_etag} if cached_etag else {}
 
         cached_response = cache.get(cache_key)
         if cached_response:
-            return self._build_response_from_cache(cached_response)
-
-        try:
-            response = await get_marvel_characters(headers=headers, **query_params)
-
-            if response.status_code == 304:  # Not Modified
-                cached_data = cache.get(cache_key)
-                return self._build_response_from_cache(cached_data)
+            if self._is_not_modified(request, cached_response):
+                return self._build_not_modified(cached_response)
+            serialized = self._get_serialized(cache_key, cached_response, fields)
+            if serialized is not None:
+                return serialized
+            response = self._build_response_from_cache(cached_response, fields)
+            self._set_serialized(cache_key, cached_response, response, fields)
+            return response
 
-            response_data = response.json()
+        local_response = self._get_local(query_params)
+        if local_response:
+            if self._is_not_modified(request, local_response):
+                return self._build_not_modified(local_response)
+            return self._build_response_from_cache(local_response, fields)
 
-            new_etag = response.headers.get("Etag")
-            cache.set(cache_key, response_data, etag=new_etag)
+        # Only this RPC's wait is bounded by its deadline; the shared call
+        # keeps the full upstream timeout for callers with more time left
+        deadline = asyncio.timeout(context.time_remaining())
+        try:
+            async with deadline:
+                response_data = await inflight.do(
+                    cache_key, self._fetch_characters, cache_key, query_params
+                )
+            if self._is_not_modified(request, response_data):
+                return self._build_not_modified(response_data)
+            response = self._build_response_from_api(response_data, fields)
+            self._set_serialized(cache_key, response_data, response, fields)
+            return response
 
-            return self._build_response_from_api(response_data)
+        except asyncio.CancelledError:
+            upstream_deadlines.record_cancelled()
+            raise
 
         except TimeoutError as e:
+            if deadline.expired():
+                upstream_deadlines.record_exceeded()
+                context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+                context.set_details("Deadline exceeded fetching characters.")
+                return marvel_pb2.CharacterResponse()
             logger.error("[MarvelService] TimeoutError fetching characters: %s", e)
             context.set_code(context.Code.INTERNAL)
             context.set_details("Failed to fetch characters.")
             return marvel_pb2.CharacterResponse()
 
+        except AdmissionRejected as e:
+            self._reject(context, e)
+            return marvel_pb2.CharacterResponse()
+
         except Exception as e:
             logger.error("[MarvelService] Error fetching characters: %s", e)
             context.set_code(context.Code.INTERNAL)
             context.set_details("Failed to fetch characters.")
             return marvel_pb2.CharacterResponse()
 
-    def _build_response_from_api(self, api_response: dict):
+    async def StreamCharacters(
+        self, request: marvel_pb2.CharacterRequest, context: grpc.ServicerContext
+    ):
         """
-        Convert the Marvel API response into a gRPC response format.
+        Stream every character matching the request from its offset on.
+        The first page's total is used to fetch the remaining pages
+        concurrently; characters are streamed as their page arrives. Each
+        upstream page fetch is admitted on its own, so a slow reader holds
+        no upstream slot.
+        """
+        try:
+            fields = self._character_fields(request)
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return
+
+        page_size = request.limit or STREAM_PAGE_SIZE
+        first_page = {
+            **self._query_params(request),
+            "limit": page_size,
+            "offset": request.offset,
+        }
+
+        try:
+            response_data = await self._get_page(first_page)
+        except AdmissionRejected as e:
+            self._reject(context, e)
+            return
+        except Exception as e:
+            logger.error("[MarvelService] Error streaming characters: %s", e)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details("Failed to fetch characters.")
+            return
+
+        for result in response_data.get("data", {}).get("results", []):
+            yield self._build_character(result, fields)
+
+        total = response_data.get("data", {}).get("total", 0)
+        offsets = iter(range(request.offset + page_size, total, page_size))
+        pending = set()
+        try:
+            while True:
+                # Only keep a few pages outstanding, so a slow reader holds
+                # back upstream fetches instead of buffering every page
+                while len(pending) < self.stream_concurrency:
+                    offset = next(offsets, None)
+                    if offset is None:
+                        break
+                    page_params = {**first_page, "offset": offset}
+                    pending.add(asyncio.ensure_future(self._get_page(page_params)))
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    page = task.result()
+                    for result in page.get("data", {}).get("results", []):
+                        yield self._build_character(result, fields)
+
+        except AdmissionRejected as e:
+            self._reject(context, e)
+
+        except Exception as e:
+            logger.error("[MarvelService] Error streaming characters: %s", e)
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details("Failed to fetch characters.")
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def BatchGetCharacters(
+        self, request: marvel_pb2.BatchCharacterRequest, context: grpc.ServicerContext
+    ) -> marvel_pb2.BatchCharacterResponse:
+        """
+        Answer several character queries in one call.
+        Identical queries are deduplicated by cache key, cache hits are
+        answered immediately and misses are fetched concurrently. Each query
+        gets its own status, so one failure or rejected upstream call does
+        not fail the batch.
         """
+        if len(request.requests) > BATCH_MAX_SIZE:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"At most {BATCH_MAX_SIZE} requests per batch.")
+            return marvel_pb2.BatchCharacterResponse()
 
-        def _build_resource_list(api_resource, resource_type):
-            items = []
-            if resource_type == "comics":
-                items = [
-                    marvel_pb2.ComicSummary(
-                        resourceURI=item["resourceURI"], name=item["name"]
-                    )
-                    for item in api_resource.get("items", [])
-                ]
-            elif resource_type == "stories":
-                items = [
-                    marvel_pb2.StorySummary(
-                        resourceURI=item["resourceURI"],
-                        name=item["name"],
-                        type=item.get("type", ""),
-                    )
-                    for item in api_resource.get("items", [])
-                ]
-            elif resource_type == "events":
-                items = [
-                    marvel_pb2.EventSummary(
-                        resourceURI=item["resourceURI"], name=item["name"]
+        items = []
+        misses = {}
+        found = {}
+        for item in request.requests:
+            try:
+                fields = self._character_fields(item)
+            except ValueError as e:
+                items.append(
+                    marvel_pb2.BatchCharacterResult(
+                        status=grpc.StatusCode.INVALID_ARGUMENT.value[0], error=str(e)
                     )
-                    for item in api_resource.get("items", [])
-                ]
-            elif resource_type == "series":
-                items = [
-                    marvel_pb2.SeriesSummary(
-                        resourceURI=item["resourceURI"], name=item["name"]
-                    )
-                    for item in api_resource.get("items", [])
-                ]
-
-            return marvel_pb2.ResourceList(
-                available=api_resource.get("available", 0),
-                returned=api_resource.get("returned", 0),
-                collectionURI=api_resource.get("collectionURI", ""),
-                comics=items if resource_type == "comics" else [],
-                stories=items if resource_type == "stories" else [],
-                events=items if resource_type == "events" else [],
-                series=items if resource_type == "series" else [],
-            )
+                )
+                continue
+            query_params = self._query_params(item)
+            cache_key = generate_cache_key(query_params)
+            items.append((cache_key, fields))
+            if cache_key in found or cache_key in misses:
+                continue
+            cached_response = cache.get(cache_key) or self._get_local(query_params)
+            if cached_response:
+                found[cache_key] = cached_response
+            else:
+                misses[cache_key] = query_params
 
-        characters = [
-            marvel_pb2.Character(
-                id=result.get("id", 0),
-                name=result.get("name", ""),
-                description=result.get("description", ""),
-                thumbnail=(
-                    marvel_pb2.Image(
-                        path=result["thumbnail"]["path"],
-                        extension=result["thumbnail"]["extension"],
-                    )
-                    if result.get("thumbnail")
-                    else None
-                ),
-                comics=_build_resource_list(result.get("comics", {}), "comics"),
-                stories=_build_resource_list(result.get("stories", {}), "stories"),
-                events=_build_resource_list(result.get("events", {}), "events"),
-                series=_build_resource_list(result.get("series", {}), "series"),
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        time_remaining = context.time_remaining()
+        deadline = (
+            None
+            if time_remaining is None
+            else asyncio.get_running_loop().time() + time_remaining
+        )
+
+        async def fetch(cache_key, query_params):
+            async with semaphore, asyncio.timeout_at(deadline):
+                return await inflight.do(
+                    cache_key, self._fetch_characters, cache_key, query_params
+                )
+
+        fetched = await asyncio.gather(
+            *(fetch(key, params) for key, params in misses.items()),
+            return_exceptions=True,
+        )
+        found.update(zip(misses, fetched))
+
+        results = {}
+        for item in items:
+            if isinstance(item, marvel_pb2.BatchCharacterResult) or item in results:
+                continue
+            cache_key, fields = item
+            response_data = found[cache_key]
+            if isinstance(response_data, AdmissionRejected):
+                results[item] = marvel_pb2.BatchCharacterResult(
+                    status=grpc.StatusCode.RESOURCE_EXHAUSTED.value[0],
+                    error=str(response_data),
+                )
+                continue
+            try:
+                if isinstance(response_data, BaseException):
+                    raise RuntimeError(response_data)
+                response = self._get_response_message(cache_key, response_data, fields)
+            except Exception as e:
+                logger.error(
+                    "[MarvelService] Error fetching batch item %s: %s", cache_key, e
+                )
+                results[item] = marvel_pb2.BatchCharacterResult(
+                    status=grpc.StatusCode.INTERNAL.value[0],
+                    error="Failed to fetch characters.",
+                )
+                continue
+            results[item] = marvel_pb2.BatchCharacterResult(
+                status=grpc.StatusCode.OK.value[0], response=response
             )
-            for result in api_response.get("data", {}).get("results", [])
-        ]
 
+        # Items that failed validation already hold their result
+        return marvel_pb2.BatchCharacterResponse(
+            results=[
+                (
+                    item
+                    if isinstance(item, marvel_pb2.BatchCharacterResult)
+                    else results[item]
+                )
+                for item in items
+            ]
+        )
+
+    def _get_response_message(
+        self, cache_key: str, response_data: dict, fields: frozenset = None
+    ):
+        """
+        Get the response message for cached data, parsing stored bytes when
+        available instead of rebuilding it.
+        """
+        serialized = self._get_serialized(cache_key, response_data, fields)
+        if serialized is not None:
+            return marvel_pb2.CharacterResponse.FromString(serialized)
+        response = self._build_response_from_api(response_data, fields)
+        self._set_serialized(cache_key, response_data, response, fields)
+        return response
+
+    async def _get_page(self, query_params: dict) -> dict:
+        """
+        Get one page of characters from the cache or the Marvel API.
+        """
+        cache_key = generate_cache_key(query_params)
+        cached_response = cache.get(cache_key) or self._get_local(query_params)
+        if cached_response:
+            return cached_response
+        return await inflight.do(
+            cache_key, self._fetch_characters, cache_key, query_params
+        )
+
+    def _get_local(self, query_params: dict):
+        """
+        Answer a cache miss in-process, from the character mirror once it is
+        complete or holds every match of the query's filters, or by slicing
+        the requested page out of a fresh cached page covering it.
+        Names the name filter rules out get an empty response.
+        """
+        if character_store.excludes(query_params.get("name")):
+            return character_store.empty_response(query_params)
+
+        if character_store.complete or character_store.can_answer(query_params):
+            local_response = character_store.query(query_params)
+            if local_response is not None:
+                return local_response
+
+        contained_response = self.page_index.find(cache, query_params)
+        if contained_response is not None:
+            cache.record_containment_hit()
+        return contained_response
+
+    @staticmethod
+    def _character_fields(request: marvel_pb2.CharacterRequest):
+        """
+        Get the Character fields selected by a request's field mask.
+        :return: A frozenset of field names, or None for every field.
+        :raises ValueError: If the mask names fields Character does not have.
+        """
+        paths = request.field_mask.paths
+        if not paths:
+            return None
+        unknown = set(paths) - CHARACTER_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown character fields: {', '.join(sorted(unknown))}")
+        return frozenset(paths)
+
+    def _query_params(self, request: marvel_pb2.CharacterRequest) -> dict:
+        """
+        Convert a gRPC request into canonical Marvel API query parameters.
+        """
+        return canonical_params(
+            {
+                "name": request.name,
+                "name_starts_with": request.name_starts_with,
+                "modified_since": request.modified_since,
+                "comics": list(request.comics),
+                "series": list(request.series),
+                "events": list(request.events),
+                "stories": list(request.stories),
+                "order_by": request.order_by,
+                "limit": request.limit,
+                "offset": request.offset,
+            }
+        )
+
+    async def _fetch_characters(self, cache_key: str, query_params: dict) -> dict:
+        """
+        Fetch characters from the Marvel API and store them in the cache.
+        Concurrent misses for the same cache key share one call. Empty and
+        Not Found responses are cached with the shorter negative TTL. If the
+        upstream fails, its circuit is open or admission control turns the
+        call away, an expired entry is served. A response that arrives after
+        the requesting RPC gave up is still cached.
+        """
+        cached_etag = cache.get_etag(cache_key)
+        headers = {"If-None-Match": cached_etag} if cached_etag else {}
+
+        try:
+            async with self.admission.admit() if self.admission else nullcontext():
+                started = time.perf_counter()
+                response = await get_marvel_characters(headers=headers, **query_params)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                return self._get_stale(cache_key, e)
+            response = None
+        except Exception as e:
+            return self._get_stale(cache_key, e)
+        compute_time = time.perf_counter() - started
+
+        if response is None:
+            response_data = empty_response(query_params, code=404)
+            new_etag = None
+        elif response.status_code == 304:  # Not Modified
+            cache.touch(cache_key)
+            return cache.get(cache_key)
+        else:
+            response_data = response.json()
+            new_etag = response.headers.get("Etag")
+
+        cache.set(
+            cache_key,
+            response_data,
+            etag=new_etag,
+            compute_time=compute_time,
+            params=query_params,
+            ttl=response_ttl(response_data),
+        )
+        self.page_index.add(cache_key, query_params, cache)
+        if response is not None:
+            # The Not Found placeholder says nothing about the catalog
+            character_store.observe(query_params, response_data)
+
+        return response_data
+
+    @staticmethod
+    def _reject(context: grpc.ServicerContext, error: AdmissionRejected):
+        """
+        Fail an RPC whose upstream call admission control turned away.
+        """
+        logger.warning("[MarvelService] Rejected upstream call: %s", error)
+        context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+        context.set_details(str(error))
+
+    def _get_stale(self, cache_key: str, error: Exception) -> dict:
+        """
+        Get an expired entry to serve instead of an upstream error.
+        Re-raises the error if there is none.
+        """
+        stale_response = cache.get_stale(cache_key)
+        if stale_response is None:
+            raise error
+        logger.warning(
+            "[MarvelService] Serving expired entry after upstream error: %s", error
+        )
+        return stale_response
+
+    def _get_serialized(
+        self, cache_key: str, cached_response: dict, fields: frozenset = None
+    ):
+        """
+        Get the serialized response built from the given cached value.
+        Each field mask has its own serialized projection.
+        Returns None if the cached value was replaced since it was serialized.
+        """
+        entry = self.serialized.get((cache_key, fields))
+        if entry is None or entry[0] is not cached_response:
+            return None
+        self.serialized.move_to_end((cache_key, fields))
+        return entry[1]
+
+    def _set_serialized(
+        self, cache_key: str, source: dict, response, fields: frozenset = None
+    ):
+        """
+        Store the serialized form of a response built from a cached value.
+        """
+        if not self.serialized_responses or not source:
+            return
+        self.serialized[(cache_key, fields)] = (source, response.SerializeToString())
+        self.serialized.move_to_end((cache_key, fields))
+        while len(self.serialized) > CACHE_MAXSIZE:
+            self.serialized.popitem(last=False)
+
+    def forget(self, cache_key: str):
+        """
+        Drop what was derived from a cache entry removed from the cache.
+        Set as the cache's on_remove callback, so evicted values are not
+        kept alive outside the cache's size limits and the page index does
+        not grow past the cache.
+        """
+        self.forget_serialized([cache_key])
+        self.page_index.remove(cache_key)
+
+    def forget_serialized(self, cache_keys: list):
+        """
+        Drop the serialized responses of cache entries that were removed or
+        compressed, so their source values can be freed.
+        """
+        cache_keys = set(cache_keys)
+        for key in [key for key in self.serialized if key[0] in cache_keys]:
+            del self.serialized[key]
+
+    @staticmethod
+    def _is_not_modified(request: marvel_pb2.CharacterRequest, response_data: dict):
+        """
+        Check whether the client already holds this response.
+        """
+        etag = response_data.get("etag")
+        return bool(etag) and request.if_none_match == etag
+
+    @staticmethod
+    def _build_not_modified(response_data: dict):
+        """
+        Build a Not Modified response, which carries the ETag but no characters.
+        """
         return marvel_pb2.CharacterResponse(
-            code=api_response.get("code", 0),
-            status=api_response.get("status", ""),
-            copyright=api_response.get("copyright", ""),
-            attributionText=api_response.get("attributionText", ""),
-            attributionHTML=api_response.get("attributionHTML", ""),
-            etag=api_response.get("etag", ""),
-            offset=api_response.get("data", {}).get("offset", 0),
-            limit=api_response.get("data", {}).get("limit", 0),
-            total=api_response.get("data", {}).get("total", 0),
-            count=api_response.get("data", {}).get("count", 0),
-            characters=characters,
+            code=304, status="Not Modified", etag=response_data["etag"]
         )
 
-    def _build_response_from_cache(self, cached_response: dict):
+    def _build_response_from_api(self, api_response: dict, fields: frozenset = None):
+        """
+        Convert the Marvel API response into a gRPC response format.
+        :param fields: Character fields to fill in, or None for every field.
+        """
+        return transcoder_for(fields).response(api_response)
+
+    def _build_character(self, result: dict, fields: frozenset = None):
+        """
+        Convert a single Marvel API character into a gRPC Character.
+        :param fields: Fields to fill in, or None for every field. Resource
+            lists outside the mask are not built at all.
+        """
+        return transcoder_for(fields).character(result)
+
+    def _build_response_from_cache(
+        self, cached_response: dict, fields: frozenset = None
+    ):
         """
         Convert cached data into a gRPC response format.
         """
-        return self._build_response_from_api(cached_response)
+        return self._build_response_from_api(cached_response, fields)
@@ -22,35 +22,42 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cmarvel.proto\"\xc4\x01\n\x10\x43haracterRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x18\n\x10name_starts_with\x18\x02 \x01(\t\x12\x16\n\x0emodified_since\x18\x03 \x01(\t\x12\x0e\n\x06\x63omics\x18\x04 \x03(\x05\x12\x0e\n\x06series\x18\x05 \x03(\x05\x12\x0e\n\x06\x65vents\x18\x06 \x03(\x05\x12\x0f\n\x07stories\x18\x07 \x03(\x05\x12\x10\n\x08order_by\x18\x08 \x01(\t\x12\r\n\x05limit\x18\t \x01(\x05\x12\x0e\n\x06offset\x18\n \x01(\x05\" \n\x03Url\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0b\n\x03url\x18\x02 \x01(\t\"(\n\x05Image\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x11\n\textension\x18\x02 \x01(\t\"1\n\x0c\x43omicSummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"?\n\x0cStorySummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0c\n\x04type\x18\x03 \x01(\t\"1\n\x0c\x45ventSummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"2\n\rSeriesSummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"\xc8\x01\n\x0cResourceList\x12\x11\n\tavailable\x18\x01 \x01(\x05\x12\x10\n\x08returned\x18\x02 \x01(\x05\x12\x15\n\rcollectionURI\x18\x03 \x01(\t\x12\x1d\n\x06\x63omics\x18\x04 \x03(\x0b\x32\r.ComicSummary\x12\x1e\n\x07stories\x18\x05 \x03(\x0b\x32\r.StorySummary\x12\x1d\n\x06\x65vents\x18\x06 \x03(\x0b\x32\r.EventSummary\x12\x1e\n\x06series\x18\x07 \x03(\x0b\x32\x0e.SeriesSummary\"\x8d\x02\n\tCharacter\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x10\n\x08modified\x18\x04 \x01(\t\x12\x13\n\x0bresourceURI\x18\x05 \x01(\t\x12\x12\n\x04urls\x18\x06 \x03(\x0b\x32\x04.Url\x12\x19\n\tthumbnail\x18\x07 \x01(\x0b\x32\x06.Image\x12\x1d\n\x06\x63omics\x18\x08 \x01(\x0b\x32\r.ResourceList\x12\x1e\n\x07stories\x18\t \x01(\x0b\x32\r.ResourceList\x12\x1d\n\x06\x65vents\x18\n \x01(\x0b\x32\r.ResourceList\x12\x1d\n\x06series\x18\x0b \x01(\x0b\x32\r.ResourceList\"\xe1\x01\n\x11\x43haracterResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x11\n\tcopyright\x18\x03 \x01(\t\x12\x17\n\x0f\x61ttributionText\x18\x04 \x01(\t\x12\x17\n\x0f\x61ttributionHTML\x18\x05 \x01(\t\x12\x0c\n\x04\x65tag\x18\x06 \x01(\t\x12\x0e\n\x06offset\x18\x07 \x01(\x05\x12\r\n\x05limit\x18\x08 \x01(\x05\x12\r\n\x05total\x18\t \x01(\x05\x12\r\n\x05\x63ount\x18\n \x01(\x05\x12\x1e\n\ncharacters\x18\x0b \x03(\x0b\x32\n.Character2G\n\rMarvelService\x12\x36\n\rGetCharacters\x12\x11.CharacterRequest\x1a\x12.CharacterResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0cmarvel.proto\x1a google/protobuf/field_mask.proto\"\x8b\x02\n\x10\x43haracterRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x18\n\x10name_starts_with\x18\x02 \x01(\t\x12\x16\n\x0emodified_since\x18\x03 \x01(\t\x12\x0e\n\x06\x63omics\x18\x04 \x03(\x05\x12\x0e\n\x06series\x18\x05 \x03(\x05\x12\x0e\n\x06\x65vents\x18\x06 \x03(\x05\x12\x0f\n\x07stories\x18\x07 \x03(\x05\x12\x10\n\x08order_by\x18\x08 \x01(\t\x12\r\n\x05limit\x18\t \x01(\x05\x12\x0e\n\x06offset\x18\n \x01(\x05\x12\x15\n\rif_none_match\x18\x0b \x01(\t\x12.\n\nfield_mask\x18\x0c \x01(\x0b\x32\x1a.google.protobuf.FieldMask\" \n\x03Url\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0b\n\x03url\x18\x02 \x01(\t\"(\n\x05Image\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x11\n\textension\x18\x02 \x01(\t\"1\n\x0c\x43omicSummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"?\n\x0cStorySummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0c\n\x04type\x18\x03 \x01(\t\"1\n\x0c\x45ventSummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"2\n\rSeriesSummary\x12\x13\n\x0bresourceURI\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\"\xc8\x01\n\x0cResourceList\x12\x11\n\tavailable\x18\x01 \x01(\x05\x12\x10\n\x08returned\x18\x02 \x01(\x05\x12\x15\n\rcollectionURI\x18\x03 \x01(\t\x12\x1d\n\x06\x63omics\x18\x04 \x03(\x0b\x32\r.ComicSummary\x12\x1e\n\x07stories\x18\x05 \x03(\x0b\x32\r.StorySummary\x12\x1d\n\x06\x65vents\x18\x06 \x03(\x0b\x32\r.EventSummary\x12\x1e\n\x06series\x18\x07 \x03(\x0b\x32\x0e.SeriesSummary\"\x8d\x02\n\tCharacter\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x10\n\x08modified\x18\x04 \x01(\t\x12\x13\n\x0bresourceURI\x18\x05 \x01(\t\x12\x12\n\x04urls\x18\x06 \x03(\x0b\x32\x04.Url\x12\x19\n\tthumbnail\x18\x07 \x01(\x0b\x32\x06.Image\x12\x1d\n\x06\x63omics\x18\x08 \x01(\x0b\x32\r.ResourceList\x12\x1e\n\x07stories\x18\t \x01(\x0b\x32\r.ResourceList\x12\x1d\n\x06\x65vents\x18\n \x01(\x0b\x32\r.ResourceList\x12\x1d\n\x06series\x18\x0b \x01(\x0b\x32\r.ResourceList\"\xe1\x01\n\x11\x43haracterResponse\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x11\n\tcopyright\x18\x03 \x01(\t\x12\x17\n\x0f\x61ttributionText\x18\x04 \x01(\t\x12\x17\n\x0f\x61ttributionHTML\x18\x05 \x01(\t\x12\x0c\n\x04\x65tag\x18\x06 \x01(\t\x12\x0e\n\x06offset\x18\x07 \x01(\x05\x12\r\n\x05limit\x18\x08 \x01(\x05\x12\r\n\x05total\x18\t \x01(\x05\x12\r\n\x05\x63ount\x18\n \x01(\x05\x12\x1e\n\ncharacters\x18\x0b \x03(\x0b\x32\n.Character\"<\n\x15\x42\x61tchCharacterRequest\x12#\n\x08requests\x18\x01 \x03(\x0b\x32\x11.CharacterRequest\"[\n\x14\x42\x61tchCharacterResult\x12\x0e\n\x06status\x18\x01 \x01(\x05\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12$\n\x08response\x18\x03 \x01(\x0b\x32\x12.CharacterResponse\"@\n\x16\x42\x61tchCharacterResponse\x12&\n\x07results\x18\x01 \x03(\x0b\x32\x15.BatchCharacterResult2\xc3\x01\n\rMarvelService\x12\x36\n\rGetCharacters\x12\x11.CharacterRequest\x1a\x12.CharacterResponse\x12\x33\n\x10StreamCharacters\x12\x11.CharacterRequest\x1a\n.Character0\x01\x12\x45\n\x12\x42\x61tchGetCharacters\x12\x16.BatchCharacterRequest\x1a\x17.BatchCharacterResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'marvel_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_CHARACTERREQUEST']._serialized_start=17
-  _globals['_CHARACTERREQUEST']._serialized_end=213
-  _globals['_URL']._serialized_start=215
-  _globals['_URL']._serialized_end=247
-  _globals['_IMAGE']._serialized_start=249
-  _globals['_IMAGE']._serialized_end=289
-  _globals['_COMICSUMMARY']._serialized_start=291
-  _globals['_COMICSUMMARY']._serialized_end=340
-  _globals['_STORYSUMMARY']._serialized_start=342
-  _globals['_STORYSUMMARY']._serialized_end=405
-  _globals['_EVENTSUMMARY']._serialized_start=407
-  _globals['_EVENTSUMMARY']._serialized_end=456
-  _globals['_SERIESSUMMARY']._serialized_start=458
-  _globals['_SERIESSUMMARY']._serialized_end=508
-  _globals['_RESOURCELIST']._serialized_start=511
-  _globals['_RESOURCELIST']._serialized_end=711
-  _globals['_CHARACTER']._serialized_start=714
-  _globals['_CHARACTER']._serialized_end=983
-  _globals['_CHARACTERRESPONSE']._serialized_start=986
-  _globals['_CHARACTERRESPONSE']._serialized_end=1211
-  _globals['_MARVELSERVICE']._serialized_start=1213
-  _globals['_MARVELSERVICE']._serialized_end=1284
+  _globals['_CHARACTERREQUEST']._serialized_start=51
+  _globals['_CHARACTERREQUEST']._serialized_end=318
+  _globals['_URL']._serialized_start=320
+  _globals['_URL']._serialized_end=352
+  _globals['_IMAGE']._serialized_start=354
+  _globals['_IMAGE']._serialized_end=394
+  _globals['_COMICSUMMARY']._serialized_start=396
+  _globals['_COMICSUMMARY']._serialized_end=445
+  _globals['_STORYSUMMARY']._serialized_start=447
+  _globals['_STORYSUMMARY']._serialized_end=510
+  _globals['_EVENTSUMMARY']._serialized_start=512
+  _globals['_EVENTSUMMARY']._serialized_end=561
+  _globals['_SERIESSUMMARY']._serialized_start=563
+  _globals['_SERIESSUMMARY']._serialized_end=613
+  _globals['_RESOURCELIST']._serialized_start=616
+  _globals['_RESOURCELIST']._serialized_end=816
+  _globals['_CHARACTER']._serialized_start=819
+  _globals['_CHARACTER']._serialized_end=1088
+  _globals['_CHARACTERRESPONSE']._serialized_start=1091
+  _globals['_CHARACTERRESPONSE']._serialized_end=1316
+  _globals['_BATCHCHARACTERREQUEST']._serialized_start=1318
+  _globals['_BATCHCHARACTERREQUEST']._serialized_end=1378
+  _globals['_BATCHCHARACTERRESULT']._serialized_start=1380
+  _globals['_BATCHCHARACTERRESULT']._serialized_end=1471
+  _globals['_BATCHCHARACTERRESPONSE']._serialized_start=1473
+  _globals['_BATCHCHARACTERRESPONSE']._serialized_end=1537
+  _globals['_MARVELSERVICE']._serialized_start=1540
+  _globals['_MARVELSERVICE']._serialized_end=1735
 # @@protoc_insertion_point(module_scope)
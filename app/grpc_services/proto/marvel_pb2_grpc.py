@@ -39,6 +39,16 @@ class MarvelServiceStub(object):
                 request_serializer=marvel__pb2.CharacterRequest.SerializeToString,
                 response_deserializer=marvel__pb2.CharacterResponse.FromString,
                 _registered_method=True)
+        self.StreamCharacters = channel.unary_stream(
+                '/MarvelService/StreamCharacters',
+                request_serializer=marvel__pb2.CharacterRequest.SerializeToString,
+                response_deserializer=marvel__pb2.Character.FromString,
+                _registered_method=True)
+        self.BatchGetCharacters = channel.unary_unary(
+                '/MarvelService/BatchGetCharacters',
+                request_serializer=marvel__pb2.BatchCharacterRequest.SerializeToString,
+                response_deserializer=marvel__pb2.BatchCharacterResponse.FromString,
+                _registered_method=True)
 
 
 class MarvelServiceServicer(object):
@@ -50,6 +60,20 @@ class MarvelServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamCharacters(self, request, context):
+        """Stream every matching character from offset on, fetching pages of limit concurrently
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchGetCharacters(self, request, context):
+        """Answer several character queries in one call
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MarvelServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +82,16 @@ def add_MarvelServiceServicer_to_server(servicer, server):
                     request_deserializer=marvel__pb2.CharacterRequest.FromString,
                     response_serializer=marvel__pb2.CharacterResponse.SerializeToString,
             ),
+            'StreamCharacters': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamCharacters,
+                    request_deserializer=marvel__pb2.CharacterRequest.FromString,
+                    response_serializer=marvel__pb2.Character.SerializeToString,
+            ),
+            'BatchGetCharacters': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetCharacters,
+                    request_deserializer=marvel__pb2.BatchCharacterRequest.FromString,
+                    response_serializer=marvel__pb2.BatchCharacterResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'MarvelService', rpc_method_handlers)
@@ -95,3 +129,57 @@ class MarvelService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StreamCharacters(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/MarvelService/StreamCharacters',
+            marvel__pb2.CharacterRequest.SerializeToString,
+            marvel__pb2.Character.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchGetCharacters(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/MarvelService/BatchGetCharacters',
+            marvel__pb2.BatchCharacterRequest.SerializeToString,
+            marvel__pb2.BatchCharacterResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,137 @@
+"""
+Table-driven conversion of Marvel API responses into protobuf messages.
+"""
+
+from functools import lru_cache
+import json
+
+from app.grpc_services.proto import marvel_pb2
+
+# CharacterResponse fields copied from the top level of an API response
+RESPONSE_FIELDS = (
+    "code",
+    "status",
+    "copyright",
+    "attributionText",
+    "attributionHTML",
+    "etag",
+)
+# CharacterResponse fields copied from the API response's "data"
+DATA_FIELDS = ("offset", "limit", "total", "count")
+# Character fields copied as-is from a result
+CHARACTER_SCALARS = ("id", "name", "description")
+RESOURCE_LIST_SCALARS = ("available", "returned", "collectionURI")
+# Summary fields per resource list, in the order of the summary messages
+SUMMARY_FIELDS = {
+    "comics": ("resourceURI", "name"),
+    "stories": ("resourceURI", "name", "type"),
+    "events": ("resourceURI", "name"),
+    "series": ("resourceURI", "name"),
+}
+
+
+class Transcoder:
+    """
+    Converts Marvel API response dicts into CharacterResponse messages.
+
+    The fields to copy are resolved once per field mask. Each character is
+    turned into a dict of constructor arguments, with the API's summary
+    items passed through untouched, so the protobuf runtime builds the
+    whole response in a single constructor call instead of one Python call
+    per message. Should the API send keys the messages do not have, the
+    response is built again from items trimmed to the known fields.
+    """
+
+    def __init__(self, fields: frozenset = None):
+        """
+        Resolve the fields to copy.
+        :param fields: Character fields to fill in, or None for every field.
+        """
+        self.scalars = tuple(
+            field for field in CHARACTER_SCALARS if fields is None or field in fields
+        )
+        self.thumbnail = fields is None or "thumbnail" in fields
+        self.resource_lists = tuple(
+            resource_type
+            for resource_type in SUMMARY_FIELDS
+            if fields is None or resource_type in fields
+        )
+
+    def response(self, api_response: dict) -> marvel_pb2.CharacterResponse:
+        """
+        Convert an API response into a CharacterResponse.
+        """
+        try:
+            return self._response(api_response, strict=False)
+        except ValueError:
+            return self._response(api_response, strict=True)
+
+    def response_from_bytes(self, content: bytes) -> marvel_pb2.CharacterResponse:
+        """
+        Convert a raw API response body into a CharacterResponse.
+        """
+        return self.response(json.loads(content))
+
+    def character(self, result: dict) -> marvel_pb2.Character:
+        """
+        Convert a single API character into a Character.
+        """
+        try:
+            return marvel_pb2.Character(**self._character(result, strict=False))
+        except ValueError:
+            return marvel_pb2.Character(**self._character(result, strict=True))
+
+    def _response(self, api_response: dict, strict: bool):
+        """
+        Build a CharacterResponse in one constructor call.
+        """
+        arguments = {
+            field: api_response[field]
+            for field in RESPONSE_FIELDS
+            if api_response.get(field) is not None
+        }
+        data = api_response.get("data") or {}
+        for field in DATA_FIELDS:
+            if data.get(field) is not None:
+                arguments[field] = data[field]
+        arguments["characters"] = [
+            self._character(result, strict) for result in data.get("results", ())
+        ]
+        return marvel_pb2.CharacterResponse(**arguments)
+
+    def _character(self, result: dict, strict: bool) -> dict:
+        """
+        Get the constructor arguments of a Character.
+        :param strict: Copy only known summary fields instead of passing the
+            API's items through.
+        """
+        character = {field: result.get(field) for field in self.scalars}
+        thumbnail = result.get("thumbnail") if self.thumbnail else None
+        if thumbnail:
+            character["thumbnail"] = {
+                "path": thumbnail.get("path"),
+                "extension": thumbnail.get("extension"),
+            }
+        for resource_type in self.resource_lists:
+            api_resource = result.get(resource_type) or {}
+            resource_list = {
+                field: api_resource.get(field) for field in RESOURCE_LIST_SCALARS
+            }
+            items = api_resource.get("items") or []
+            if strict:
+                summary_fields = SUMMARY_FIELDS[resource_type]
+                items = [
+                    {field: item.get(field) for field in summary_fields}
+                    for item in items
+                ]
+            resource_list[resource_type] = items
+            character[resource_type] = resource_list
+        return character
+
+
+@lru_cache(maxsize=64)
+def transcoder_for(fields: frozenset = None) -> Transcoder:
+    """
+    Get the transcoder for a field mask, resolving each mask once.
+    """
+    return Transcoder(fields)
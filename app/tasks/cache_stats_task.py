@@ -4,7 +4,15 @@ Logs cache statistics at regular intervals.
 
 import logging
 
-from app.api.cache import cache
+from app.api.cache import cache, character_store, inflight
+from app.api.marvel_api import (
+    hedge_budget,
+    upstream_breaker,
+    upstream_client,
+    upstream_deadlines,
+)
+from app.grpc_services.admission import admission_controller
+from app.tasks.marvel_task import delta_sync, refresh_planner
 from app.workers.broker import broker
 
 logger = logging.getLogger(__name__)
@@ -15,5 +23,18 @@ async def log_cache_stats():
     """
     Log cache statistics.
     """
+    logger.info("[CacheStatsTask] Singleflight Stats: %s", inflight.stats())
+    logger.info("[CacheStatsTask] Upstream Pool Stats: %s", upstream_client.stats())
+    logger.info("[CacheStatsTask] Circuit Breaker Stats: %s", upstream_breaker.stats())
+    logger.info("[CacheStatsTask] Hedging Stats: %s", hedge_budget.stats())
+    logger.info("[CacheStatsTask] Deadline Stats: %s", upstream_deadlines.stats())
+    logger.info("[CacheStatsTask] Admission Stats: %s", admission_controller.stats())
+    logger.info("[CacheStatsTask] Refresh Planner Stats: %s", refresh_planner.stats())
+    logger.info("[CacheStatsTask] Character Store Stats: %s", character_store.stats())
+    logger.info("[CacheStatsTask] Delta Sync Stats: %s", delta_sync.stats())
+    if cache.adaptive_ttl is not None:
+        logger.info(
+            "[CacheStatsTask] Adaptive TTL Stats: %s", cache.adaptive_ttl.stats()
+        )
     stats = cache.stats()
     logger.info("[CacheStatsTask] Cache Stats: %s", stats)
@@ -3,15 +3,55 @@ MarvelTask: Handles Marvel API cache updates.
 """
 
 # pylint: disable=broad-exception-caught
+import asyncio
 import logging
-import json
+import os
+import time
 
+from dotenv import load_dotenv
 from app.api.marvel_api import get_marvel_characters
-from app.api.cache import cache
+from app.api.cache import (
+    cache,
+    character_store,
+    response_ttl,
+    shared_character_store,
+)
+from app.utils.delta_sync import DeltaSync
+from app.utils.refresh_planner import CallBudget, RefreshPlanner
 from app.workers.broker import broker
 
+load_dotenv()
+
+REFRESH_BUDGET_PER_MINUTE = int(os.getenv("REFRESH_BUDGET_PER_MINUTE", "30"))
+REFRESH_BUDGET_PER_DAY = int(os.getenv("REFRESH_BUDGET_PER_DAY", "2000"))
+REFRESH_MAX_CONCURRENT = int(os.getenv("REFRESH_MAX_CONCURRENT", "5"))
+REFRESH_AHEAD = int(os.getenv("REFRESH_AHEAD", "60"))
+CHARACTER_STORE_PAGE_SIZE = 100
+CHARACTER_STORE_CONCURRENCY = int(os.getenv("CHARACTER_STORE_CONCURRENCY", "4"))
+# Key of the entry listing the published character store pages
+CHARACTER_STORE_SHARED_KEY = "characters"
+DELTA_SYNC_PAGE_SIZE = 100
+DELTA_SYNC_SKEW = int(os.getenv("DELTA_SYNC_SKEW", "60"))
+
 logger = logging.getLogger(__name__)
 
+refresh_planner = RefreshPlanner(
+    cache,
+    CallBudget(per_minute=REFRESH_BUDGET_PER_MINUTE, per_day=REFRESH_BUDGET_PER_DAY),
+    max_concurrent=REFRESH_MAX_CONCURRENT,
+    refresh_ahead=REFRESH_AHEAD,
+)
+
+delta_sync = DeltaSync(
+    cache,
+    character_store,
+    params_for=cache.get_params,
+    skew=DELTA_SYNC_SKEW,
+)
+
+# Strong references to scheduled revalidations so they are not garbage collected
+_background_tasks = set()
+
 
 @broker.task
 async def update_marvel_cache(cache_key: str):
@@ -20,7 +60,7 @@ async def update_marvel_cache(cache_key: str):
     :param cache_key: The cache key to update.
     """
     try:
-        query_params = _extract_query_params_from_key(cache_key)
+        query_params = cache.get_params(cache_key)
         if not query_params:
             logger.warning(
                 "[MarvelTask] No query parameters found for key: %s", cache_key
@@ -30,9 +70,12 @@ async def update_marvel_cache(cache_key: str):
         cached_etag = cache.get_etag(cache_key)
         headers = {"If-None-Match": cached_etag} if cached_etag else {}
 
+        started = time.perf_counter()
         response = await get_marvel_characters(headers=headers, **query_params)
+        compute_time = time.perf_counter() - started
 
         if response.status_code == 304:
+            cache.touch(cache_key)
             logger.info("[MarvelTask] Cache entry is up to date for key: %s", cache_key)
             return
 
@@ -45,40 +88,221 @@ async def update_marvel_cache(cache_key: str):
             return
 
         new_etag = response.headers.get("Etag")
-        updated_characters = response_data["data"]["results"]
-        cache.set(cache_key, updated_characters, etag=new_etag)
+        cache.set(
+            cache_key,
+            response_data,
+            etag=new_etag,
+            compute_time=compute_time,
+            params=query_params,
+            ttl=response_ttl(response_data),
+        )
         logger.info("[MarvelTask] Updated cache for key: %s", cache_key)
 
     except Exception as e:
         logger.error("[MarvelTask] Failed to process task for key %s: %s", cache_key, e)
 
+    finally:
+        cache.end_revalidation(cache_key)
+
 
 @broker.task
-async def enqueue_marvel_tasks():
+async def sync_character_store():
     """
-    Enqueue all Marvel-related cache keys into the Taskiq queue.
+    Page through the full character catalog into the local character store.
+    The first page's total gives the remaining offsets, which are fetched
+    concurrently. The store is marked complete once every page loaded.
     """
-    all_keys = list(cache.store.keys())
-    for cache_key in all_keys:
-        await update_marvel_cache.kiq(cache_key)
-        logger.info("[MarvelTask] Task enqueued for key: %s", cache_key)
+    try:
+        first_page = await _fetch_catalog_page(0)
+        character_store.load(first_page)
+        total = first_page["data"]["total"]
+
+        semaphore = asyncio.Semaphore(CHARACTER_STORE_CONCURRENCY)
+
+        async def fetch(offset):
+            async with semaphore:
+                return await _fetch_catalog_page(offset)
+
+        pages = await asyncio.gather(
+            *(
+                fetch(offset)
+                for offset in range(
+                    CHARACTER_STORE_PAGE_SIZE, total, CHARACTER_STORE_PAGE_SIZE
+                )
+            )
+        )
+        for page in pages:
+            character_store.load(page)
 
+        character_store.mark_complete()
+        logger.info("[MarvelTask] Synced %d characters.", len(character_store))
+        publish_character_store()
 
-def _extract_query_params_from_key(cache_key: str) -> dict:
+    except Exception as e:
+        logger.error("[MarvelTask] Failed to sync character store: %s", e)
+
+
+def publish_character_store():
+    """
+    Copy the character store to the shared tier for the other workers.
+    Every page is written with the same timestamp as the entry listing
+    them, so a copy that is still being replaced is not loaded. The pages
+    are encoded by the shared tier's writer thread.
+    """
+    if shared_character_store is None:
+        return
+    published_at = time.time()
+    pages = character_store.pages(CHARACTER_STORE_PAGE_SIZE)
+    for index, page in enumerate(pages):
+        shared_character_store.put(
+            f"{CHARACTER_STORE_SHARED_KEY}:{index}", page, "", published_at
+        )
+    shared_character_store.put(
+        CHARACTER_STORE_SHARED_KEY, {"pages": len(pages)}, "", published_at
+    )
+    logger.info("[MarvelTask] Published %d characters.", len(character_store))
+
+
+@broker.task
+async def load_character_store():
     """
-    Extract query parameters from the cache key.
-    :param cache_key: The cache key string.
-    :return: Dictionary of query parameters.
+    Load the character store the leader worker published, if it is newer
+    than the copy already loaded.
     """
+    if shared_character_store is None:
+        return
     try:
-        if cache_key.startswith("{") and cache_key.endswith("}"):
-            return json.loads(cache_key)
+        listing = shared_character_store.get(CHARACTER_STORE_SHARED_KEY)
+        if listing is None:
+            return
+        value, _, published_at, _ = listing
+        if character_store.synced_at and character_store.synced_at >= published_at:
+            return
+
+        def read():
+            pages = []
+            for index in range(value["pages"]):
+                entry = shared_character_store.get(
+                    f"{CHARACTER_STORE_SHARED_KEY}:{index}"
+                )
+                if entry is None or entry[2] != published_at:
+                    return None
+                pages.append(entry[0])
+            return pages
+
+        # Decoded in a thread so RPCs keep being served
+        pages = await asyncio.to_thread(read)
+        if pages is None:
+            logger.info(
+                "[MarvelTask] Shared character store is being replaced; "
+                "loading it later."
+            )
+            return
+        for page in pages:
+            character_store.load(page)
+        character_store.mark_complete()
+        logger.info("[MarvelTask] Loaded %d shared characters.", len(character_store))
+
+    except Exception as e:
+        logger.error("[MarvelTask] Failed to load shared character store: %s", e)
+
+
+async def _fetch_catalog_page(offset: int) -> dict:
+    """
+    Fetch one page of the character catalog ordered by name.
+    """
+    response = await get_marvel_characters(
+        order_by="name", limit=CHARACTER_STORE_PAGE_SIZE, offset=offset
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@broker.task
+async def delta_sync_marvel_cache():
+    """
+    Fetch the characters modified since the last sync, most recent first,
+    and apply them to the cached entries and the character store.
+    """
+    started = time.time()
+    # Keys other workers fetched are only in the shared tier
+    cache.sync_shared()
+    modified_since = delta_sync.modified_since(started)
+    changed = []
+    try:
+        offset = 0
+        while True:
+            response = await get_marvel_characters(
+                modified_since=modified_since,
+                order_by="-modified",
+                limit=DELTA_SYNC_PAGE_SIZE,
+                offset=offset,
+            )
+            response.raise_for_status()
+            data = response.json()["data"]
+            changed.extend(data["results"])
+            offset += data["count"]
+            if data["count"] == 0 or offset >= data["total"]:
+                break
+
+        delta_sync.apply(changed, started)
+        if changed:
+            publish_character_store()
 
-        return dict(param.split("=") for param in cache_key.split("&") if "=" in param)
     except Exception as e:
         logger.error(
-            "[MarvelTask] Failed to parse query params from key %s: %s",
-            cache_key,
-            e,
+            "[MarvelTask] Failed to sync changes since %s: %s", modified_since, e
+        )
+
+
+def schedule_revalidation(cache_key: str) -> bool:
+    """
+    Enqueue a background revalidation for a stale or soon-to-expire key.
+    Used as the cache's ``on_stale`` callback.
+    :param cache_key: The cache key to revalidate.
+    :return: False if no event loop is running to schedule it on.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+
+    task = loop.create_task(update_marvel_cache.kiq(cache_key))
+    _background_tasks.add(task)
+
+    def _on_done(done_task):
+        _background_tasks.discard(done_task)
+        if done_task.cancelled() or done_task.exception() is not None:
+            cache.end_revalidation(cache_key)
+
+    task.add_done_callback(_on_done)
+    logger.info("[MarvelTask] Revalidation scheduled for key: %s", cache_key)
+    return True
+
+
+@broker.task
+async def enqueue_marvel_tasks():
+    """
+    Enqueue the cache keys chosen by the refresh planner into the Taskiq queue.
+    Keys that are due but over the concurrency cap or call budget are deferred
+    to a later cycle. Entries other workers wrote to a shared tier are
+    planned along with this worker's own.
+    """
+    # Keys other workers fetched are only in the shared tier
+    cache.sync_shared()
+    plan = refresh_planner.plan()
+    for cache_key in plan["scheduled"]:
+        cache.revalidating.add(cache_key)
+        try:
+            await update_marvel_cache.kiq(cache_key)
+        except Exception:
+            cache.end_revalidation(cache_key)
+            raise
+        logger.info("[MarvelTask] Task enqueued for key: %s", cache_key)
+
+    if plan["deferred"]:
+        logger.info(
+            "[MarvelTask] Deferred %d keys over budget: %s",
+            len(plan["deferred"]),
+            plan["deferred"],
         )
-    return {}
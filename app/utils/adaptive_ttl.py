@@ -0,0 +1,100 @@
+"""
+Adaptive per-key TTLs learned from how often cached entries change.
+"""
+
+from collections import OrderedDict
+
+
+class AdaptiveTTL:
+    """
+    Learns a TTL per cache key from revalidation outcomes.
+
+    Every key starts at the cache's TTL. Each revalidation that finds the
+    entry unchanged multiplies its TTL by ``increase``; each change
+    multiplies it by ``decrease``. TTLs are kept between ``min_ttl`` and
+    ``max_ttl``, so stable keys are refreshed rarely and volatile keys
+    often. The history of the ``max_keys`` most recently seen keys is kept,
+    including keys that were evicted, so a re-fetched key keeps its TTL.
+    """
+
+    def __init__(
+        self,
+        ttl=300,
+        min_ttl=60,
+        max_ttl=86400,
+        increase=2.0,
+        decrease=0.5,
+        max_keys=10000,
+    ):
+        """
+        Initialize the learner.
+        :param ttl: TTL of keys without history.
+        :param min_ttl: Lowest TTL a volatile key can reach.
+        :param max_ttl: Highest TTL a stable key can reach.
+        :param increase: Factor applied to a key's TTL when it was unchanged.
+        :param decrease: Factor applied to a key's TTL when it changed.
+        :param max_keys: Number of keys whose history is kept.
+        """
+        self.ttl = min(max_ttl, max(min_ttl, ttl))
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.increase = increase
+        self.decrease = decrease
+        self.max_keys = max_keys
+        self.ttls = OrderedDict()
+        self.unchanged_count = 0
+        self.changed_count = 0
+
+    def ttl_for(self, key: str) -> float:
+        """
+        Get the learned TTL of a key.
+        """
+        return self.ttls.get(key, self.ttl)
+
+    def record(self, key: str, changed: bool):
+        """
+        Record the outcome of a revalidation.
+        :param changed: Whether the upstream returned a different entry.
+        """
+        if changed:
+            self.changed_count += 1
+            ttl = max(self.min_ttl, self.ttl_for(key) * self.decrease)
+        else:
+            self.unchanged_count += 1
+            ttl = min(self.max_ttl, self.ttl_for(key) * self.increase)
+        self.ttls[key] = ttl
+        self.ttls.move_to_end(key)
+        while len(self.ttls) > self.max_keys:
+            self.ttls.popitem(last=False)
+
+    def clear(self):
+        """
+        Forget all learned TTLs and reset counters.
+        """
+        self.ttls.clear()
+        self.unchanged_count = 0
+        self.changed_count = 0
+
+    def stats(self):
+        """
+        Get the distribution of learned TTLs.
+        :return: Dictionary containing TTL percentiles, the number of keys at
+            either bound and revalidation outcome counts.
+        """
+        ttls = sorted(self.ttls.values())
+
+        def percentile(p):
+            if not ttls:
+                return self.ttl
+            return ttls[min(len(ttls) - 1, int(p * len(ttls)))]
+
+        return {
+            "keys": len(ttls),
+            "p10": percentile(0.1),
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "at_min": sum(ttl <= self.min_ttl for ttl in ttls),
+            "at_max": sum(ttl >= self.max_ttl for ttl in ttls),
+            "unchanged": self.unchanged_count,
+            "changed": self.changed_count,
+        }
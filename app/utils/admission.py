@@ -0,0 +1,100 @@
+"""
+Admission control for requests that need the upstream.
+"""
+
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised instead of queueing a request that would wait too long.
+    """
+
+
+class AdmissionController:
+    """
+    Caps concurrent upstream-bound requests and sheds load early.
+
+    At most ``max_concurrent`` requests run at once; the rest queue. A new
+    request is rejected right away when the queue ahead of it is expected
+    to take longer than ``latency_target``, estimated from the average run
+    time of recent requests, and a queued request gives up once it has
+    waited that long.
+    """
+
+    def __init__(self, max_concurrent=20, latency_target=1.0, alpha=0.2):
+        """
+        Initialize the controller.
+        :param max_concurrent: Requests allowed to run at once.
+        :param latency_target: Longest time a request may wait in the queue.
+        :param alpha: Weight of the newest run time in the moving average.
+        """
+        self.max_concurrent = max_concurrent
+        self.latency_target = latency_target
+        self.alpha = alpha
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.average_latency = 0.0
+        self.admitted_count = 0
+        self.rejected_count = 0
+        self.timed_out_count = 0
+
+    def expected_wait(self) -> float:
+        """
+        Estimate how long a request arriving now would queue.
+        """
+        if self.active < self.max_concurrent:
+            return 0.0
+        return (self.waiting + 1) * self.average_latency / self.max_concurrent
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Wait for a slot to run an upstream-bound request in.
+        :raises AdmissionRejected: If the expected or actual wait exceeds
+            the latency target.
+        """
+        if self.expected_wait() > self.latency_target:
+            self.rejected_count += 1
+            raise AdmissionRejected("Too many requests waiting for the upstream.")
+
+        self.waiting += 1
+        try:
+            async with asyncio.timeout(self.latency_target):
+                await self.semaphore.acquire()
+        except TimeoutError:
+            self.timed_out_count += 1
+            raise AdmissionRejected("Timed out waiting for an upstream slot.") from None
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted_count += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+            latency = time.monotonic() - started
+            self.average_latency += self.alpha * (latency - self.average_latency)
+
+    def stats(self):
+        """
+        Get admission statistics.
+        :return: Dictionary containing queue state and request counts.
+        """
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "average_latency_ms": self.average_latency * 1000,
+            "admitted": self.admitted_count,
+            "rejected": self.rejected_count,
+            "timed_out": self.timed_out_count,
+        }
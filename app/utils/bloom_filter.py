@@ -0,0 +1,68 @@
+"""
+Bloom filter for compact set membership tests.
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Bit array set with no false negatives.
+
+    ``item in bloom_filter`` is False only for items that were never added;
+    True may be a false positive, at about the configured error rate once
+    ``capacity`` items have been added.
+    """
+
+    def __init__(self, capacity=10000, error_rate=0.01):
+        """
+        Size the filter for the expected number of items.
+        :param capacity: Expected number of items.
+        :param error_rate: False positive rate at capacity.
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        """
+        Bit positions of an item, by double hashing one 128-bit digest.
+        """
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        """
+        Add an item. Items already present are not counted again.
+        """
+        positions = self._positions(item)
+        if all(
+            self.bits[position >> 3] & (1 << (position & 7)) for position in positions
+        ):
+            return
+        for position in positions:
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def stats(self):
+        """
+        Get filter statistics.
+        :return: Dictionary containing size, hash count, items and fill ratio.
+        """
+        filled = sum(bin(byte).count("1") for byte in self.bits)
+        return {
+            "bits": self.size,
+            "hashes": self.hash_count,
+            "items": self.count,
+            "fill_ratio": filled / self.size,
+        }
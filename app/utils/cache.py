@@ -3,65 +3,591 @@ Cache module for Marvel API.
 """
 
 from collections import OrderedDict
-from urllib.parse import urlencode
+import hashlib
+import heapq
+import json
+import math
+import random
+import sys
 import time
 import logging
 
+from app.utils.cache_policy import make_policy
+from app.utils.compression import Compressed, ZlibCodec
+
 logger = logging.getLogger(__name__)
 
+# Query parameter defaults applied by the Marvel API
+DEFAULT_PARAMS = {"limit": 20, "offset": 0}
+ID_LIST_PARAMS = ("comics", "series", "events", "stories")
+# Parameters the Marvel API matches case-insensitively
+CASE_INSENSITIVE_PARAMS = ("name", "name_starts_with")
+
+
+def estimate_size(value) -> int:
+    """
+    Estimate the memory used by a JSON-like value in bytes.
+
+    Dict keys are not counted because decoded payloads share them between
+    objects.
+    """
+    getsizeof = sys.getsizeof
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        size += getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+    return size
+
 
 class Cache:
     """
     Cache.
     """
 
-    def __init__(self, maxsize=1000, ttl=300):
+    def __init__(
+        self,
+        maxsize=1000,
+        ttl=300,
+        stale_ttl=0,
+        xfetch_beta=0.0,
+        on_stale=None,
+        on_remove=None,
+        max_bytes=0,
+        policy="lru",
+        l2=None,
+        stale_if_error=0,
+        adaptive_ttl=None,
+        compress_after=0,
+        codec=None,
+    ):
         """
         Initialize the cache with hit and miss counters.
         :param maxsize: Maximum number of items in the cache.
         :param ttl: Time-to-live for cache entries in seconds.
+        :param stale_ttl: Seconds after expiry during which the stale value is
+            still served while a revalidation runs in the background.
+        :param xfetch_beta: XFetch early expiry factor; 0 disables early refresh.
+        :param on_stale: Callback receiving a key that needs revalidation.
+        :param on_remove: Callback receiving a key removed from memory, so
+            anything derived from its value can be dropped with it.
+        :param max_bytes: Memory budget for cached values; 0 disables it.
+        :param policy: Eviction policy name ("lru", "fifo", "tinylfu") or instance.
+        :param l2: Optional second tier, such as a DiskCache or a SharedCache.
+        :param stale_if_error: Seconds after the stale window during which an
+            expired value is kept to be served by get_stale when the upstream
+            is unavailable.
+        :param adaptive_ttl: Optional AdaptiveTTL learning per-key TTLs from
+            whether revalidated entries changed.
+        :param compress_after: Seconds an entry must go unread before compact
+            stores it compressed; 0 disables compression.
+        :param codec: Codec for compressed entries; defaults to ZlibCodec.
         """
         self.store = OrderedDict()
         self.etags = {}
+        self.params = {}
+        self.ttls = {}
+        self.compute_times = {}
+        self.access_counts = {}
+        self.last_accessed = {}
+        self.revalidating = set()
+        self.sizes = {}
+        self.current_bytes = 0
+        self.max_bytes = max_bytes
+        self.evictions = {
+            "maxsize": 0,
+            "max_bytes": 0,
+            "expired": 0,
+            "too_large": 0,
+            "invalidated": 0,
+        }
         self.maxsize = maxsize
+        self.policy = make_policy(policy, maxsize)
         self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stale_if_error = stale_if_error
+        self.adaptive_ttl = adaptive_ttl
+        self.compress_after = compress_after
+        self.codec = codec or ZlibCodec()
+        self.xfetch_beta = xfetch_beta
+        self.on_stale = on_stale
+        self.on_remove = on_remove
+        self.l2 = l2
+        self.l2_hit_count = 0
+        self.l2_synced_at = None
+        self.containment_hit_count = 0
         self.hit_count = 0
         self.miss_count = 0
+        self.stale_hit_count = 0
+        self.stale_if_error_hit_count = 0
+        self.early_refresh_count = 0
+        self.revalidation_count = 0
+        self.compression_count = 0
+        self.decompression_count = 0
 
     def get(self, key: str):
         """
         Get a value from the cache, including its Etag.
+        Within the stale window the expired value is returned and a
+        revalidation is scheduled. Entries only found in the second tier are
+        promoted to memory, as are entries another process updated in a
+        shared second tier.
         """
+        if self.l2 is not None and (key not in self.store or self._l2_is_newer(key)):
+            self._promote(key)
+
         if key in self.store:
             value, timestamp = self.store[key]
-            if time.time() - timestamp < self.ttl:
+            now = time.time()
+            age = now - timestamp
+            ttl = self.entry_ttl(key)
+            self.access_counts[key] = self.access_counts.get(key, 0) + 1
+            self.last_accessed[key] = now
+            if age < ttl + self.stale_ttl:
+                self.policy.access(key)
+            if age < ttl:
+                self.hit_count += 1
+                if self._should_refresh_early(key, age):
+                    self.early_refresh_count += 1
+                    self._revalidate(key)
+                return self._expand(key, value, timestamp)
+
+            if age < ttl + self.stale_ttl:
                 self.hit_count += 1
-                return value
+                self.stale_hit_count += 1
+                self._revalidate(key)
+                return self._expand(key, value, timestamp)
+
+            if age < ttl + self.stale_ttl + self.stale_if_error:
+                # Kept for get_stale in case the upstream fails
+                self.miss_count += 1
+                return None
 
-            self.store.pop(key)
-            self.etags.pop(key, None)
+            self._remove(key)
+            if self.l2 is not None:
+                self.l2.delete(key)
+            self.evictions["expired"] += 1
             self.miss_count += 1
             return None
 
         self.miss_count += 1
         return None
 
-    def set(self, key: str, value: dict, etag: str = ""):
+    def set(
+        self,
+        key: str,
+        value: dict,
+        etag: str = "",
+        compute_time: float = None,
+        params: dict = None,
+        ttl: float = None,
+    ):
         """
         Add or update a value in the cache with the current timestamp.
-        Evicts the oldest item if the cache exceeds maxsize.
+        Evicts the policy's victims while the cache exceeds maxsize or max_bytes.
+        :param compute_time: Seconds it took to produce the value, used by
+            XFetch to decide how early to refresh it.
+        :param params: Query parameters the value was fetched with.
+        :param ttl: Time-to-live for this entry instead of the cache's. Such
+            entries are kept in memory only.
+        """
+        timestamp = time.time()
+        previous_etag = self.etags.get(key) if key in self.store else None
+        if previous_etag and etag:
+            self._record_change(key, etag != previous_etag)
+        if not self._insert(key, value, etag, timestamp, params):
+            return
+        if compute_time is not None:
+            self.compute_times[key] = compute_time
+        if ttl is not None:
+            self.ttls[key] = ttl
+            if self.l2 is not None:
+                self.l2.delete(key)
+            return
+        self.ttls.pop(key, None)
+        if self.l2 is not None:
+            self.l2.put(
+                key,
+                value,
+                self.etags.get(key, ""),
+                timestamp,
+                self.params.get(key),
+            )
+
+    def _insert(
+        self, key: str, value, etag: str, timestamp: float, params: dict = None
+    ) -> bool:
+        """
+        Store an entry in memory, evicting as needed.
+        :return: False if the value is too large to be cached.
         """
+        size = estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            # Storing it would evict everything else and still be over budget
+            self._remove(key)
+            self.evictions["too_large"] += 1
+            logger.info("Rejected key: %s (%d bytes)", key, size)
+            return False
+
         if key in self.store:
-            self.store.move_to_end(key)  # Mark as recently accessed
-        self.store[key] = (value, time.time())
+            self.policy.access(key)
+        else:
+            self.policy.insert(key)
+        self.store[key] = (value, timestamp)
         if etag:
             self.etags[key] = etag
+        if params is not None:
+            self.params[key] = params
+        if self.max_bytes:
+            self.current_bytes += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+
+        while len(self.store) > self.maxsize:
+            self._evict("maxsize")
+        while self.max_bytes and self.current_bytes > self.max_bytes:
+            self._evict("max_bytes")
+        return key in self.store
+
+    def _promote(self, key: str):
+        """
+        Copy an entry that is still servable from the second tier to memory.
+        Entries stored without their query parameters, by older versions,
+        are dropped since they cannot be refreshed or delta synced.
+        """
+        entry = self.l2.get(key)
+        if entry is None:
+            return
+        value, etag, timestamp, params = entry
+        if params is None:
+            self.l2.delete(key)
+            return
+        if time.time() - timestamp >= self.entry_ttl(key) + self.stale_ttl:
+            self.l2.delete(key)
+            return
+        if self._insert(key, value, etag, timestamp, params):
+            self.l2_hit_count += 1
+
+    def _l2_is_newer(self, key: str) -> bool:
+        """
+        Whether a shared second tier holds a newer version of an entry.
+        """
+        if not self.l2.shared:
+            return False
+        timestamp = self.l2.timestamp(key)
+        return timestamp is not None and timestamp > self.store[key][1]
+
+    def restore(self) -> int:
+        """
+        Load the newest servable entries from the second tier into memory.
+        :return: Number of entries restored.
+        """
+        if self.l2 is None:
+            return 0
+        restored = self._load_l2(time.time() - self.ttl - self.stale_ttl)
+        logger.info("Restored %d entries from the second tier.", restored)
+        return restored
+
+    def sync_shared(self) -> int:
+        """
+        Load the entries other processes wrote to a shared second tier since
+        the last sync, so keys only other workers fetched are refreshed and
+        delta synced as well.
+        :return: Number of entries loaded.
+        """
+        if self.l2 is None or not self.l2.shared:
+            return 0
+        now = time.time()
+        min_timestamp = now - self.ttl - self.stale_ttl
+        if self.l2_synced_at is not None:
+            min_timestamp = max(min_timestamp, self.l2_synced_at)
+        self.l2_synced_at = now
+        return self._load_l2(min_timestamp)
+
+    def _load_l2(self, min_timestamp: float) -> int:
+        """
+        Copy the newest second tier entries written after min_timestamp to
+        memory, unless memory already holds the same or a newer version.
+        Entries without query parameters are skipped, as in _promote.
+        :return: Number of entries loaded.
+        """
+        entries = self.l2.load(self.maxsize, min_timestamp)
+        # Insert oldest first so the newest entries are the most recently used
+        loaded = 0
+        for key, value, etag, timestamp, params in reversed(entries):
+            if params is None:
+                continue
+            if key in self.store and self.store[key][1] >= timestamp:
+                continue
+            if self._insert(key, value, etag, timestamp, params):
+                loaded += 1
+        return loaded
+
+    def _evict(self, reason: str):
+        """
+        Evict the entry chosen by the eviction policy.
+        """
+        evicted_key = self.policy.victim()
+        self._remove(evicted_key)
+        self.evictions[reason] += 1
+        logger.info("Evicted key: %s (%s)", evicted_key, reason)
+
+    def expires_in(self, key: str, now: float = None):
+        """
+        Seconds until an entry expires; negative once it is past its TTL.
+        Returns None for unknown keys.
+        """
+        if key not in self.store:
+            return None
+        _, timestamp = self.store[key]
+        now = time.time() if now is None else now
+        return timestamp + self.entry_ttl(key) - now
+
+    def entry_ttl(self, key: str) -> float:
+        """
+        Time-to-live of an entry: its own TTL if it was set with one, else
+        the learned TTL if adaptive TTLs are enabled, else the cache's.
+        """
+        if key in self.ttls:
+            return self.ttls[key]
+        if self.adaptive_ttl is not None:
+            return self.adaptive_ttl.ttl_for(key)
+        return self.ttl
+
+    def refreshable(self, key: str) -> bool:
+        """
+        Whether an entry is refreshed ahead of or after expiry. Entries set
+        with their own TTL, such as empty and Not Found responses, are left
+        to expire instead, so a miss is not fetched again on every cycle.
+        """
+        return key not in self.ttls
+
+    def _record_change(self, key: str, changed: bool):
+        """
+        Feed a revalidation outcome to the adaptive TTLs.
+        """
+        if self.adaptive_ttl is not None:
+            self.adaptive_ttl.record(key, changed)
+
+    def get_stale(self, key: str):
+        """
+        Get a value that may be expired, as long as it is within the
+        stale-if-error window. Used when the upstream cannot be reached.
+        """
+        if key not in self.store:
+            return None
+        value, timestamp = self.store[key]
+        age = time.time() - timestamp
+        if age >= self.entry_ttl(key) + self.stale_ttl + self.stale_if_error:
+            return None
+        self.stale_if_error_hit_count += 1
+        return self._expand(key, value, timestamp)
+
+    def peek(self, key: str):
+        """
+        Get a fresh value without counting a hit or miss or changing its recency.
+        """
+        if key not in self.store:
+            return None
+        value, timestamp = self.store[key]
+        if time.time() - timestamp >= self.entry_ttl(key):
+            return None
+        return self._expand(key, value, timestamp)
+
+    def servable(self, key: str) -> bool:
+        """
+        Whether get would answer a key from memory or a shared second tier,
+        fresh or within the stale window, without counting a hit or miss or
+        decoding it.
+        """
+        if key in self.store:
+            return self.expires_in(key) + self.stale_ttl > 0
+        if self.l2 is None or not self.l2.shared:
+            return False
+        timestamp = self.l2.timestamp(key)
+        return (
+            timestamp is not None
+            and time.time() - timestamp < self.entry_ttl(key) + self.stale_ttl
+        )
+
+    def entry(self, key: str):
+        """
+        Get the value and timestamp of an entry regardless of its age, without
+        counting a hit or miss. A compressed value is decoded but stays
+        compressed in the cache.
+        :return: A (value, timestamp) tuple, or None for unknown keys.
+        """
+        if key not in self.store:
+            return None
+        value, timestamp = self.store[key]
+        if isinstance(value, Compressed):
+            value = self.codec.decode(value.data)
+        return value, timestamp
+
+    def cold_entries(self, now: float = None) -> list:
+        """
+        Get the uncompressed entries that were not read for compress_after
+        seconds.
+        :return: List of (key, value) tuples.
+        """
+        if not self.compress_after:
+            return []
+        now = time.time() if now is None else now
+        return [
+            (key, value)
+            for key, (value, timestamp) in self.store.items()
+            if not isinstance(value, Compressed)
+            and now - self.last_accessed.get(key, timestamp) >= self.compress_after
+        ]
+
+    def store_compressed(self, key: str, value, data: bytes) -> bool:
+        """
+        Replace an entry's value with its encoded form, unless the entry was
+        replaced or removed since it was encoded.
+        :param value: The value that was encoded.
+        :param data: The value encoded with the cache's codec.
+        :return: True if the entry was compressed.
+        """
+        entry = self.store.get(key)
+        if entry is None or entry[0] is not value:
+            return False
+        compressed = Compressed(data)
+        self.store[key] = (compressed, entry[1])
+        if self.max_bytes:
+            size = sys.getsizeof(data)
+            self.current_bytes += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+        self.compression_count += 1
+        return True
+
+    def compact(self, now: float = None) -> list:
+        """
+        Compress the entries that were not read for compress_after seconds.
+        They are decoded again on their next read. Encodes on the calling
+        thread; cache_compaction_runner encodes off the event loop instead.
+        :return: Keys of the entries compressed.
+        """
+        compressed = [
+            key
+            for key, value in self.cold_entries(now)
+            if self.store_compressed(key, value, self.codec.encode(value))
+        ]
+        if compressed:
+            logger.info("Compressed %d cold entries.", len(compressed))
+        return compressed
+
+    def _expand(self, key: str, value, timestamp: float):
+        """
+        Decode a compressed value that is being read and keep it expanded.
+        """
+        if not isinstance(value, Compressed):
+            return value
+        value = self.codec.decode(value.data)
+        self.store[key] = (value, timestamp)
+        self.decompression_count += 1
+        if self.max_bytes:
+            size = estimate_size(value)
+            self.current_bytes += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+            while self.current_bytes > self.max_bytes:
+                self._evict("max_bytes")
+        return value
+
+    def record_containment_hit(self):
+        """
+        Count a miss that was answered from a cached page covering it.
+        """
+        self.containment_hit_count += 1
+
+    def touch(self, key: str):
+        """
+        Reset the timestamp of an entry that was revalidated as unchanged.
+        """
+        if key in self.store:
+            self._record_change(key, False)
+            value, _ = self.store[key]
+            timestamp = time.time()
+            self.store[key] = (value, timestamp)
+            if self.l2 is not None:
+                self.l2.touch(key, timestamp)
+
+    def patch(self, key: str, value: dict):
+        """
+        Replace an entry with a locally patched value.
+        Its Etag is dropped since it no longer matches the upstream body.
+        """
+        if key in self.store:
+            self._record_change(key, True)
+        self.etags.pop(key, None)
+        self.set(key, value)
+
+    def invalidate(self, key: str):
+        """
+        Remove an entry whose value is known to be outdated.
+        """
+        if key in self.store:
+            self._record_change(key, True)
+            self._remove(key)
+            self.evictions["invalidated"] += 1
+        if self.l2 is not None:
+            self.l2.delete(key)
+
+    def end_revalidation(self, key: str):
+        """
+        Mark the background revalidation of a key as finished.
+        """
+        self.revalidating.discard(key)
 
-        if len(self.store) > self.maxsize:
-            # Evict the oldest entry
-            evicted_key, _ = self.store.popitem(last=False)
-            self.etags.pop(evicted_key, None)  # Remove the associated Etag
-            logger.info("Evicted key: %s", evicted_key)
+    def _should_refresh_early(self, key: str, age: float) -> bool:
+        """
+        Decide whether a fresh entry should be refreshed early (XFetch).
+        Entries that are slower to compute and closer to expiry are more
+        likely to be refreshed.
+        """
+        if not self.xfetch_beta or self.on_stale is None:
+            return False
+        if not self.refreshable(key):
+            return False
+        compute_time = self.compute_times.get(key, 1.0)
+        # 1 - random() is in (0, 1], so the logarithm is always defined
+        gap = -compute_time * self.xfetch_beta * math.log(1.0 - random.random())
+        return age + gap >= self.entry_ttl(key)
+
+    def _revalidate(self, key: str):
+        """
+        Schedule a revalidation for a key unless one is already running.
+        """
+        if self.on_stale is None or key in self.revalidating:
+            return
+        if not self.refreshable(key):
+            return
+        self.revalidating.add(key)
+        self.revalidation_count += 1
+        try:
+            if self.on_stale(key) is False:
+                self.revalidating.discard(key)
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.revalidating.discard(key)
+            logger.exception("Failed to schedule revalidation for key: %s", key)
+
+    def _remove(self, key: str):
+        """
+        Remove an entry and its metadata.
+        """
+        removed = self.store.pop(key, None) is not None
+        self.policy.remove(key)
+        self.etags.pop(key, None)
+        self.params.pop(key, None)
+        self.ttls.pop(key, None)
+        self.compute_times.pop(key, None)
+        self.current_bytes -= self.sizes.pop(key, 0)
+        self.access_counts.pop(key, None)
+        self.last_accessed.pop(key, None)
+        if removed and self.on_remove is not None:
+            self.on_remove(key)
 
     def keys(self):
         """
@@ -75,6 +601,12 @@ class Cache:
         """
         return self.etags.get(key)
 
+    def get_params(self, key):
+        """
+        Get the query parameters a cached item was fetched with.
+        """
+        return self.params.get(key)
+
     def stats(self):
         """
         Get cache statistics.
@@ -82,31 +614,110 @@ class Cache:
         """
         total_requests = self.hit_count + self.miss_count
         hit_ratio = self.hit_count / max(1, total_requests)
+        effective_hits = self.hit_count + self.containment_hit_count
         return {
             "hits": self.hit_count,
             "misses": self.miss_count,
             "total_requests": total_requests,
             "hit_ratio": hit_ratio,
+            "containment_hits": self.containment_hit_count,
+            "effective_hit_ratio": effective_hits / max(1, total_requests),
+            "stale_hits": self.stale_hit_count,
+            "stale_if_error_hits": self.stale_if_error_hit_count,
+            "early_refreshes": self.early_refresh_count,
+            "revalidations": self.revalidation_count,
+            "l2_hits": self.l2_hit_count,
+            "compressed_entries": sum(
+                isinstance(value, Compressed) for value, _ in self.store.values()
+            ),
+            "compressions": self.compression_count,
+            "decompressions": self.decompression_count,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "largest_entries": self.largest_entries(),
+            "evictions": dict(self.evictions),
         }
 
+    def largest_entries(self, count: int = 5):
+        """
+        Return the largest entries as (key, bytes) pairs, largest first.
+        """
+        return heapq.nlargest(count, self.sizes.items(), key=lambda item: item[1])
+
     def clear(self):
         """
         Clear the cache and reset counters.
         """
+        removed = list(self.store) if self.on_remove is not None else []
         self.store.clear()
+        self.policy.clear()
         self.etags.clear()
+        self.params.clear()
+        self.ttls.clear()
+        self.compute_times.clear()
+        self.access_counts.clear()
+        self.last_accessed.clear()
+        self.revalidating.clear()
+        self.sizes.clear()
+        self.current_bytes = 0
+        self.evictions = dict.fromkeys(self.evictions, 0)
         self.hit_count = 0
         self.miss_count = 0
+        self.stale_hit_count = 0
+        self.stale_if_error_hit_count = 0
+        self.early_refresh_count = 0
+        self.revalidation_count = 0
+        self.l2_hit_count = 0
+        self.containment_hit_count = 0
+        self.compression_count = 0
+        self.decompression_count = 0
+        if self.adaptive_ttl is not None:
+            self.adaptive_ttl.clear()
+        if self.l2 is not None:
+            self.l2.clear()
+        for key in removed:
+            self.on_remove(key)
         logger.info("Cache cleared.")
 
 
+def canonical_params(params: dict) -> dict:
+    """
+    Normalize query parameters so equivalent requests compare equal.
+
+    Empty values are dropped, the Marvel API's defaults are applied, id
+    lists are sorted and deduplicated and case-insensitive names are
+    case-folded.
+    :param params: Dictionary of query parameters.
+    :return: The canonical parameters.
+    """
+    canonical = {}
+    for key, value in params.items():
+        if value is None or value == "" or value == [] or value == ():
+            continue
+        if key in ID_LIST_PARAMS:
+            value = sorted({int(id_) for id_ in value})
+        elif key in CASE_INSENSITIVE_PARAMS:
+            value = value.casefold()
+        canonical[key] = value
+    for key, default in DEFAULT_PARAMS.items():
+        canonical[key] = int(canonical.get(key) or default)
+    return canonical
+
+
+def hash_params(params: dict) -> str:
+    """
+    Hash parameters into a fixed-size key.
+    """
+    encoded = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
 def generate_cache_key(params: dict) -> str:
     """
-    Generate a unique cache key for API caching based on query parameters.
+    Generate a cache key for API caching based on query parameters.
+    Equivalent requests share a key; see canonical_params.
 
     :param params: Dictionary of query parameters.
-    :return: A unique string representing the cache key.
+    :return: A 32 character hexadecimal cache key.
     """
-    # Sort parameters to ensure consistent ordering
-    sorted_params = {k: v for k, v in sorted(params.items()) if v is not None}
-    return urlencode(sorted_params, doseq=True)
+    return hash_params(canonical_params(params))
@@ -0,0 +1,234 @@
+"""
+Eviction and admission policies for the cache.
+"""
+
+from collections import OrderedDict
+
+
+class FIFOPolicy:
+    """
+    Evict entries in insertion order.
+    """
+
+    def __init__(self, maxsize=1000):
+        """
+        Initialize the policy.
+        :param maxsize: Maximum number of items in the cache.
+        """
+        self.maxsize = maxsize
+        self.order = OrderedDict()
+
+    def insert(self, key: str):
+        """
+        Record a new key.
+        """
+        self.order[key] = None
+
+    def access(self, key: str):
+        """
+        Record a hit on a key.
+        """
+
+    def remove(self, key: str):
+        """
+        Forget a key that left the cache.
+        """
+        self.order.pop(key, None)
+
+    def victim(self) -> str:
+        """
+        Return the key to evict next.
+        """
+        return next(iter(self.order))
+
+    def clear(self):
+        """
+        Forget all keys.
+        """
+        self.order.clear()
+
+
+class LRUPolicy(FIFOPolicy):
+    """
+    Evict the least recently used entry.
+    """
+
+    def access(self, key: str):
+        """
+        Record a hit on a key.
+        """
+        if key in self.order:
+            self.order.move_to_end(key)
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counter with periodic aging.
+
+    Counters saturate at 15 and are halved once the number of increments
+    reaches the sample size, so old popularity fades over time.
+    """
+
+    SEEDS = (0x9E3779B9, 0x85EBCA6B, 0xC2B2AE35, 0x27D4EB2F)
+    MAX_COUNT = 15
+
+    def __init__(self, capacity=1000):
+        """
+        Initialize the sketch for a cache of the given capacity.
+        :param capacity: Expected number of distinct hot keys.
+        """
+        width = 1
+        while width < max(256, capacity):
+            width <<= 1
+        self.mask = width - 1
+        self.rows = [[0] * width for _ in self.SEEDS]
+        self.sample_size = 10 * max(1, capacity)
+        self.additions = 0
+
+    def _indexes(self, key: str):
+        """
+        Return the counter index of a key in each row.
+        """
+        key_hash = hash(key)
+        return [(key_hash ^ seed) * 0x9E3779B1 >> 7 & self.mask for seed in self.SEEDS]
+
+    def increment(self, key: str):
+        """
+        Count one occurrence of a key.
+        """
+        for row, index in zip(self.rows, self._indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._reset()
+
+    def frequency(self, key: str) -> int:
+        """
+        Return the estimated frequency of a key.
+        """
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def _reset(self):
+        """
+        Halve every counter.
+        """
+        for row in self.rows:
+            for index, count in enumerate(row):
+                row[index] = count >> 1
+        self.additions //= 2
+
+
+class WTinyLFUPolicy:
+    """
+    Window TinyLFU eviction and admission.
+
+    New keys enter a small LRU window. Keys leaving the window join the
+    probation segment of a segmented LRU, and when the cache is full the
+    newcomer only displaces the probation victim if the frequency sketch has
+    seen it more often. Hits in probation promote a key to the protected
+    segment. One-off keys, such as crawler scans, are therefore evicted
+    before they can push out frequently used ones.
+    """
+
+    def __init__(self, maxsize=1000, window_ratio=0.01, protected_ratio=0.8):
+        """
+        Initialize the policy.
+        :param maxsize: Maximum number of items in the cache.
+        :param window_ratio: Share of the cache used by the admission window.
+        :param protected_ratio: Share of the main segment that is protected.
+        """
+        self.maxsize = maxsize
+        self.window_size = max(1, int(maxsize * window_ratio))
+        self.protected_size = max(
+            1, int((maxsize - self.window_size) * protected_ratio)
+        )
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(maxsize)
+        self.candidate = None
+
+    def insert(self, key: str):
+        """
+        Record a new key in the admission window.
+        """
+        self.sketch.increment(key)
+        self.window[key] = None
+        if len(self.window) > self.window_size:
+            candidate, _ = self.window.popitem(last=False)
+            self.probation[candidate] = None
+            self.candidate = candidate
+
+    def access(self, key: str):
+        """
+        Record a hit on a key.
+        """
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_size:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+
+    def remove(self, key: str):
+        """
+        Forget a key that left the cache.
+        """
+        self.window.pop(key, None)
+        self.probation.pop(key, None)
+        self.protected.pop(key, None)
+        if self.candidate == key:
+            self.candidate = None
+
+    def victim(self) -> str:
+        """
+        Return the key to evict next.
+        The last key to leave the window competes with the probation victim.
+        """
+        candidate, self.candidate = self.candidate, None
+        for segment in (self.probation, self.protected, self.window):
+            if segment:
+                victim = next(iter(segment))
+                break
+        if candidate is None or candidate == victim or candidate not in self.probation:
+            return victim
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            return victim
+        return candidate
+
+    def clear(self):
+        """
+        Forget all keys and their frequencies.
+        """
+        self.window.clear()
+        self.probation.clear()
+        self.protected.clear()
+        self.sketch = CountMinSketch(self.maxsize)
+        self.candidate = None
+
+
+POLICIES = {
+    "fifo": FIFOPolicy,
+    "lru": LRUPolicy,
+    "tinylfu": WTinyLFUPolicy,
+}
+
+
+def make_policy(policy, maxsize: int):
+    """
+    Build an eviction policy from its name, or return a policy instance as-is.
+    :param policy: One of ``POLICIES`` or an object with the policy methods.
+    :param maxsize: Maximum number of items in the cache.
+    """
+    if not isinstance(policy, str):
+        return policy
+    try:
+        return POLICIES[policy.lower()](maxsize=maxsize)
+    except KeyError as e:
+        raise ValueError(f"Unknown cache policy: {policy}") from e
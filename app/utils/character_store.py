@@ -0,0 +1,332 @@
+"""
+Local character store with name, modified and resource indexes.
+"""
+
+from bisect import bisect_left, insort
+import logging
+import time
+
+from app.utils.inverted_index import RESOURCE_TYPES, InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+# Query parameters the store can answer on its own
+SUPPORTED_PARAMS = {"name", "name_starts_with", "order_by", "limit", "offset"}
+SUPPORTED_PARAMS.update(RESOURCE_TYPES)
+ORDERS = {"", "name", "-name", "modified", "-modified"}
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def empty_response(params: dict, attribution: dict = None, code: int = 200) -> dict:
+    """
+    Build a Marvel API response with no results for a query.
+    """
+    return {
+        **(attribution or {}),
+        "code": code,
+        "data": {
+            "offset": int(params.get("offset") or 0),
+            "limit": int(params.get("limit") or DEFAULT_LIMIT),
+            "total": 0,
+            "count": 0,
+            "results": [],
+        },
+    }
+
+
+class CharacterStore:
+    """
+    In-memory mirror of the Marvel character catalog.
+
+    Characters are keyed by id, with a sorted index on lowercase name for
+    exact and prefix lookups, a sorted index on the modified date for
+    ordering and inverted indexes for the comics, series, events and
+    stories filters. Name queries are only answered once the mirror is
+    complete; filter queries once the posting lists of their ids are.
+    """
+
+    def __init__(self, name_filter=None):
+        """
+        Initialize an empty store.
+        :param name_filter: Optional BloomFilter fed with every character name,
+            used to rule out names that do not exist.
+        """
+        self.characters = {}
+        self.name_index = []
+        self.modified_index = []
+        self.attribution = {}
+        self.filters = InvertedIndex()
+        self.complete = False
+        self.synced_at = None
+        self.name_filter = name_filter
+        self.hit_count = 0
+        self.fallback_count = 0
+        self.excluded_count = 0
+
+    def upsert(self, results: list):
+        """
+        Add or replace characters and update the indexes.
+        :param results: Character results from the Marvel API.
+        """
+        for result in results:
+            character_id = result.get("id")
+            if character_id is None:
+                continue
+            previous = self.characters.get(character_id)
+            if previous is not None:
+                self._unindex(character_id, previous)
+            self.characters[character_id] = result
+            if self.name_filter is not None:
+                self.name_filter.add(result.get("name", "").casefold())
+            insort(self.name_index, (result.get("name", "").casefold(), character_id))
+            insort(self.modified_index, (result.get("modified", ""), character_id))
+            self.filters.add(result)
+
+    def _unindex(self, character_id: int, result: dict):
+        """
+        Remove a character's index entries.
+        """
+        for index, value in (
+            (self.name_index, result.get("name", "").casefold()),
+            (self.modified_index, result.get("modified", "")),
+        ):
+            position = bisect_left(index, (value, character_id))
+            if position < len(index) and index[position] == (value, character_id):
+                del index[position]
+
+    def load(self, api_response: dict):
+        """
+        Add a page of characters from a Marvel API response.
+        Only successful responses replace the attribution served with
+        local answers.
+        """
+        if api_response.get("code") == 200:
+            self.attribution = {
+                key: api_response[key]
+                for key in (
+                    "code",
+                    "status",
+                    "copyright",
+                    "attributionText",
+                    "attributionHTML",
+                )
+                if key in api_response
+            }
+        self.upsert(api_response.get("data", {}).get("results", []))
+
+    def observe(self, params: dict, api_response: dict):
+        """
+        Index a page received from the Marvel API for the given query.
+
+        A page holding every character of an otherwise unfiltered query
+        for a single comic, series, event or story id gives the complete
+        posting list for that id.
+        """
+        self.load(api_response)
+        filters = self._filters(params)
+        if len(filters) != 1 or params.get("name") or params.get("name_starts_with"):
+            return
+        if params.get("modified_since") or params.get("offset"):
+            return
+        ((resource_type, ids),) = filters.items()
+        data = api_response.get("data", {})
+        if len(ids) == 1 and data.get("count", 0) >= data.get("total", 0):
+            self.filters.set_complete(
+                resource_type,
+                ids[0],
+                [result["id"] for result in data.get("results", []) if "id" in result],
+            )
+
+    @staticmethod
+    def _filters(params: dict) -> dict:
+        """
+        Get the resource filters of a query, by resource type.
+        """
+        return {
+            resource_type: list(params[resource_type])
+            for resource_type in RESOURCE_TYPES
+            if params.get(resource_type)
+        }
+
+    def mark_complete(self):
+        """
+        Mark the mirror as holding the full catalog.
+        """
+        self.complete = True
+        self.synced_at = time.time()
+        logger.info("[CharacterStore] Mirror complete with %d characters.", len(self))
+
+    def excludes(self, name: str) -> bool:
+        """
+        Check whether no character can have the given name.
+        Only possible with a name filter built from the complete catalog.
+        """
+        if not name or self.name_filter is None or not self.complete:
+            return False
+        if name.casefold() in self.name_filter:
+            return False
+        self.excluded_count += 1
+        return True
+
+    def empty_response(self, params: dict) -> dict:
+        """
+        Build a response with no results for a query.
+        """
+        return empty_response(params, self.attribution)
+
+    def __len__(self):
+        return len(self.characters)
+
+    def can_answer(self, params: dict) -> bool:
+        """
+        Check whether a query can be answered from the mirror.
+        """
+        for key, value in params.items():
+            if value and key not in SUPPORTED_PARAMS:
+                return False
+        if (params.get("order_by") or "") not in ORDERS:
+            return False
+
+        filters = self._filters(params)
+        if not filters:
+            return self.complete
+        return all(
+            self.filters.is_complete(resource_type, ids, self.complete)
+            for resource_type, ids in filters.items()
+        )
+
+    def query(self, params: dict):
+        """
+        Answer a query in the Marvel API response format.
+        :param params: Query parameters as passed to get_marvel_characters.
+        :return: The response dict, or None if the mirror cannot answer it.
+        """
+        if not self.can_answer(params):
+            self.fallback_count += 1
+            return None
+
+        name = (params.get("name") or "").casefold()
+        prefix = (params.get("name_starts_with") or "").casefold()
+        order_by = params.get("order_by") or "name"
+        limit = min(int(params.get("limit") or DEFAULT_LIMIT), MAX_LIMIT)
+        offset = int(params.get("offset") or 0)
+
+        filters = self._filters(params)
+        if filters:
+            ids = self._match_filters(filters, name, prefix)
+        elif name:
+            ids = self._match_names(name, exact=True)
+        elif prefix:
+            ids = self._match_names(prefix, exact=False)
+        else:
+            ids = None
+
+        if filters and order_by.lstrip("-") == "modified":
+            ordered = sorted(
+                ids,
+                key=lambda character_id: (
+                    self.characters[character_id].get("modified", ""),
+                    character_id,
+                ),
+            )
+        elif order_by.lstrip("-") == "modified":
+            ordered = [entry[1] for entry in self.modified_index]
+            if ids is not None:
+                matched = set(ids)
+                ordered = [
+                    character_id for character_id in ordered if character_id in matched
+                ]
+        else:
+            ordered = (
+                ids if ids is not None else [entry[1] for entry in self.name_index]
+            )
+        if order_by.startswith("-"):
+            ordered = ordered[::-1]
+
+        page = [
+            self.characters[character_id]
+            for character_id in ordered[offset : offset + limit]
+        ]
+        self.hit_count += 1
+        return {
+            **self.attribution,
+            "data": {
+                "offset": offset,
+                "limit": limit,
+                "total": len(ordered),
+                "count": len(page),
+                "results": page,
+            },
+        }
+
+    def _match_filters(self, filters: dict, name: str, prefix: str) -> list:
+        """
+        Return ids matching the resource filters and name, in name order.
+        """
+        matches = []
+        for character_id in self.filters.match(filters):
+            character = self.characters.get(character_id)
+            if character is None:
+                continue
+            character_name = character.get("name", "").casefold()
+            if name and character_name != name:
+                continue
+            if prefix and not character_name.startswith(prefix):
+                continue
+            matches.append((character_name, character_id))
+        return [character_id for _, character_id in sorted(matches)]
+
+    def _match_names(self, value: str, exact: bool) -> list:
+        """
+        Return ids whose lowercase name equals or starts with value, in name order.
+        """
+        ids = []
+        position = bisect_left(self.name_index, (value,))
+        while position < len(self.name_index):
+            name, character_id = self.name_index[position]
+            matches = name == value if exact else name.startswith(value)
+            if not matches:
+                break
+            ids.append(character_id)
+            position += 1
+        return ids
+
+    def pages(self, page_size: int = 100) -> list:
+        """
+        Split the mirror into pages shaped like Marvel API responses, in
+        name order, so another process can rebuild it with load().
+        :param page_size: Characters per page.
+        """
+        results = [self.characters[character_id] for _, character_id in self.name_index]
+        pages = []
+        for offset in range(0, len(results), page_size):
+            page = results[offset : offset + page_size]
+            pages.append(
+                {
+                    **self.attribution,
+                    "data": {
+                        "offset": offset,
+                        "limit": page_size,
+                        "total": len(results),
+                        "count": len(page),
+                        "results": page,
+                    },
+                }
+            )
+        return pages
+
+    def stats(self):
+        """
+        Get store statistics.
+        :return: Dictionary containing size, completeness, hits and fallbacks.
+        """
+        return {
+            "characters": len(self),
+            "complete": self.complete,
+            "hits": self.hit_count,
+            "fallbacks": self.fallback_count,
+            "excluded_names": self.excluded_count,
+            "filters": self.filters.stats(),
+            "name_filter": self.name_filter.stats() if self.name_filter else None,
+        }
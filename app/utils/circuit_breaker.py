@@ -0,0 +1,145 @@
+"""
+Circuit breaker for failing or slow upstream calls.
+"""
+
+from collections import deque
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling the upstream while the circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker.
+
+    The outcome and latency of the last ``window`` calls are kept. Once at
+    least ``min_calls`` were seen and the share of failed or slow calls
+    reaches ``failure_rate``, the circuit opens and calls fail fast for
+    ``open_seconds``. It then half-opens, letting ``half_open_calls`` trial
+    calls through: a success closes it again, a failure reopens it. Trial
+    calls that never report back are given up on after ``open_seconds``.
+    """
+
+    def __init__(
+        self,
+        window=50,
+        min_calls=10,
+        failure_rate=0.5,
+        slow_call_seconds=5.0,
+        open_seconds=30.0,
+        half_open_calls=1,
+    ):
+        """
+        Initialize a closed circuit.
+        :param window: Number of recent calls considered.
+        :param min_calls: Calls needed in the window before the circuit can open.
+        :param failure_rate: Share of failed or slow calls that opens the circuit.
+        :param slow_call_seconds: Latency above which a call counts as failed.
+        :param open_seconds: Seconds the circuit stays open before half-opening.
+        :param half_open_calls: Trial calls allowed while half-open.
+        """
+        self.calls = deque(maxlen=window)
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_calls = 0
+        self.trial_started = 0.0
+        self.rejected_count = 0
+        self.opened_count = 0
+
+    def allow(self, now: float = None):
+        """
+        Check that a call may go upstream.
+        :raises CircuitOpenError: While the circuit is open, or half-open
+            with all trial calls in flight.
+        """
+        now = time.monotonic() if now is None else now
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self.trial_calls = 0
+            logger.info("[CircuitBreaker] Circuit half-open.")
+        elif self.state == HALF_OPEN and now - self.trial_started >= self.open_seconds:
+            self.trial_calls = 0
+        if self.state == OPEN or (
+            self.state == HALF_OPEN and self.trial_calls >= self.half_open_calls
+        ):
+            self.rejected_count += 1
+            raise CircuitOpenError("Upstream circuit is open.")
+        if self.state == HALF_OPEN:
+            if self.trial_calls == 0:
+                self.trial_started = now
+            self.trial_calls += 1
+
+    def record(self, success: bool, latency: float, now: float = None):
+        """
+        Record the outcome of a call.
+        :param success: Whether the upstream answered without a server error.
+        :param latency: Seconds the call took.
+        """
+        failed = not success or latency > self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if failed:
+                self._open(now)
+            else:
+                self.state = CLOSED
+                self.calls.clear()
+                logger.info("[CircuitBreaker] Circuit closed.")
+            return
+
+        self.calls.append((failed, latency))
+        if self.state == CLOSED and len(self.calls) >= self.min_calls:
+            failures = sum(failed for failed, _ in self.calls)
+            if failures / len(self.calls) >= self.failure_rate:
+                self._open(now)
+
+    def _open(self, now: float = None):
+        """
+        Open the circuit.
+        """
+        self.state = OPEN
+        self.opened_at = time.monotonic() if now is None else now
+        self.opened_count += 1
+        self.calls.clear()
+        logger.warning(
+            "[CircuitBreaker] Circuit opened for %.0f seconds.", self.open_seconds
+        )
+
+    def latency_percentile(self, percentile: float):
+        """
+        Latency percentile of the successful calls in the window.
+        :return: Seconds, or None before min_calls successful calls were seen.
+        """
+        latencies = sorted(latency for failed, latency in self.calls if not failed)
+        if len(latencies) < self.min_calls:
+            return None
+        return latencies[min(len(latencies) - 1, int(percentile * len(latencies)))]
+
+    def stats(self):
+        """
+        Get circuit breaker statistics.
+        :return: Dictionary containing state, window failure rate and counters.
+        """
+        failures = sum(failed for failed, _ in self.calls)
+        return {
+            "state": self.state,
+            "window_calls": len(self.calls),
+            "window_failure_rate": failures / max(1, len(self.calls)),
+            "p95_ms": (self.latency_percentile(0.95) or 0.0) * 1000,
+            "opened": self.opened_count,
+            "rejected": self.rejected_count,
+        }
@@ -0,0 +1,46 @@
+"""
+Codecs for storing cold cache entries as compact bytes.
+"""
+
+import json
+import zlib
+
+
+class Compressed:
+    """
+    An encoded cache value, told apart from values that are bytes themselves.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+class ZlibCodec:
+    """
+    Encodes JSON-like values as zlib-compressed JSON.
+
+    Any object with the same ``encode`` and ``decode`` methods can be used
+    as a cache codec instead.
+    """
+
+    def __init__(self, level=6):
+        """
+        Initialize the codec.
+        :param level: zlib compression level, from 1 (fastest) to 9 (smallest).
+        """
+        self.level = level
+
+    def encode(self, value) -> bytes:
+        """
+        Encode a value into compressed bytes.
+        """
+        encoded = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        return zlib.compress(encoded.encode(), self.level)
+
+    def decode(self, data: bytes):
+        """
+        Decode bytes produced by encode.
+        """
+        return json.loads(zlib.decompress(data))
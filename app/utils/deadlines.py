@@ -0,0 +1,43 @@
+"""
+Accounting of RPCs that gave up waiting on the upstream.
+"""
+
+
+class DeadlineTracker:
+    """
+    Counts RPCs whose deadline passed or that were cancelled while waiting
+    on an upstream call.
+
+    Each RPC enforces its own deadline on its wait for the call; the call
+    itself keeps the full upstream timeout, since other RPCs with more time
+    left may share it.
+    """
+
+    def __init__(self):
+        """
+        Initialize the counters.
+        """
+        self.exceeded_count = 0
+        self.cancelled_count = 0
+
+    def record_exceeded(self):
+        """
+        Count an RPC whose deadline passed while waiting on the upstream.
+        """
+        self.exceeded_count += 1
+
+    def record_cancelled(self):
+        """
+        Count an RPC cancelled while waiting on the upstream.
+        """
+        self.cancelled_count += 1
+
+    def stats(self):
+        """
+        Get deadline statistics.
+        :return: Dictionary containing exceeded and cancelled counts.
+        """
+        return {
+            "exceeded": self.exceeded_count,
+            "cancelled": self.cancelled_count,
+        }
@@ -0,0 +1,219 @@
+"""
+Delta sync for patching cached queries with recently modified characters.
+"""
+
+import hashlib
+import json
+import logging
+import time
+
+from app.utils.inverted_index import RESOURCE_TYPES, resource_id
+
+logger = logging.getLogger(__name__)
+
+
+def format_modified_since(timestamp: float) -> str:
+    """
+    Format a timestamp as a Marvel API modifiedSince value.
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%S+0000", time.gmtime(timestamp))
+
+
+def _wanted_ids(value) -> set:
+    """
+    Get the resource ids of a filter value, given as a list or comma-separated.
+    """
+    values = value if isinstance(value, (list, tuple)) else str(value).split(",")
+    return {int(id_) for id_ in values if str(id_).strip().isdigit()}
+
+
+def matches(params: dict, character: dict):
+    """
+    Check whether a character matches a query's filters.
+    :return: True or False, or None if a truncated resource list leaves it open.
+    """
+    name = character.get("name", "").lower()
+    if params.get("name") and name != str(params["name"]).lower():
+        return False
+    prefix = params.get("name_starts_with")
+    if prefix and not name.startswith(str(prefix).lower()):
+        return False
+
+    for resource_type in RESOURCE_TYPES:
+        wanted = _wanted_ids(params.get(resource_type) or [])
+        if not wanted:
+            continue
+        resource_list = character.get(resource_type)
+        if not isinstance(resource_list, dict):
+            return None
+        found = {
+            resource_id(item.get("resourceURI", ""))
+            for item in resource_list.get("items", [])
+        }
+        if found & wanted:
+            continue
+        if resource_list.get("returned", 0) < resource_list.get("available", 0):
+            return None
+        return False
+    return True
+
+
+def affects(params: dict, before, after: dict) -> bool:
+    """
+    Check whether a character change can alter a query's result pages
+    beyond the character's own payload.
+    :param before: The character as previously known, or None if unknown.
+    :param after: The modified character.
+    """
+    order_by = (params.get("order_by") or "name").lstrip("-")
+    if params.get("modified_since") or order_by == "modified":
+        # Every modification moves the character to the front
+        return True
+    if before is None:
+        return matches(params, after) is not False
+
+    was, now = matches(params, before), matches(params, after)
+    if was is None or now is None or was != now:
+        return True
+    # A rename of a matching character shifts the name-ordered pages
+    return bool(now) and before.get("name") != after.get("name")
+
+
+class DeltaSync:
+    """
+    Applies the characters modified since the last sync to the cache.
+
+    Entries that a change can reorder or change the membership of are
+    invalidated, entries that merely hold a changed character are patched
+    in place, and every other entry covered by the sync window is renewed,
+    so only queries touched by actual changes go back upstream.
+    """
+
+    def __init__(self, cache, store=None, params_for=None, skew=60):
+        """
+        Initialize the delta sync.
+        :param cache: Cache holding Marvel API responses.
+        :param store: Optional character store to keep up to date.
+        :param params_for: Function returning the query parameters of a key.
+        :param skew: Seconds subtracted from the watermark for clock skew.
+        """
+        self.cache = cache
+        self.store = store
+        self.params_for = params_for
+        self.skew = skew
+        self.watermark = None
+        self.sync_count = 0
+        self.changed_count = 0
+        self.patched_count = 0
+        self.invalidated_count = 0
+        self.renewed_count = 0
+
+    def since(self, now: float = None) -> float:
+        """
+        Get the start of the next sync window.
+        The first window starts at the oldest cached entry.
+        """
+        if self.watermark is None:
+            timestamps = [timestamp for _, timestamp in self.cache.store.values()]
+            if self.store is not None and self.store.synced_at:
+                timestamps.append(self.store.synced_at)
+            self.watermark = min(
+                timestamps, default=time.time() if now is None else now
+            )
+        return self.watermark
+
+    def modified_since(self, now: float = None) -> str:
+        """
+        Get the modifiedSince value for the next sync window.
+        """
+        return format_modified_since(self.since(now) - self.skew)
+
+    def apply(self, changed: list, started: float) -> dict:
+        """
+        Apply modified characters to every cached entry and advance the watermark.
+        :param changed: Characters modified since the current watermark.
+        :param started: Time the modified characters were requested.
+        :return: Dictionary of patched, invalidated and renewed entry counts.
+        """
+        since = self.since(started)
+        changed = {character["id"]: character for character in changed}
+        summary = {"patched": 0, "invalidated": 0, "renewed": 0}
+
+        for key in self.cache.keys():
+            entry = self.cache.entry(key)
+            if entry is None:
+                continue
+            value, timestamp = entry
+            params = self.params_for(key) if self.params_for else {}
+            results = (value or {}).get("data", {}).get("results", [])
+            held = {result.get("id"): result for result in results}
+
+            if params is None:
+                # Entries cached before their query parameters were stored
+                # cannot be matched, so any change may affect them
+                affected = bool(changed)
+            else:
+                affected = any(
+                    affects(params, held.get(id_) or self._known(id_), character)
+                    for id_, character in changed.items()
+                )
+            if affected:
+                self.cache.invalidate(key)
+                summary["invalidated"] += 1
+            elif held.keys() & changed.keys():
+                self.cache.patch(key, self._patch(value, changed))
+                summary["patched"] += 1
+            elif timestamp >= since:
+                self.cache.touch(key)
+                summary["renewed"] += 1
+
+        if self.store is not None:
+            self.store.upsert(list(changed.values()))
+
+        self.watermark = started
+        self.sync_count += 1
+        self.changed_count += len(changed)
+        self.patched_count += summary["patched"]
+        self.invalidated_count += summary["invalidated"]
+        self.renewed_count += summary["renewed"]
+        logger.info(
+            "[DeltaSync] Applied %d changed characters: %s", len(changed), summary
+        )
+        return summary
+
+    def _known(self, character_id: int):
+        """
+        Get the previously known payload of a character, if any.
+        """
+        if self.store is None:
+            return None
+        return self.store.characters.get(character_id)
+
+    @staticmethod
+    def _patch(value: dict, changed: dict) -> dict:
+        """
+        Replace changed characters in a cached response.
+        The response gets a new ETag derived from its previous one and the
+        changed characters, so clients holding the old one refetch it.
+        """
+        data = value["data"]
+        results = [changed.get(result.get("id"), result) for result in data["results"]]
+        patched = [result for result in results if result.get("id") in changed]
+        etag = hashlib.sha1(
+            json.dumps([value.get("etag", ""), patched], sort_keys=True).encode()
+        ).hexdigest()
+        return {**value, "etag": etag, "data": {**data, "results": results}}
+
+    def stats(self):
+        """
+        Get delta sync statistics.
+        :return: Dictionary containing sync, change and entry counts.
+        """
+        return {
+            "syncs": self.sync_count,
+            "watermark": self.watermark,
+            "changed": self.changed_count,
+            "patched": self.patched_count,
+            "invalidated": self.invalidated_count,
+            "renewed": self.renewed_count,
+        }
@@ -0,0 +1,189 @@
+"""
+Persistent second-tier cache backed by SQLite.
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _loads(params: str):
+    """
+    Decode stored query parameters, which are NULL for older entries.
+    """
+    return None if params is None else json.loads(params)
+
+
+class DiskCache:
+    """
+    SQLite store for cache values, Etags, timestamps and query parameters.
+
+    Writes are queued to a background thread, which also encodes the
+    values, so callers on the event loop never wait for JSON encoding or
+    disk I/O. Reads are point lookups on the primary key.
+    """
+
+    # Entries are only written by the process that owns the cache
+    shared = False
+
+    def __init__(self, path: str, maxsize=10000, trim_interval=100):
+        """
+        Open the database and start the writer thread.
+        :param path: SQLite database file.
+        :param maxsize: Maximum number of entries kept on disk.
+        :param trim_interval: Number of writes between trims to maxsize.
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.trim_interval = trim_interval
+        self.writes = queue.Queue()
+        self.reader = self._connect(check_same_thread=False)
+        self.reader_lock = threading.Lock()
+        self.writer = threading.Thread(
+            target=self._write_loop, name="disk-cache-writer", daemon=True
+        )
+        self.writer.start()
+
+    def _connect(self, check_same_thread=True) -> sqlite3.Connection:
+        """
+        Open a connection and make sure the schema exists.
+        """
+        connection = sqlite3.connect(self.path, check_same_thread=check_same_thread)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT, etag TEXT, timestamp REAL, params TEXT)"
+        )
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(entries)")]
+        if "params" not in columns:
+            # Databases written before query parameters were stored
+            connection.execute("ALTER TABLE entries ADD COLUMN params TEXT")
+        connection.commit()
+        return connection
+
+    def get(self, key: str):
+        """
+        Read an entry.
+        :return: Tuple of (value, etag, timestamp, params), or None if not stored.
+        """
+        with self.reader_lock:
+            row = self.reader.execute(
+                "SELECT value, etag, timestamp, params FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        value, etag, timestamp, params = row
+        return json.loads(value), etag, timestamp, _loads(params)
+
+    def load(self, limit: int, min_timestamp: float = 0):
+        """
+        Read the newest entries written after min_timestamp, newest first.
+        :return: List of (key, value, etag, timestamp, params) tuples.
+        """
+        with self.reader_lock:
+            rows = self.reader.execute(
+                "SELECT key, value, etag, timestamp, params FROM entries "
+                "WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?",
+                (min_timestamp, limit),
+            ).fetchall()
+        return [
+            (key, json.loads(value), etag, timestamp, _loads(params))
+            for key, value, etag, timestamp, params in rows
+        ]
+
+    def put(self, key: str, value, etag: str, timestamp: float, params=None):
+        """
+        Queue an entry to be written. The value is encoded by the writer
+        thread, so it must not be mutated afterwards.
+        """
+        self.writes.put(("put", (key, value, etag or "", timestamp, params)))
+
+    def touch(self, key: str, timestamp: float):
+        """
+        Queue a timestamp update for an entry.
+        """
+        self.writes.put(("touch", (timestamp, key)))
+
+    def delete(self, key: str):
+        """
+        Queue an entry to be deleted.
+        """
+        self.writes.put(("delete", (key,)))
+
+    def clear(self):
+        """
+        Queue the removal of every entry.
+        """
+        self.writes.put(("clear", ()))
+
+    def flush(self):
+        """
+        Wait until every queued write has been applied.
+        """
+        self.writes.join()
+
+    def close(self):
+        """
+        Apply queued writes, stop the writer thread and close the database.
+        """
+        if not self.writer.is_alive():
+            return
+        self.writes.put(None)
+        self.writer.join()
+        with self.reader_lock:
+            self.reader.close()
+
+    def _write_loop(self):
+        """
+        Apply queued writes, committing once the queue is drained.
+        """
+        statements = {
+            "put": "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            "touch": "UPDATE entries SET timestamp = ? WHERE key = ?",
+            "delete": "DELETE FROM entries WHERE key = ?",
+            "clear": "DELETE FROM entries",
+        }
+        connection = self._connect()
+        write_count = 0
+        while True:
+            item = self.writes.get()
+            try:
+                if item is None:
+                    break
+                operation, params = item
+                if operation == "put":
+                    key, value, etag, timestamp, query_params = params
+                    params = (
+                        key,
+                        json.dumps(value),
+                        etag,
+                        timestamp,
+                        None if query_params is None else json.dumps(query_params),
+                    )
+                connection.execute(statements[operation], params)
+                write_count += 1
+                if write_count % self.trim_interval == 0:
+                    self._trim(connection)
+                if self.writes.empty():
+                    connection.commit()
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.error("[DiskCache] Failed to apply %s: %s", item[0], e)
+            finally:
+                self.writes.task_done()
+        connection.commit()
+        connection.close()
+
+    def _trim(self, connection: sqlite3.Connection):
+        """
+        Delete the oldest entries beyond maxsize.
+        """
+        connection.execute(
+            "DELETE FROM entries WHERE key NOT IN "
+            "(SELECT key FROM entries ORDER BY timestamp DESC LIMIT ?)",
+            (self.maxsize,),
+        )
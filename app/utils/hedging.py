@@ -0,0 +1,101 @@
+"""
+Hedged requests: a second attempt for calls slower than usual.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HedgeBudget:
+    """
+    Token bucket capping hedges to a share of all requests.
+
+    Every request adds ``ratio`` tokens, up to ``burst``, and every hedge
+    takes one, so at most about ``ratio`` of requests are sent twice.
+    """
+
+    def __init__(self, ratio=0.1, burst=10):
+        """
+        Initialize an empty budget.
+        :param ratio: Share of requests that may be hedged.
+        :param burst: Maximum tokens saved up for bursts of slow calls.
+        """
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+        self.request_count = 0
+        self.hedge_count = 0
+        self.hedge_win_count = 0
+
+    def deposit(self):
+        """
+        Add the tokens earned by one request.
+        """
+        self.request_count += 1
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Take a token for one hedge.
+        :return: False if the budget is exhausted.
+        """
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.hedge_count += 1
+        return True
+
+    def stats(self):
+        """
+        Get hedging statistics.
+        :return: Dictionary containing request, hedge and hedge win counts.
+        """
+        return {
+            "requests": self.request_count,
+            "hedges": self.hedge_count,
+            "hedge_wins": self.hedge_win_count,
+            "tokens": self.tokens,
+        }
+
+
+async def hedged(call, delay, budget: HedgeBudget):
+    """
+    Await ``call()``, starting a second ``call()`` if the first takes longer
+    than delay and the budget allows, and return whichever finishes first.
+    The other attempt is cancelled. If one attempt fails, the other one's
+    outcome is used.
+    :param call: Coroutine function making one attempt.
+    :param delay: Seconds to wait before hedging, or None to never hedge.
+    :param budget: Budget the hedge is taken from.
+    """
+    budget.deposit()
+    first = asyncio.ensure_future(call())
+    if delay is None:
+        return await first
+
+    attempts = [first]
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not budget.withdraw():
+            return await first
+
+        logger.debug("[Hedging] Hedging a call slower than %.3fs.", delay)
+        second = asyncio.ensure_future(call())
+        attempts.append(second)
+        pending = set(attempts)
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            winner = next((task for task in done if task.exception() is None), None)
+            if winner is None and pending:
+                continue
+            if winner is second:
+                budget.hedge_win_count += 1
+            return (winner or done.pop()).result()
+    finally:
+        for attempt in attempts:
+            if not attempt.done():
+                attempt.cancel()
@@ -0,0 +1,160 @@
+"""
+Inverted indexes from comic, series, event and story ids to character ids.
+"""
+
+from array import array
+from bisect import bisect_left, insort
+import logging
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_TYPES = ("comics", "series", "events", "stories")
+
+
+def resource_id(resource_uri: str):
+    """
+    Extract the numeric id from a resource URI, or None if it has none.
+    """
+    last_segment = resource_uri.rstrip("/").rsplit("/", 1)[-1]
+    return int(last_segment) if last_segment.isdigit() else None
+
+
+def intersect(postings: list) -> array:
+    """
+    Intersect sorted posting lists, probing the others from the shortest.
+    """
+    if not postings:
+        return array("q")
+    postings = sorted(postings, key=len)
+    result = array("q")
+    for character_id in postings[0]:
+        for other in postings[1:]:
+            position = bisect_left(other, character_id)
+            if position == len(other) or other[position] != character_id:
+                break
+        else:
+            result.append(character_id)
+    return result
+
+
+def union(postings: list) -> array:
+    """
+    Merge sorted posting lists into one without duplicates.
+    """
+    if len(postings) == 1:
+        return postings[0]
+    return array("q", sorted(set().union(*postings)))
+
+
+class InvertedIndex:
+    """
+    Posting lists of character ids per resource id, for each resource type.
+
+    Resource lists in character payloads are capped, so a posting list is
+    only trusted once it is known to be complete: either an unfiltered
+    upstream query for that single id returned every character, or the
+    whole catalog is mirrored and no character's list of that type was cut
+    short.
+    """
+
+    def __init__(self):
+        """
+        Initialize empty indexes.
+        """
+        self.postings = {resource_type: {} for resource_type in RESOURCE_TYPES}
+        self.complete_ids = {resource_type: set() for resource_type in RESOURCE_TYPES}
+        self.truncated = {resource_type: set() for resource_type in RESOURCE_TYPES}
+        self.indexed = {}
+
+    def add(self, character: dict):
+        """
+        Index the resource lists of a character payload.
+
+        A truncated list only adds postings, since ids missing from it may
+        just have been cut off. A full list replaces the character's
+        previous postings of that type.
+        """
+        character_id = character["id"]
+        indexed = self.indexed.setdefault(character_id, {})
+        for resource_type in RESOURCE_TYPES:
+            resource_list = character.get(resource_type)
+            if not isinstance(resource_list, dict):
+                self.truncated[resource_type].add(character_id)
+                continue
+            ids = {
+                resource_id(item.get("resourceURI", ""))
+                for item in resource_list.get("items", [])
+            }
+            ids.discard(None)
+
+            previous = indexed.get(resource_type, set())
+            if resource_list.get("returned", 0) < resource_list.get("available", 0):
+                self.truncated[resource_type].add(character_id)
+                ids |= previous
+            else:
+                self.truncated[resource_type].discard(character_id)
+                for stale_id in previous - ids:
+                    self._remove_posting(resource_type, stale_id, character_id)
+
+            for new_id in ids - previous:
+                posting = self.postings[resource_type].setdefault(new_id, array("q"))
+                position = bisect_left(posting, character_id)
+                if position == len(posting) or posting[position] != character_id:
+                    insort(posting, character_id)
+            indexed[resource_type] = ids
+
+    def _remove_posting(self, resource_type: str, id_: int, character_id: int):
+        """
+        Remove a character from one posting list.
+        """
+        posting = self.postings[resource_type].get(id_)
+        if posting is None:
+            return
+        position = bisect_left(posting, character_id)
+        if position < len(posting) and posting[position] == character_id:
+            del posting[position]
+
+    def set_complete(self, resource_type: str, id_: int, character_ids):
+        """
+        Record the full set of characters appearing in a resource.
+        """
+        self.postings[resource_type][id_] = array("q", sorted(set(character_ids)))
+        self.complete_ids[resource_type].add(id_)
+
+    def is_complete(self, resource_type: str, ids, catalog_complete=False) -> bool:
+        """
+        Check whether the posting lists for the given ids can be trusted.
+        :param catalog_complete: Whether every character has been indexed.
+        """
+        if catalog_complete and not self.truncated[resource_type]:
+            return True
+        return all(id_ in self.complete_ids[resource_type] for id_ in ids)
+
+    def match(self, filters: dict) -> array:
+        """
+        Find characters matching every filtered resource type.
+        Ids within one type are alternatives, types are combined.
+        :param filters: Mapping of resource type to a list of resource ids.
+        :return: Sorted array of matching character ids.
+        """
+        empty = array("q")
+        return intersect(
+            [
+                union([self.postings[resource_type].get(id_, empty) for id_ in ids])
+                for resource_type, ids in filters.items()
+            ]
+        )
+
+    def stats(self):
+        """
+        Get index statistics.
+        :return: Dictionary of posting list and complete id counts per type.
+        """
+        return {
+            resource_type: {
+                "ids": len(self.postings[resource_type]),
+                "complete_ids": len(self.complete_ids[resource_type]),
+                "truncated_characters": len(self.truncated[resource_type]),
+            }
+            for resource_type in RESOURCE_TYPES
+        }
@@ -0,0 +1,106 @@
+"""
+Page index for answering sub-page queries from cached larger pages.
+"""
+
+import logging
+
+from app.utils.cache import canonical_params, hash_params
+
+logger = logging.getLogger(__name__)
+
+PAGING_PARAMS = ("limit", "offset")
+
+
+def generate_filter_key(params: dict) -> str:
+    """
+    Generate a key for the filter and order part of a query, ignoring paging.
+    """
+    return hash_params(
+        {k: v for k, v in canonical_params(params).items() if k not in PAGING_PARAMS}
+    )
+
+
+class PageIndex:
+    """
+    Index of cached page windows per filter key.
+
+    A cached page covering ``offset=0, limit=100`` of a query also answers
+    ``offset=20, limit=10`` of the same query, so the smaller page can be
+    sliced out of it instead of going upstream. Windows are removed along
+    with their cache entries.
+    """
+
+    def __init__(self, max_windows=32):
+        """
+        Initialize the index.
+        :param max_windows: Windows kept per filter key before pruning.
+        """
+        self.windows = {}
+        self.filter_keys = {}
+        self.max_windows = max_windows
+
+    def add(self, cache_key: str, params: dict, cache=None):
+        """
+        Register a cached page window.
+        :param cache_key: Cache key the page is stored under.
+        :param params: Query parameters of the page.
+        :param cache: Cache used to prune windows that are no longer cached.
+        """
+        filter_key = generate_filter_key(params)
+        windows = self.windows.setdefault(filter_key, {})
+        windows[cache_key] = None
+        self.filter_keys[cache_key] = filter_key
+        if cache is not None and len(windows) > self.max_windows:
+            for key in [key for key in windows if cache.peek(key) is None]:
+                self.remove(key)
+
+    def remove(self, cache_key: str):
+        """
+        Forget the window of a page that left the cache.
+        """
+        filter_key = self.filter_keys.pop(cache_key, None)
+        if filter_key is None:
+            return
+        windows = self.windows[filter_key]
+        del windows[cache_key]
+        if not windows:
+            del self.windows[filter_key]
+
+    def find(self, cache, params: dict):
+        """
+        Find a fresh cached page covering the requested window.
+        :param cache: Cache holding the pages.
+        :param params: Query parameters including limit and offset.
+        :return: The requested window sliced out of a covering page, or None.
+        """
+        limit = int(params.get("limit") or 0)
+        offset = int(params.get("offset") or 0)
+        if limit <= 0:
+            return None
+        windows = self.windows.get(generate_filter_key(params))
+        if not windows:
+            return None
+
+        for cache_key in list(windows):
+            page = cache.peek(cache_key)
+            if not page:
+                self.remove(cache_key)
+                continue
+            data = page.get("data", {})
+            page_offset = data.get("offset", 0)
+            page_end = page_offset + data.get("count", 0)
+            reaches_end = page_end >= data.get("total", 0)
+            if page_offset <= offset and (offset + limit <= page_end or reaches_end):
+                start = offset - page_offset
+                results = data.get("results", [])[start : start + limit]
+                return {
+                    **page,
+                    "data": {
+                        **data,
+                        "offset": offset,
+                        "limit": limit,
+                        "count": len(results),
+                        "results": results,
+                    },
+                }
+        return None
@@ -0,0 +1,152 @@
+"""
+Refresh planner for prioritized, quota-aware cache refreshes.
+"""
+
+from collections import deque
+import time
+
+SECONDS_PER_DAY = 86400
+
+
+class CallBudget:
+    """
+    Upstream call budget per rolling minute and per UTC day.
+    """
+
+    def __init__(self, per_minute=30, per_day=2000):
+        """
+        Initialize the budget.
+        :param per_minute: Maximum calls in any 60 second window.
+        :param per_day: Maximum calls per UTC day.
+        """
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.minute_calls = deque()
+        self.day = None
+        self.day_calls = 0
+
+    def _expire(self, now: float):
+        """
+        Drop calls that fell out of the minute window and reset on a new day.
+        """
+        while self.minute_calls and now - self.minute_calls[0] >= 60:
+            self.minute_calls.popleft()
+        day = int(now // SECONDS_PER_DAY)
+        if day != self.day:
+            self.day = day
+            self.day_calls = 0
+
+    def consume(self, now: float = None) -> bool:
+        """
+        Take one call from the budget.
+        :return: False if the minute or day budget is exhausted.
+        """
+        now = time.time() if now is None else now
+        self._expire(now)
+        if len(self.minute_calls) >= self.per_minute or self.day_calls >= self.per_day:
+            return False
+        self.minute_calls.append(now)
+        self.day_calls += 1
+        return True
+
+    def stats(self, now: float = None):
+        """
+        Get budget usage.
+        :return: Dictionary containing calls used in the current minute and day.
+        """
+        now = time.time() if now is None else now
+        self._expire(now)
+        return {
+            "minute_used": len(self.minute_calls),
+            "minute_budget": self.per_minute,
+            "day_used": self.day_calls,
+            "day_budget": self.per_day,
+        }
+
+
+class RefreshPlanner:
+    """
+    Decide which cache keys to refresh on each refresh cycle.
+
+    Keys close to expiry are ranked by access frequency, recency and
+    time-to-expiry, then scheduled while the concurrency cap and call budget
+    allow. Keys with a refresh already in flight are skipped, as are keys
+    the cache leaves to expire.
+    """
+
+    def __init__(
+        self,
+        cache,
+        budget: CallBudget,
+        max_concurrent=5,
+        refresh_ahead=60,
+        recency_half_life=300,
+    ):
+        """
+        Initialize the planner.
+        :param cache: The Cache whose keys are refreshed.
+        :param budget: Upstream call budget for refreshes.
+        :param max_concurrent: Maximum refreshes in flight at once.
+        :param refresh_ahead: Seconds before expiry at which a key becomes due.
+        :param recency_half_life: Seconds after which an access counts half.
+        """
+        self.cache = cache
+        self.budget = budget
+        self.max_concurrent = max_concurrent
+        self.refresh_ahead = refresh_ahead
+        self.recency_half_life = recency_half_life
+        self.scheduled_count = 0
+        self.deferred_count = 0
+        self.last_deferred = []
+
+    def score(self, key: str, expires_in: float, now: float) -> float:
+        """
+        Rank a due key; higher scores are refreshed first.
+        """
+        accesses = self.cache.access_counts.get(key, 0)
+        idle = now - self.cache.last_accessed.get(key, now)
+        recency = 0.5 ** (idle / self.recency_half_life)
+        return (1 + accesses) * recency / max(1.0, expires_in)
+
+    def plan(self, now: float = None):
+        """
+        Plan one refresh cycle.
+        :return: Dictionary with the scheduled, deferred and in-flight keys.
+        """
+        now = time.time() if now is None else now
+        in_flight = list(self.cache.revalidating)
+        candidates = []
+        for key in self.cache.keys():
+            if key in self.cache.revalidating or not self.cache.refreshable(key):
+                continue
+            expires_in = self.cache.expires_in(key, now)
+            if expires_in is None or expires_in > self.refresh_ahead:
+                continue
+            candidates.append((self.score(key, expires_in, now), key))
+        candidates.sort(reverse=True)
+
+        slots = max(0, self.max_concurrent - len(self.cache.revalidating))
+        scheduled = []
+        deferred = []
+        for _, key in candidates:
+            if len(scheduled) < slots and self.budget.consume(now):
+                scheduled.append(key)
+            else:
+                deferred.append(key)
+
+        self.scheduled_count += len(scheduled)
+        self.deferred_count += len(deferred)
+        self.last_deferred = deferred
+        return {"scheduled": scheduled, "deferred": deferred, "in_flight": in_flight}
+
+    def stats(self):
+        """
+        Get planner statistics.
+        :return: Dictionary containing scheduled and deferred counts and budget usage.
+        """
+        return {
+            "scheduled": self.scheduled_count,
+            "deferred": self.deferred_count,
+            "last_deferred": list(self.last_deferred),
+            "budget": self.budget.stats(),
+        }
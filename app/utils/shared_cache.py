@@ -0,0 +1,411 @@
+"""
+Second-tier cache shared between processes through a memory-mapped file.
+"""
+
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import zlib
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MVLCACHE"
+# Magic, slot count, probe window, data size, next write offset, last sequence
+HEADER = struct.Struct("<8sIIQQQ")
+HEADER_SIZE = 64
+# Key hash, sequence, timestamp, record offset, record length, record CRC32
+SLOT = struct.Struct("<QQdQII")
+# Sequence, key length, Etag length, params length; followed by the key,
+# Etag, JSON params and JSON value
+RECORD = struct.Struct("<QHHI")
+EMPTY = 0
+DELETED = 1
+
+
+def _hash_key(key: str) -> int:
+    """
+    Hash a key to a 64-bit slot tag, avoiding the empty and deleted markers.
+    """
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return max(int.from_bytes(digest, "little"), DELETED + 1)
+
+
+class SharedCache:
+    """
+    Cache values, Etags, timestamps and query parameters in a file every
+    worker process maps into memory, so an entry stored by one process is
+    found by all of the others.
+
+    The file holds an open-addressing index of fixed-size slots followed by
+    a ring buffer of serialized records. A key lives in one of the
+    ``probe`` slots after its hash; when they are all taken, the slot with
+    the oldest entry is reused. Records are appended to the ring, which
+    wraps around and overwrites the oldest records, so each slot keeps the
+    sequence number and CRC of its record and a record that was overwritten
+    is read as a miss. Access is serialized between processes with
+    ``lockf`` on the file; readers share the lock.
+
+    Implements the same interface as DiskCache. Like DiskCache, writes are
+    queued to a background thread that encodes the values, so callers on
+    the event loop do not wait for JSON encoding and the exclusive lock is
+    only held to copy the encoded record.
+    """
+
+    # Entries may be replaced by other processes at any time
+    shared = True
+
+    def __init__(self, path: str, slots=16384, data_size=256 * 1024 * 1024, probe=16):
+        """
+        Map the file, creating or resetting it if its layout does not match.
+        :param path: File to map; put it on a tmpfs such as /dev/shm to keep
+            it in memory.
+        :param slots: Number of index slots, the most entries kept.
+        :param data_size: Bytes of the ring buffer holding the records.
+        :param probe: Slots searched for a key.
+        """
+        self.path = path
+        self.slots = slots
+        self.data_size = data_size
+        self.probe = min(probe, slots)
+        self.data_start = HEADER_SIZE + slots * SLOT.size
+        self.size = self.data_start + data_size
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked(exclusive=True):
+            if os.fstat(self.fd).st_size != self.size:
+                os.ftruncate(self.fd, 0)
+                os.ftruncate(self.fd, self.size)
+            self.memory = mmap.mmap(self.fd, self.size)
+            magic, slot_count, probe_count, size, _, _ = HEADER.unpack_from(
+                self.memory, 0
+            )
+            if (magic, slot_count, probe_count, size) != (
+                MAGIC,
+                slots,
+                self.probe,
+                data_size,
+            ):
+                self._reset()
+        self.writes = queue.Queue()
+        self.writer = threading.Thread(
+            target=self._write_loop, name="shared-cache-writer", daemon=True
+        )
+        self.writer.start()
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        """
+        Hold the file lock, shared for readers and exclusive for writers.
+        """
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+    def _reset(self):
+        """
+        Empty the index and ring buffer. Requires the exclusive lock.
+        """
+        self.memory[HEADER_SIZE : self.data_start] = bytes(
+            self.data_start - HEADER_SIZE
+        )
+        HEADER.pack_into(
+            self.memory, 0, MAGIC, self.slots, self.probe, self.data_size, 0, 0
+        )
+
+    def _slot_offset(self, index: int) -> int:
+        """
+        Get the position of an index slot in the file.
+        """
+        return HEADER_SIZE + index * SLOT.size
+
+    def _find(self, key_hash: int):
+        """
+        Find the slot holding a key hash.
+        :return: Tuple of (slot index, slot fields), or None if not stored.
+        """
+        start = key_hash % self.slots
+        for i in range(self.probe):
+            index = (start + i) % self.slots
+            fields = SLOT.unpack_from(self.memory, self._slot_offset(index))
+            if fields[0] == key_hash:
+                return index, fields
+            if fields[0] == EMPTY:
+                return None
+        return None
+
+    def _read(self, key: str, fields):
+        """
+        Copy a slot's record out of the ring buffer, checking it was not
+        overwritten since.
+        :return: Tuple of (etag, params bytes, value bytes), or None.
+        """
+        _, seq, _, offset, length, crc = fields
+        start = self.data_start + offset
+        record = self.memory[start : start + length]
+        if zlib.crc32(record) != crc:
+            return None
+        record_seq, key_length, etag_length, params_length = RECORD.unpack_from(record)
+        position = RECORD.size
+        record_key = record[position : position + key_length]
+        if record_seq != seq or record_key != key.encode():
+            return None
+        position += key_length
+        etag = record[position : position + etag_length].decode()
+        position += etag_length
+        params = record[position : position + params_length]
+        return etag, params, record[position + params_length :]
+
+    def get(self, key: str):
+        """
+        Read an entry.
+        :return: Tuple of (value, etag, timestamp, params), or None if not stored.
+        """
+        key_hash = _hash_key(key)
+        with self._locked():
+            found = self._find(key_hash)
+            if found is None:
+                return None
+            _, fields = found
+            record = self._read(key, fields)
+        if record is None:
+            self._discard(key_hash, fields[1])
+            return None
+        etag, params, value = record
+        return json.loads(value), etag, fields[2], json.loads(params)
+
+    def timestamp(self, key: str):
+        """
+        Get the timestamp of an entry without reading its value.
+        :return: The timestamp, or None if not stored.
+        """
+        with self._locked():
+            found = self._find(_hash_key(key))
+        return None if found is None else found[1][2]
+
+    def load(self, limit: int, min_timestamp: float = 0):
+        """
+        Read the newest entries written after min_timestamp, newest first.
+        :return: List of (key, value, etag, timestamp, params) tuples.
+        """
+        entries = []
+        with self._locked():
+            candidates = []
+            for index in range(self.slots):
+                fields = SLOT.unpack_from(self.memory, self._slot_offset(index))
+                if fields[0] > DELETED and fields[2] >= min_timestamp:
+                    candidates.append(fields)
+            candidates.sort(key=lambda fields: fields[2], reverse=True)
+            for fields in candidates[:limit]:
+                start = self.data_start + fields[3]
+                _, key_length, _, _ = RECORD.unpack_from(self.memory, start)
+                key_start = start + RECORD.size
+                key = self.memory[key_start : key_start + key_length].decode(
+                    errors="replace"
+                )
+                record = self._read(key, fields)
+                if record is not None:
+                    entries.append((key, fields[2], record))
+        return [
+            (key, json.loads(value), etag, timestamp, json.loads(params))
+            for key, timestamp, (etag, params, value) in entries
+        ]
+
+    def put(self, key: str, value, etag: str, timestamp: float, params=None):
+        """
+        Queue an entry to be written. The value is encoded by the writer
+        thread, so it must not be mutated afterwards.
+        """
+        self.writes.put((self._put, (key, value, etag, timestamp, params)))
+
+    def _put(self, key: str, value, etag: str, timestamp: float, params=None):
+        """
+        Write an entry, replacing the oldest entry near its slot if needed.
+        The record is built before taking the lock; only its sequence
+        number is filled in under it.
+        """
+        encoded_key = key.encode()
+        encoded_etag = (etag or "").encode()
+        encoded_params = json.dumps(params).encode()
+        encoded_value = json.dumps(value).encode()
+        length = (
+            RECORD.size
+            + len(encoded_key)
+            + len(encoded_etag)
+            + len(encoded_params)
+            + len(encoded_value)
+        )
+        if length > self.data_size:
+            logger.info("[SharedCache] Entry too large to share: %s", key)
+            return
+        record = bytearray(RECORD.size)
+        record += encoded_key
+        record += encoded_etag
+        record += encoded_params
+        record += encoded_value
+
+        key_hash = _hash_key(key)
+        with self._locked(exclusive=True):
+            _, _, _, _, offset, seq = HEADER.unpack_from(self.memory, 0)
+            seq += 1
+            if offset + length > self.data_size:
+                offset = 0
+            RECORD.pack_into(
+                record, 0, seq, len(encoded_key), len(encoded_etag), len(encoded_params)
+            )
+            start = self.data_start + offset
+            self.memory[start : start + length] = record
+            HEADER.pack_into(
+                self.memory,
+                0,
+                MAGIC,
+                self.slots,
+                self.probe,
+                self.data_size,
+                offset + length,
+                seq,
+            )
+            SLOT.pack_into(
+                self.memory,
+                self._slot_offset(self._claim(key_hash)),
+                key_hash,
+                seq,
+                timestamp,
+                offset,
+                length,
+                zlib.crc32(record),
+            )
+
+    def _claim(self, key_hash: int) -> int:
+        """
+        Choose the slot to write a key hash to: its current slot, else the
+        first free one, else the one with the oldest entry.
+        """
+        start = key_hash % self.slots
+        free = None
+        oldest = None
+        oldest_timestamp = None
+        for i in range(self.probe):
+            index = (start + i) % self.slots
+            slot_hash, _, timestamp, _, _, _ = SLOT.unpack_from(
+                self.memory, self._slot_offset(index)
+            )
+            if slot_hash == key_hash:
+                return index
+            if slot_hash == EMPTY:
+                return index if free is None else free
+            if slot_hash == DELETED:
+                free = index if free is None else free
+            elif oldest_timestamp is None or timestamp < oldest_timestamp:
+                oldest, oldest_timestamp = index, timestamp
+        return oldest if free is None else free
+
+    def touch(self, key: str, timestamp: float):
+        """
+        Queue a timestamp update for an entry.
+        """
+        self.writes.put((self._touch, (key, timestamp)))
+
+    def _touch(self, key: str, timestamp: float):
+        """
+        Update the timestamp of an entry.
+        """
+        with self._locked(exclusive=True):
+            found = self._find(_hash_key(key))
+            if found is not None:
+                index, fields = found
+                SLOT.pack_into(
+                    self.memory,
+                    self._slot_offset(index),
+                    fields[0],
+                    fields[1],
+                    timestamp,
+                    *fields[3:],
+                )
+
+    def delete(self, key: str):
+        """
+        Queue an entry to be deleted.
+        """
+        self.writes.put((self._delete, (key,)))
+
+    def _delete(self, key: str):
+        """
+        Delete an entry.
+        """
+        with self._locked(exclusive=True):
+            found = self._find(_hash_key(key))
+            if found is not None:
+                index, fields = found
+                SLOT.pack_into(
+                    self.memory, self._slot_offset(index), DELETED, *fields[1:]
+                )
+
+    def _discard(self, key_hash: int, seq: int):
+        """
+        Delete an entry whose record was overwritten, unless it was written
+        again in the meantime.
+        """
+        with self._locked(exclusive=True):
+            found = self._find(key_hash)
+            if found is not None and found[1][1] == seq:
+                index, fields = found
+                SLOT.pack_into(
+                    self.memory, self._slot_offset(index), DELETED, *fields[1:]
+                )
+
+    def clear(self):
+        """
+        Queue the removal of every entry.
+        """
+        self.writes.put((self._clear, ()))
+
+    def _clear(self):
+        """
+        Remove every entry.
+        """
+        with self._locked(exclusive=True):
+            self._reset()
+
+    def flush(self):
+        """
+        Wait until every queued write has been applied.
+        """
+        self.writes.join()
+
+    def close(self):
+        """
+        Apply queued writes, stop the writer thread, then unmap and close
+        the file. Entries stay in it for other processes.
+        """
+        if self.memory.closed:
+            return
+        self.writes.put(None)
+        self.writer.join()
+        self.memory.close()
+        os.close(self.fd)
+
+    def _write_loop(self):
+        """
+        Apply queued writes in order.
+        """
+        while True:
+            item = self.writes.get()
+            try:
+                if item is None:
+                    break
+                write, args = item
+                write(*args)
+            except (TypeError, ValueError) as e:
+                logger.error("[SharedCache] Failed to write entry: %s", e)
+            finally:
+                self.writes.task_done()
@@ -0,0 +1,88 @@
+"""
+Singleflight module for coalescing concurrent identical calls.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    In-flight call registry.
+
+    Concurrent callers using the same key share a single execution of the
+    underlying coroutine and all receive its result or exception.
+    """
+
+    def __init__(self):
+        """
+        Initialize the registry with call counters.
+        """
+        self.calls = {}
+        self.waiters = {}
+        self.call_count = 0
+        self.coalesced_count = 0
+        self.cancelled_count = 0
+
+    async def do(self, key: str, func, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` once per key among concurrent callers.
+
+        The shared call runs in its own task, so a cancelled waiter does not
+        cancel it for the others. The call is only cancelled once every
+        waiter has gone away, and a failure or cancellation of the call
+        itself is raised to every waiter.
+        :param key: Key identifying identical calls.
+        :param func: Coroutine function to run.
+        :return: The result of the shared call.
+        """
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self.calls[key] = task
+            self.waiters[key] = 0
+            self.call_count += 1
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced_count += 1
+            logger.debug("[SingleFlight] Coalesced call for key: %s", key)
+
+        self.waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self.waiters.get(key) == 1:
+                self.cancelled_count += 1
+                task.cancel()
+            raise
+        finally:
+            if self.calls.get(key) is task:
+                self.waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Future):
+        """
+        Remove a finished call from the registry.
+        """
+        if self.calls.get(key) is task:
+            self.calls.pop(key)
+            self.waiters.pop(key, None)
+
+    def in_flight(self) -> int:
+        """
+        Return the number of calls currently in flight.
+        """
+        return len(self.calls)
+
+    def stats(self):
+        """
+        Get singleflight statistics.
+        :return: Dictionary containing call, coalesced and cancelled counts.
+        """
+        return {
+            "calls": self.call_count,
+            "coalesced": self.coalesced_count,
+            "cancelled": self.cancelled_count,
+            "in_flight": self.in_flight(),
+        }
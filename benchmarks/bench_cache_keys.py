@@ -0,0 +1,103 @@
+"""
+Hit ratio of canonical cache keys against raw urlencoded keys.
+
+Replays a synthetic request trace in which popular queries arrive in
+equivalent spellings, as different clients send them: unset fields as
+empty strings, ``limit=0`` for the default page size, id lists in any
+order or with duplicates, and names in any letter case.
+
+Run with ``python -m benchmarks.bench_cache_keys``.
+"""
+
+import random
+from urllib.parse import urlencode
+
+from app.utils.cache import Cache, generate_cache_key
+
+CACHE_SIZE = 500
+QUERIES = 2000
+REQUESTS = 100000
+NAMES = ["spider", "iron", "captain", "hulk", "thor", "black", "x", "wolverine"]
+
+
+def legacy_cache_key(params: dict) -> str:
+    """
+    The previous key: urlencoded raw parameters.
+    """
+    sorted_params = {k: v for k, v in sorted(params.items()) if v is not None}
+    return urlencode(sorted_params, doseq=True)
+
+
+def make_query(rng: random.Random) -> dict:
+    """
+    Build a query as the canonical form a client means.
+    """
+    query = {"name_starts_with": rng.choice(NAMES), "limit": 20, "offset": 0}
+    if rng.random() < 0.5:
+        query["offset"] = rng.randrange(5) * 20
+    if rng.random() < 0.4:
+        query["comics"] = rng.sample(range(100), rng.randint(1, 3))
+    return query
+
+
+def spell(query: dict, rng: random.Random) -> dict:
+    """
+    Spell a query the way one of several clients might send it.
+    """
+    request = {
+        "name": "",
+        "modified_since": "",
+        "series": [],
+        "order_by": "",
+        **query,
+    }
+    request["name_starts_with"] = rng.choice([str.lower, str.upper, str.title])(
+        query["name_starts_with"]
+    )
+    if request["limit"] == 20 and rng.random() < 0.5:
+        request["limit"] = 0
+    if "comics" in query:
+        comics = query["comics"] + rng.sample(query["comics"], 1)
+        rng.shuffle(comics)
+        request["comics"] = comics
+    else:
+        request["comics"] = []
+    if rng.random() < 0.5:
+        request = {key: value for key, value in request.items() if value != ""}
+    return request
+
+
+def replay(trace: list, key_function) -> tuple:
+    """
+    Replay a trace through a cache and return the hit ratio and key count.
+    """
+    cache = Cache(maxsize=CACHE_SIZE, ttl=10**9)
+    keys = set()
+    for request in trace:
+        key = key_function(request)
+        keys.add(key)
+        if cache.get(key) is None:
+            cache.set(key, key)
+    return cache.stats()["hit_ratio"], len(keys)
+
+
+def main():
+    """
+    Print hit ratios and distinct key counts for both key functions.
+    """
+    rng = random.Random(1)
+    queries = [make_query(rng) for _ in range(QUERIES)]
+    weights = [1 / rank for rank in range(1, QUERIES + 1)]
+    trace = [spell(query, rng) for query in rng.choices(queries, weights, k=REQUESTS)]
+
+    print(f"{'key':<12}{'hit ratio':>12}{'keys':>10}")
+    for name, key_function in (
+        ("urlencoded", legacy_cache_key),
+        ("canonical", generate_cache_key),
+    ):
+        hit_ratio, key_count = replay(trace, key_function)
+        print(f"{name:<12}{hit_ratio:>12.3f}{key_count:>10}")
+
+
+if __name__ == "__main__":
+    main()
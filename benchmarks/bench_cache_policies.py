@@ -0,0 +1,80 @@
+"""
+Trace-driven comparison of cache hit ratios across eviction policies.
+
+Replays synthetic Zipf-distributed query traffic, optionally mixed with
+one-off crawler scans, through ``Cache`` for each policy.
+
+Run with ``python -m benchmarks.bench_cache_policies``.
+"""
+
+import bisect
+import itertools
+import logging
+import random
+
+from app.utils.cache import Cache
+from app.utils.cache_policy import POLICIES
+
+CACHE_SIZE = 500
+KEYSPACE = 20000
+REQUESTS = 200000
+
+
+def zipf_trace(count: int, keyspace: int, alpha: float, seed: int):
+    """
+    Generate query keys with Zipf-distributed popularity.
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank**alpha) for rank in range(1, keyspace + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    total = cumulative[-1]
+    return [
+        f"nameStartsWith=q{bisect.bisect(cumulative, rng.random() * total)}"
+        for _ in range(count)
+    ]
+
+
+def with_scans(trace: list, scan_ratio: float, seed: int):
+    """
+    Interleave one-off crawler queries that are never repeated.
+    """
+    rng = random.Random(seed)
+    scan_ids = itertools.count()
+    mixed = []
+    for key in trace:
+        mixed.append(key)
+        if rng.random() < scan_ratio:
+            mixed.append(f"nameStartsWith=scan{next(scan_ids)}")
+    return mixed
+
+
+def replay(trace: list, policy: str) -> float:
+    """
+    Replay a trace, filling misses, and return the hit ratio.
+    """
+    cache = Cache(maxsize=CACHE_SIZE, ttl=10**9, policy=policy)
+    for key in trace:
+        if cache.get(key) is None:
+            cache.set(key, key)
+    return cache.stats()["hit_ratio"]
+
+
+def main():
+    """
+    Print hit ratios for each policy and workload.
+    """
+    logging.disable(logging.INFO)
+    workloads = {
+        "zipf(0.8)": zipf_trace(REQUESTS, KEYSPACE, 0.8, seed=1),
+        "zipf(1.0)": zipf_trace(REQUESTS, KEYSPACE, 1.0, seed=2),
+    }
+    workloads["zipf(0.8)+scans"] = with_scans(workloads["zipf(0.8)"], 0.5, seed=3)
+
+    print(f"{'workload':<18}" + "".join(f"{name:>10}" for name in POLICIES))
+    for workload, trace in workloads.items():
+        ratios = [replay(trace, policy) for policy in POLICIES]
+        print(f"{workload:<18}" + "".join(f"{ratio:>10.3f}" for ratio in ratios))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Memory and hit latency of compressed cold cache entries.
+
+Fills a cache with 1,000 character pages, as decoded from the Marvel API,
+and measures the memory they hold expanded and compressed, along with the
+latency of a hit on an expanded entry and of the first hit on a
+compressed one, which decodes it.
+
+Run with ``python -m benchmarks.bench_compressed_entries``.
+"""
+
+import gc
+import json
+import logging
+import time
+import tracemalloc
+
+from app.utils.cache import Cache
+from app.utils.compression import ZlibCodec
+from benchmarks.payloads import make_api_response
+
+ENTRIES = 1000
+PAGE_SIZE = 20
+LEVELS = (1, 6, 9)
+
+
+def make_cache(level: int) -> Cache:
+    """
+    Build a cache filled with pages decoded from JSON, as the upstream
+    client returns them.
+    """
+    encoded = json.dumps(make_api_response(count=PAGE_SIZE))
+    cache = Cache(maxsize=ENTRIES, ttl=3600, compress_after=1, codec=ZlibCodec(level))
+    for i in range(ENTRIES):
+        cache.set(f"key{i}", json.loads(encoded))
+    return cache
+
+
+def measure_memory(level: int):
+    """
+    Measure the bytes held by the cache before and after compaction.
+    """
+    gc.collect()
+    tracemalloc.start()
+    cache = make_cache(level)
+    expanded = tracemalloc.get_traced_memory()[0]
+    cache.compact(now=time.time() + 2)
+    gc.collect()
+    compressed = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return expanded, compressed
+
+
+def measure_latency(level: int):
+    """
+    Measure compaction time and per-hit latency on expanded and compressed
+    entries.
+    """
+    cache = make_cache(level)
+    started = time.perf_counter()
+    for i in range(ENTRIES):
+        cache.get(f"key{i}")
+    hot_us = (time.perf_counter() - started) / ENTRIES * 1e6
+
+    started = time.perf_counter()
+    cache.compact(now=time.time() + 2)
+    compact_ms = (time.perf_counter() - started) / ENTRIES * 1e3
+
+    started = time.perf_counter()
+    for i in range(ENTRIES):
+        cache.get(f"key{i}")
+    cold_us = (time.perf_counter() - started) / ENTRIES * 1e6
+    return compact_ms, hot_us, cold_us
+
+
+def main():
+    """
+    Print memory and latency for each zlib level.
+    """
+    logging.disable(logging.INFO)
+    print(f"{ENTRIES} entries of {PAGE_SIZE} characters")
+    print(
+        f"{'level':>6}{'expanded MB':>13}{'compressed MB':>15}{'ratio':>8}"
+        f"{'compress ms':>13}{'hit us':>9}{'cold hit us':>13}"
+    )
+    for level in LEVELS:
+        expanded, compressed = measure_memory(level)
+        compact_ms, hot_us, cold_us = measure_latency(level)
+        print(
+            f"{level:>6}{expanded / 1e6:>13.1f}{compressed / 1e6:>15.1f}"
+            f"{expanded / compressed:>7.0f}x{compact_ms:>13.2f}"
+            f"{hot_us:>9.2f}{cold_us:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
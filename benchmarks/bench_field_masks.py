@@ -0,0 +1,53 @@
+"""
+Benchmark response size and build time with and without a field mask.
+
+Builds a 100-character page in full and masked to ``id``, ``name`` and
+``thumbnail``, the fields most callers need.
+
+Run with ``python -m benchmarks.bench_field_masks``.
+"""
+
+# pylint: disable=protected-access
+import timeit
+
+from app.grpc_services.marvel_service import MarvelService
+from benchmarks.payloads import make_api_response
+
+ROUNDS = 200
+MASKS = {
+    "none": None,
+    "id,name,thumbnail": frozenset({"id", "name", "thumbnail"}),
+}
+
+
+def main():
+    """
+    Print bytes on the wire and build time per mask for a 100-character page.
+    """
+    service = MarvelService()
+    api_response = make_api_response(count=100)
+
+    print(f"{'mask':>20}{'KiB':>10}{'build us':>12}{'serialize us':>15}")
+    for label, fields in MASKS.items():
+        response = service._build_response_from_api(api_response, fields)
+        size = len(response.SerializeToString())
+        build = min(
+            timeit.repeat(
+                lambda fields=fields: service._build_response_from_api(
+                    api_response, fields
+                ),
+                number=ROUNDS,
+                repeat=3,
+            )
+        )
+        serialize = min(
+            timeit.repeat(response.SerializeToString, number=ROUNDS, repeat=3)
+        )
+        print(
+            f"{label:>20}{size / 1024:>10.1f}{build / ROUNDS * 1e6:>12.0f}"
+            f"{serialize / ROUNDS * 1e6:>15.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
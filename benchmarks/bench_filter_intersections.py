@@ -0,0 +1,123 @@
+"""
+Benchmark for answering multi-filter queries from the inverted indexes.
+
+Builds a synthetic catalog whose characters share comics, series, events
+and stories, then compares intersecting posting lists against scanning
+every character payload for the same filters.
+
+Run with ``python -m benchmarks.bench_filter_intersections``.
+"""
+
+import logging
+import random
+import time
+import timeit
+
+from app.utils.inverted_index import RESOURCE_TYPES, InvertedIndex, resource_id
+from benchmarks.payloads import make_character
+
+CHARACTERS = 1500
+# Resource pool size and ids per character, by type
+POOLS = {"comics": 5000, "series": 800, "events": 80, "stories": 8000}
+PER_CHARACTER = {"comics": 20, "series": 20, "events": 8, "stories": 20}
+QUERIES = 100
+NUMBER = 5
+
+
+def make_catalog(seed: int) -> list:
+    """
+    Build characters whose resource ids are drawn from shared pools,
+    skewed towards low ids so popular resources have long posting lists.
+    """
+    rng = random.Random(seed)
+    base_uri = "http://gateway.marvel.com/v1/public"
+    catalog = []
+    for character_id in range(CHARACTERS):
+        character = make_character(character_id)
+        for resource_type in RESOURCE_TYPES:
+            ids = {
+                int(POOLS[resource_type] * rng.random() ** 3)
+                for _ in range(PER_CHARACTER[resource_type])
+            }
+            items = [
+                {"resourceURI": f"{base_uri}/{resource_type}/{id_}", "name": ""}
+                for id_ in sorted(ids)
+            ]
+            character[resource_type] = {
+                "available": len(items),
+                "returned": len(items),
+                "items": items,
+            }
+        catalog.append(character)
+    return catalog
+
+
+def make_queries(catalog: list, filter_count: int, seed: int) -> list:
+    """
+    Build filter queries from the resources of random characters,
+    so each query matches at least one character.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(QUERIES):
+        character = rng.choice(catalog)
+        filters = {}
+        for resource_type in rng.sample(RESOURCE_TYPES, filter_count):
+            item = rng.choice(character[resource_type]["items"])
+            filters[resource_type] = [resource_id(item["resourceURI"])]
+        queries.append(filters)
+    return queries
+
+
+def scan(catalog: list, filters: dict) -> list:
+    """
+    Answer a filter query by checking every character payload.
+    """
+    matches = []
+    for character in catalog:
+        for resource_type, ids in filters.items():
+            found = {
+                resource_id(item["resourceURI"])
+                for item in character[resource_type]["items"]
+            }
+            if found.isdisjoint(ids):
+                break
+        else:
+            matches.append(character["id"])
+    return matches
+
+
+def main():
+    """
+    Print per-query times for index intersections and payload scans.
+    """
+    logging.disable(logging.INFO)
+    catalog = make_catalog(seed=1)
+    index = InvertedIndex()
+    for character in catalog:
+        index.add(character)
+
+    print(
+        f"{'filters':>8}{'matches':>10}{'index us':>12}{'scan us':>12}{'speedup':>10}"
+    )
+    for filter_count in range(1, len(RESOURCE_TYPES) + 1):
+        queries = make_queries(catalog, filter_count, seed=filter_count)
+        started = time.perf_counter()
+        scanned = [scan(catalog, filters) for filters in queries]
+        scan_time = time.perf_counter() - started
+        assert scanned == [list(index.match(filters)) for filters in queries]
+
+        matches = sum(len(result) for result in scanned) / QUERIES
+        index_time = timeit.timeit(
+            lambda: [index.match(filters) for filters in queries], number=NUMBER
+        )
+        index_us = index_time / (NUMBER * QUERIES) * 1e6
+        scan_us = scan_time / QUERIES * 1e6
+        print(
+            f"{filter_count:>8}{matches:>10.1f}{index_us:>12.1f}"
+            f"{scan_us:>12.1f}{scan_us / index_us:>9.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark cache hits served by rebuilding messages vs pre-serialized bytes.
+
+Run with ``python -m benchmarks.bench_serialized_responses``.
+"""
+
+# pylint: disable=protected-access
+import timeit
+
+from app.grpc_services.marvel_service import MarvelService, serialize_response
+from benchmarks.payloads import make_api_response
+
+ROUNDS = 200
+
+
+def main():
+    """
+    Time the per-hit cost of both cache modes on a 100-character page.
+    """
+    service = MarvelService(serialized_responses=True)
+    api_response = make_api_response(count=100)
+    cache_key = "limit=100&offset=0"
+
+    def rebuild_hit():
+        serialize_response(service._build_response_from_cache(api_response))
+
+    def serialized_hit():
+        serialized = service._get_serialized(cache_key, api_response)
+        serialize_response(serialized)
+
+    service._set_serialized(
+        cache_key, api_response, service._build_response_from_cache(api_response)
+    )
+
+    rebuild = min(timeit.repeat(rebuild_hit, number=ROUNDS, repeat=3)) / ROUNDS
+    serialized = min(timeit.repeat(serialized_hit, number=ROUNDS, repeat=3)) / ROUNDS
+    size = len(service._get_serialized(cache_key, api_response))
+
+    print(f"Payload size:        {size / 1024:.1f} KiB")
+    print(f"Rebuild per hit:     {rebuild * 1e6:.1f} us")
+    print(f"Serialized per hit:  {serialized * 1e6:.1f} us")
+    print(f"Speedup:             {rebuild / serialized:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
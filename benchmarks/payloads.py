@@ -0,0 +1,68 @@
+"""
+Synthetic Marvel API payloads for benchmarks.
+"""
+
+RESOURCE_TYPES = ("comics", "stories", "events", "series")
+
+
+def make_resource_list(character_id: int, resource_type: str, size: int = 20) -> dict:
+    """
+    Build a resource list shaped like the Marvel API's.
+    """
+    base_uri = "http://gateway.marvel.com/v1/public"
+    items = []
+    for i in range(size):
+        item = {
+            "resourceURI": f"{base_uri}/{resource_type}/{character_id * 100 + i}",
+            "name": f"{resource_type.title()} #{i} of character {character_id}",
+        }
+        if resource_type == "stories":
+            item["type"] = "interiorStory" if i % 2 else "cover"
+        items.append(item)
+    return {
+        "available": size * 3,
+        "returned": size,
+        "collectionURI": f"{base_uri}/characters/{character_id}/{resource_type}",
+        "items": items,
+    }
+
+
+def make_character(character_id: int) -> dict:
+    """
+    Build a single character result shaped like the Marvel API's.
+    """
+    character = {
+        "id": character_id,
+        "name": f"Character {character_id}",
+        "description": "A hero from the Marvel universe. " * 4,
+        "modified": "2014-04-29T14:18:17-0400",
+        "thumbnail": {
+            "path": f"http://i.annihil.us/u/prod/marvel/i/mg/{character_id}",
+            "extension": "jpg",
+        },
+        "resourceURI": f"http://gateway.marvel.com/v1/public/characters/{character_id}",
+    }
+    for resource_type in RESOURCE_TYPES:
+        character[resource_type] = make_resource_list(character_id, resource_type)
+    return character
+
+
+def make_api_response(count: int = 100, offset: int = 0, total: int = 1500) -> dict:
+    """
+    Build a full character page shaped like the Marvel API's.
+    """
+    return {
+        "code": 200,
+        "status": "Ok",
+        "copyright": "© 2024 MARVEL",
+        "attributionText": "Data provided by Marvel. © 2024 MARVEL",
+        "attributionHTML": '<a href="http://marvel.com">Data provided by Marvel.</a>',
+        "etag": "f0fbae65eb2f8f28bdeea0a29be8749a4e67acb3",
+        "data": {
+            "offset": offset,
+            "limit": count,
+            "total": total,
+            "count": count,
+            "results": [make_character(1009000 + offset + i) for i in range(count)],
+        },
+    }
@@ -3,6 +3,8 @@ Marvel gRPC client.
 """
 
 # pylint: disable=no-member
+from collections import OrderedDict
+
 import grpc
 from app.grpc_services.proto import marvel_pb2, marvel_pb2_grpc
 
@@ -17,6 +19,66 @@ def fetch_characters(name_starts_with: str, offset: int, limit: int):
         return stub.GetCharacters(request)
 
 
+class CachingClient:
+    """
+    GetCharacters client that keeps the last response to each query and
+    sends its ETag as if_none_match, so polling an unchanged query only
+    transfers a small Not Modified response.
+    """
+
+    def __init__(self, target: str = "localhost:50051", maxsize: int = 1000):
+        """
+        Open a channel to the server.
+        :param target: Server address.
+        :param maxsize: Maximum number of responses kept.
+        """
+        self.channel = grpc.insecure_channel(target)
+        self.stub = marvel_pb2_grpc.MarvelServiceStub(self.channel)
+        self.maxsize = maxsize
+        self.responses = OrderedDict()
+        self.not_modified_count = 0
+
+    def get_characters(self, request: marvel_pb2.CharacterRequest):
+        """
+        Fetch characters, reusing the kept response if it is unchanged.
+        """
+        conditional = marvel_pb2.CharacterRequest()
+        conditional.CopyFrom(request)
+        conditional.ClearField("if_none_match")
+        key = conditional.SerializeToString(deterministic=True)
+        cached = self.responses.get(key)
+        if cached is not None and cached.etag:
+            conditional.if_none_match = cached.etag
+
+        response = self.stub.GetCharacters(conditional)
+        if response.code == 304 and cached is not None:
+            self.not_modified_count += 1
+            self.responses.move_to_end(key)
+            return cached
+
+        self.responses[key] = response
+        self.responses.move_to_end(key)
+        while len(self.responses) > self.maxsize:
+            self.responses.popitem(last=False)
+        return response
+
+    def close(self):
+        """
+        Close the channel.
+        """
+        self.channel.close()
+
+
+def stream_characters(name_starts_with: str, offset: int = 0, page_size: int = 100):
+    """Stream every Marvel character matching a prefix using the gRPC client."""
+    with grpc.insecure_channel("localhost:50051") as channel:
+        stub = marvel_pb2_grpc.MarvelServiceStub(channel)
+        request = marvel_pb2.CharacterRequest(
+            name_starts_with=name_starts_with, offset=offset, limit=page_size
+        )
+        yield from stub.StreamCharacters(request)
+
+
 def display_response(response: marvel_pb2.CharacterResponse):
     """Display the response from the server."""
     print(f"Code: {response.code}")
@@ -4,49 +4,229 @@ Marvel gRPC server and periodic task execution.
 
 import asyncio
 import logging
+import multiprocessing
+import os
+import signal
+import sys
 
 import grpc
-from app.grpc_services.proto.marvel_pb2_grpc import add_MarvelServiceServicer_to_server
-from app.grpc_services.marvel_service import MarvelService
-from app.tasks.marvel_task import enqueue_marvel_tasks
+from app.api.cache import cache
+from app.api.marvel_api import upstream_client
+from app.grpc_services.admission import admission_controller
+from app.grpc_services.marvel_service import MarvelService, add_marvel_service_to_server
+from app.tasks.marvel_task import (
+    delta_sync_marvel_cache,
+    enqueue_marvel_tasks,
+    load_character_store,
+    schedule_revalidation,
+    sync_character_store,
+)
 from app.tasks.cache_stats_task import log_cache_stats
 from app.utils.logging import configure_logging
 
+CHARACTER_STORE_ENABLED = (
+    os.getenv("CHARACTER_STORE_ENABLED", "false").lower() == "true"
+)
+CHARACTER_STORE_SYNC_INTERVAL = int(os.getenv("CHARACTER_STORE_SYNC_INTERVAL", "86400"))
+CHARACTER_STORE_LOAD_INTERVAL = int(os.getenv("CHARACTER_STORE_LOAD_INTERVAL", "60"))
+DELTA_SYNC_ENABLED = os.getenv("DELTA_SYNC_ENABLED", "false").lower() == "true"
+DELTA_SYNC_INTERVAL = int(os.getenv("DELTA_SYNC_INTERVAL", "300"))
+CACHE_COMPACT_INTERVAL = int(os.getenv("CACHE_COMPACT_INTERVAL", "60"))
+GRPC_WORKERS = int(os.getenv("GRPC_WORKERS", "1"))
+GRPC_MAX_CONCURRENT_RPCS = int(os.getenv("GRPC_MAX_CONCURRENT_RPCS", "0"))
+GRPC_KEEPALIVE_TIME_MS = int(os.getenv("GRPC_KEEPALIVE_TIME_MS", "60000"))
+GRPC_KEEPALIVE_TIMEOUT_MS = int(os.getenv("GRPC_KEEPALIVE_TIMEOUT_MS", "20000"))
+GRPC_MAX_RECEIVE_MESSAGE_LENGTH = int(
+    os.getenv("GRPC_MAX_RECEIVE_MESSAGE_LENGTH", str(4 * 1024 * 1024))
+)
+GRPC_MAX_SEND_MESSAGE_LENGTH = int(
+    os.getenv("GRPC_MAX_SEND_MESSAGE_LENGTH", str(16 * 1024 * 1024))
+)
+GRPC_COMPRESSION = os.getenv("GRPC_COMPRESSION", "none").lower()
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+
+COMPRESSION_ALGORITHMS = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
 logger = logging.getLogger(__name__)
 
 
-async def periodic_task_runner():
+async def periodic_task_runner(refresh: bool = True):
     """
     Periodically run tasks for cache updates and statistics logging.
+    :param refresh: Run the cache refresh tasks as well as logging.
     """
     while True:
         logger.debug("[Periodic Task] Enqueueing and executing tasks...")
-        await enqueue_marvel_tasks.kiq()
+        if refresh:
+            await enqueue_marvel_tasks.kiq()
         await log_cache_stats.kiq()
         await asyncio.sleep(20)
 
 
-async def start_grpc_server():
+async def character_store_sync_runner():
+    """
+    Periodically sync the local character store with the full catalog.
+    """
+    while True:
+        logger.debug("[Periodic Task] Syncing character store...")
+        await sync_character_store.kiq()
+        await asyncio.sleep(CHARACTER_STORE_SYNC_INTERVAL)
+
+
+async def character_store_load_runner():
+    """
+    Periodically load the character store published by the leader worker.
+    """
+    while True:
+        logger.debug("[Periodic Task] Loading shared character store...")
+        await load_character_store.kiq()
+        await asyncio.sleep(CHARACTER_STORE_LOAD_INTERVAL)
+
+
+async def delta_sync_runner():
+    """
+    Periodically apply upstream character changes to the cache.
+    """
+    while True:
+        await asyncio.sleep(DELTA_SYNC_INTERVAL)
+        logger.debug("[Periodic Task] Syncing modified characters...")
+        await delta_sync_marvel_cache.kiq()
+
+
+async def cache_compaction_runner(service: MarvelService):
+    """
+    Periodically compress cache entries that were not read recently.
+    Entries are encoded in a thread, one at a time, so RPCs keep being
+    served while a large backlog of cold entries is compressed.
+    """
+    while True:
+        await asyncio.sleep(CACHE_COMPACT_INTERVAL)
+        compressed = []
+        entries = cache.cold_entries()
+        while entries:
+            # Popped so each expanded value is freed once it is replaced,
+            # rather than all of them at once at the end
+            key, value = entries.pop()
+            data = await asyncio.to_thread(cache.codec.encode, value)
+            if cache.store_compressed(key, value, data):
+                compressed.append(key)
+        service.forget_serialized(compressed)
+        if compressed:
+            logger.info("[Periodic Task] Compressed %d cold entries.", len(compressed))
+
+
+def grpc_server_options() -> list:
+    """
+    Channel options for the gRPC server: keepalive pings to detect dead
+    clients, limits on message sizes and, with several workers, a shared
+    listening port.
+    """
+    return [
+        ("grpc.keepalive_time_ms", GRPC_KEEPALIVE_TIME_MS),
+        ("grpc.keepalive_timeout_ms", GRPC_KEEPALIVE_TIMEOUT_MS),
+        ("grpc.max_receive_message_length", GRPC_MAX_RECEIVE_MESSAGE_LENGTH),
+        ("grpc.max_send_message_length", GRPC_MAX_SEND_MESSAGE_LENGTH),
+        ("grpc.so_reuseport", int(GRPC_WORKERS > 1)),
+    ]
+
+
+async def start_grpc_server(service: MarvelService):
     """
     Start the gRPC server.
     """
-    server = grpc.aio.server()
-    add_MarvelServiceServicer_to_server(MarvelService(), server)
+    server = grpc.aio.server(
+        options=grpc_server_options(),
+        maximum_concurrent_rpcs=GRPC_MAX_CONCURRENT_RPCS or None,
+        compression=COMPRESSION_ALGORITHMS[GRPC_COMPRESSION],
+    )
+    add_marvel_service_to_server(service, server)
     server.add_insecure_port("[::]:50051")
     await server.start()
     await server.wait_for_termination()
 
 
-async def main():
+async def main(leader: bool = True):
     """
     Main function to start gRPC server and periodic task runner.
+    :param leader: Run the periodic refresh, character store sync and delta
+        sync; with several workers only the first one does, over the keys
+        of every worker, and the others load the character store it
+        publishes.
     """
     configure_logging()
-    await asyncio.gather(
-        start_grpc_server(),
-        periodic_task_runner(),
+    cache.on_stale = schedule_revalidation
+    cache.restore()
+    upstream_client.open()
+    # With admission control, upstream calls are queued and shed under load
+    service = MarvelService(
+        admission=admission_controller if ADMISSION_ENABLED else None
     )
+    cache.on_remove = service.forget
+    runners = [start_grpc_server(service), periodic_task_runner(refresh=leader)]
+    if CHARACTER_STORE_ENABLED:
+        runners.append(
+            character_store_sync_runner() if leader else character_store_load_runner()
+        )
+    if leader and DELTA_SYNC_ENABLED:
+        runners.append(delta_sync_runner())
+    if cache.compress_after:
+        runners.append(cache_compaction_runner(service))
+    try:
+        await asyncio.gather(*runners)
+    finally:
+        await upstream_client.close()
+        if cache.l2 is not None:
+            cache.l2.close()
+
+
+def run_worker(leader: bool):
+    """
+    Run the server in a worker process.
+    """
+    asyncio.run(main(leader=leader))
+
+
+def run_workers(count: int):
+    """
+    Start worker processes that all listen on the gRPC port through
+    SO_REUSEPORT, letting the kernel balance connections between them.
+    Workers are spawned rather than forked since gRPC does not support
+    forking, and share cache entries and the character store through
+    CACHE_SHARED_PATH.
+    :param count: Number of worker processes.
+    """
+    configure_logging()
+    if cache.l2 is None or not cache.l2.shared:
+        logger.warning(
+            "[Server] CACHE_SHARED_PATH is not set; workers will not share a cache."
+        )
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(
+            target=run_worker, args=(index == 0,), name=f"grpc-worker-{index}"
+        )
+        for index in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+    logger.info("[Server] Started %d workers.", count)
+    # Stop the workers when the container is stopped
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if GRPC_WORKERS > 1:
+        run_workers(GRPC_WORKERS)
+    else:
+        asyncio.run(main())
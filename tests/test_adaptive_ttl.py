@@ -0,0 +1,73 @@
+"""
+Tests for adaptive per-key TTLs.
+"""
+
+import unittest
+
+from app.utils.adaptive_ttl import AdaptiveTTL
+
+
+class TestAdaptiveTTL(unittest.TestCase):
+    """
+    Tests for the AdaptiveTTL class.
+    """
+
+    def setUp(self):
+        self.adaptive_ttl = AdaptiveTTL(ttl=300, min_ttl=60, max_ttl=1200)
+
+    def test_unknown_key_uses_default(self):
+        """
+        Test that keys without history get the default TTL.
+        """
+        self.assertEqual(self.adaptive_ttl.ttl_for("key1"), 300)
+
+    def test_stable_key_grows_to_max(self):
+        """
+        Test that unchanged revalidations raise the TTL up to max_ttl.
+        """
+        self.adaptive_ttl.record("key1", changed=False)
+        self.assertEqual(self.adaptive_ttl.ttl_for("key1"), 600)
+        for _ in range(5):
+            self.adaptive_ttl.record("key1", changed=False)
+        self.assertEqual(self.adaptive_ttl.ttl_for("key1"), 1200)
+
+    def test_volatile_key_shrinks_to_min(self):
+        """
+        Test that changes lower the TTL down to min_ttl.
+        """
+        self.adaptive_ttl.record("key1", changed=True)
+        self.assertEqual(self.adaptive_ttl.ttl_for("key1"), 150)
+        for _ in range(5):
+            self.adaptive_ttl.record("key1", changed=True)
+        self.assertEqual(self.adaptive_ttl.ttl_for("key1"), 60)
+
+    def test_history_is_bounded(self):
+        """
+        Test that only the most recently seen keys are remembered.
+        """
+        adaptive_ttl = AdaptiveTTL(ttl=300, max_keys=2)
+        for key in ("key1", "key2", "key3"):
+            adaptive_ttl.record(key, changed=False)
+        self.assertEqual(list(adaptive_ttl.ttls), ["key2", "key3"])
+        self.assertEqual(adaptive_ttl.ttl_for("key1"), 300)
+
+    def test_stats(self):
+        """
+        Test the reported TTL distribution.
+        """
+        for _ in range(3):
+            self.adaptive_ttl.record("stable", changed=False)
+        for _ in range(3):
+            self.adaptive_ttl.record("volatile", changed=True)
+        stats = self.adaptive_ttl.stats()
+        self.assertEqual(stats["keys"], 2)
+        self.assertEqual(stats["p10"], 60)
+        self.assertEqual(stats["p90"], 1200)
+        self.assertEqual(stats["at_min"], 1)
+        self.assertEqual(stats["at_max"], 1)
+        self.assertEqual(stats["unchanged"], 3)
+        self.assertEqual(stats["changed"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests for admission control.
+"""
+
+import asyncio
+import unittest
+
+from app.utils.admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController(unittest.TestCase):
+    """
+    Tests for the AdmissionController class.
+    """
+
+    def test_caps_concurrency(self):
+        """
+        Test that no more than max_concurrent requests run at once.
+        """
+        controller = AdmissionController(max_concurrent=2, latency_target=1.0)
+        running = []
+
+        async def request():
+            async with controller.admit():
+                running.append(controller.active)
+                await asyncio.sleep(0.01)
+
+        async def run_test():
+            await asyncio.gather(*(request() for _ in range(6)))
+
+        asyncio.run(run_test())
+        self.assertEqual(max(running), 2)
+        self.assertEqual(controller.stats()["admitted"], 6)
+        self.assertEqual(controller.stats()["active"], 0)
+        self.assertGreater(controller.average_latency, 0)
+
+    def test_rejects_when_expected_wait_exceeds_target(self):
+        """
+        Test that a request is rejected without queueing when the queue
+        ahead of it would take longer than the latency target.
+        """
+        controller = AdmissionController(max_concurrent=1, latency_target=0.5)
+        controller.average_latency = 1.0
+
+        async def run_test():
+            started = asyncio.Event()
+            release = asyncio.Event()
+
+            async def holder():
+                async with controller.admit():
+                    started.set()
+                    await release.wait()
+
+            task = asyncio.create_task(holder())
+            await started.wait()
+            with self.assertRaises(AdmissionRejected):
+                async with controller.admit():
+                    pass
+            release.set()
+            await task
+
+        asyncio.run(run_test())
+        self.assertEqual(controller.stats()["rejected"], 1)
+        self.assertEqual(controller.stats()["waiting"], 0)
+
+    def test_times_out_queued_request(self):
+        """
+        Test that a queued request gives up after the latency target.
+        """
+        controller = AdmissionController(max_concurrent=1, latency_target=0.05)
+
+        async def run_test():
+            started = asyncio.Event()
+            release = asyncio.Event()
+
+            async def holder():
+                async with controller.admit():
+                    started.set()
+                    await release.wait()
+
+            task = asyncio.create_task(holder())
+            await started.wait()
+            with self.assertRaises(AdmissionRejected):
+                async with controller.admit():
+                    pass
+            release.set()
+            await task
+            async with controller.admit():
+                pass
+
+        asyncio.run(run_test())
+        self.assertEqual(controller.stats()["timed_out"], 1)
+        self.assertEqual(controller.stats()["admitted"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Tests for the Bloom filter.
+"""
+
+import unittest
+
+from app.utils.bloom_filter import BloomFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+    """
+    Tests for the BloomFilter class.
+    """
+
+    def test_no_false_negatives(self):
+        """
+        Test that every added item is reported present.
+        """
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        names = [f"character {i}" for i in range(1000)]
+        for name in names:
+            bloom_filter.add(name)
+        self.assertTrue(all(name in bloom_filter for name in names))
+
+    def test_false_positive_rate(self):
+        """
+        Test that the false positive rate stays near the configured rate.
+        """
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(f"character {i}")
+        false_positives = sum(f"unknown {i}" in bloom_filter for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.03)
+
+    def test_duplicates_not_counted(self):
+        """
+        Test that adding an item twice counts it once.
+        """
+        bloom_filter = BloomFilter(capacity=100)
+        bloom_filter.add("hulk")
+        bloom_filter.add("hulk")
+        self.assertEqual(bloom_filter.stats()["items"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,14 @@ Test the Cache class.
 """
 
 import unittest
-from unittest.mock import patch
-from app.utils.cache import Cache, generate_cache_key
+from unittest.mock import MagicMock, patch
+from app.utils.adaptive_ttl import AdaptiveTTL
+from app.utils.cache import (
+    Cache,
+    canonical_params,
+    estimate_size,
+    generate_cache_key,
+)
 from app.grpc_services.marvel_service import MarvelService
 
 
@@ -145,12 +151,277 @@ class TestCache(unittest.TestCase):
             stats["hit_ratio"], 0.5, msg="Stats - Hit ratio incorrect."
         )
 
+    def test_stale_while_revalidate(self):
+        """
+        Test that expired entries are served within the stale window and
+        revalidated once per key.
+        """
+        on_stale = MagicMock()
+        cache = Cache(maxsize=3, ttl=300, stale_ttl=60, on_stale=on_stale)
+        with patch("time.time", return_value=1000):
+            cache.set("key1", "value1", etag="etag1")
+
+        with patch("time.time", return_value=1330):  # Expired but still stale
+            self.assertEqual(cache.get("key1"), "value1")
+            self.assertEqual(cache.get("key1"), "value1")
+        on_stale.assert_called_once_with("key1")
+        self.assertEqual(cache.stats()["stale_hits"], 2)
+        self.assertEqual(cache.get_etag("key1"), "etag1")
+
+        cache.end_revalidation("key1")
+        with patch("time.time", return_value=1361):  # Past the stale window
+            self.assertIsNone(cache.get("key1"))
+        self.assertIsNone(cache.get_etag("key1"))
+
+    def test_negative_entry_is_not_revalidated(self):
+        """
+        Test that an entry with its own TTL expires without a revalidation.
+        """
+        on_stale = MagicMock()
+        cache = Cache(maxsize=3, ttl=300, stale_ttl=60, on_stale=on_stale)
+        with patch("time.time", return_value=1000):
+            cache.set("missing", {}, ttl=60)
+        with patch("time.time", return_value=1070):
+            cache.get("missing")
+        on_stale.assert_not_called()
+
+    def test_touch_renews_entry(self):
+        """
+        Test that touching an entry restarts its TTL.
+        """
+        with patch("time.time", return_value=1000):
+            self.cache.set("key1", "value1")
+        with patch("time.time", return_value=1200):
+            self.cache.touch("key1")
+        with patch("time.time", return_value=1400):
+            self.assertEqual(self.cache.get("key1"), "value1")
+
+    @patch("app.utils.cache.random.random")
+    def test_xfetch_early_refresh(self, mock_random):
+        """
+        Test that XFetch refreshes a fresh entry close to its expiry.
+        """
+        on_stale = MagicMock()
+        cache = Cache(maxsize=3, ttl=300, xfetch_beta=1.0, on_stale=on_stale)
+        with patch("time.time", return_value=1000):
+            cache.set("key1", "value1", compute_time=2.0)
+
+        mock_random.return_value = 0.5  # Early gap of 2 * ln(2) ~= 1.39 seconds
+        with patch("time.time", return_value=1100):
+            self.assertEqual(cache.get("key1"), "value1")
+        on_stale.assert_not_called()
+
+        with patch("time.time", return_value=1299):
+            self.assertEqual(cache.get("key1"), "value1")
+        on_stale.assert_called_once_with("key1")
+        self.assertEqual(cache.stats()["early_refreshes"], 1)
+
+    def test_max_bytes_eviction(self):
+        """
+        Test that the oldest entries are evicted to stay under the byte budget.
+        """
+        small = {"items": ["x" * 100]}
+        large = {"items": ["x" * 100] * 20}
+        budget = estimate_size(large) + estimate_size(small)
+        cache = Cache(maxsize=100, ttl=300, max_bytes=budget)
+
+        cache.set("small1", small)
+        cache.set("small2", small)
+        self.assertEqual(cache.stats()["bytes"], 2 * estimate_size(small))
+
+        cache.set("large", large)  # Evicts only "small1"
+        self.assertIsNone(cache.get("small1"))
+        self.assertEqual(cache.get("small2"), small)
+        self.assertLessEqual(cache.current_bytes, budget)
+
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"]["max_bytes"], 1)
+        self.assertEqual(stats["largest_entries"][0], ("large", estimate_size(large)))
+
+    def test_max_bytes_rejects_oversized_entry(self):
+        """
+        Test that a value larger than the whole budget is not cached.
+        """
+        cache = Cache(maxsize=100, ttl=300, max_bytes=1000)
+        cache.set("key1", {"items": ["x" * 100]})
+        cache.set("key1", {"items": ["x" * 2000]})
+
+        self.assertIsNone(cache.get("key1"))
+        self.assertEqual(cache.current_bytes, 0)
+        self.assertEqual(cache.stats()["evictions"]["too_large"], 1)
+
     def test_generate_cache_key(self):
         """
-        Test that the cache key is generated correctly.
+        Test that equivalent queries share a fixed-size key.
+        """
+        key = generate_cache_key({"name": "Hulk", "comics": [2, 1], "limit": 20})
+        self.assertEqual(len(key), 32)
+        self.assertEqual(
+            key,
+            generate_cache_key(
+                {"comics": [1, 2, 1], "name": "hulk", "series": [], "order_by": ""}
+            ),
+        )
+        self.assertNotEqual(key, generate_cache_key({"name": "Hulk", "limit": 10}))
+
+    def test_canonical_params(self):
+        """
+        Test that defaults are applied and empty values dropped.
+        """
+        self.assertEqual(
+            canonical_params(
+                {"name_starts_with": "SPI", "stories": (3, 3), "limit": 0, "name": ""}
+            ),
+            {"name_starts_with": "spi", "stories": [3], "limit": 20, "offset": 0},
+        )
+
+    def test_entry_ttl(self):
+        """
+        Test that an entry's own TTL overrides the cache TTL.
+        """
+        with patch("time.time", return_value=1000):
+            self.cache.set("empty", {}, ttl=10)
+            self.cache.set("key1", "value1")
+        with patch("time.time", return_value=1011):
+            self.assertIsNone(self.cache.get("empty"))
+            self.assertEqual(self.cache.get("key1"), "value1")
+
+    def test_adaptive_ttl(self):
+        """
+        Test that revalidation outcomes adapt the TTL of an entry.
+        """
+        cache = Cache(maxsize=10, ttl=300, adaptive_ttl=AdaptiveTTL(ttl=300))
+        cache.set("stable", "value1", etag="a")
+        cache.touch("stable")
+        cache.set("stable", "value1", etag="a")
+        self.assertEqual(cache.entry_ttl("stable"), 1200)
+
+        cache.set("volatile", "value1", etag="a")
+        cache.set("volatile", "value2", etag="b")
+        self.assertEqual(cache.entry_ttl("volatile"), 150)
+        cache.invalidate("volatile")
+        self.assertEqual(cache.entry_ttl("volatile"), 75)
+
+        cache.set("empty", {}, etag="a", ttl=10)
+        cache.touch("empty")
+        self.assertEqual(cache.entry_ttl("empty"), 10)
+
+    def test_compact_cold_entries(self):
+        """
+        Test that unread entries are compressed and expanded on their next hit.
+        """
+        cache = Cache(maxsize=10, ttl=300, compress_after=60, max_bytes=10**6)
+        value = {"data": {"results": [{"id": 1, "name": "Hulk"}] * 20}}
+        with patch("time.time", return_value=1000):
+            cache.set("cold", value)
+            cache.set("hot", value)
+        with patch("time.time", return_value=1050):
+            cache.get("hot")
+        expanded_bytes = cache.current_bytes
+
+        self.assertEqual(cache.compact(now=1100), ["cold"])
+        self.assertEqual(cache.compact(now=1100), [])
+        compressed_bytes = cache.current_bytes
+        self.assertLess(compressed_bytes, expanded_bytes)
+        self.assertEqual(cache.entry("cold"), (value, 1000))
+        self.assertEqual(cache.stats()["compressed_entries"], 1)
+
+        with patch("time.time", return_value=1100):
+            self.assertEqual(cache.get("cold"), value)
+        self.assertGreater(cache.current_bytes, compressed_bytes)
+        stats = cache.stats()
+        self.assertEqual(stats["compressed_entries"], 0)
+        self.assertEqual(stats["compressions"], 1)
+        self.assertEqual(stats["decompressions"], 1)
+
+    def test_store_compressed_skips_replaced_entry(self):
+        """
+        Test that an entry replaced while it was being encoded stays as is.
+        """
+        cache = Cache(maxsize=10, ttl=300, compress_after=60)
+        with patch("time.time", return_value=1000):
+            cache.set("key1", {"name": "Hulk"})
+        ((key, value),) = cache.cold_entries(now=1100)
+        data = cache.codec.encode(value)
+        cache.set("key1", {"name": "She-Hulk"})
+        self.assertFalse(cache.store_compressed(key, value, data))
+        self.assertEqual(cache.get("key1"), {"name": "She-Hulk"})
+
+    def test_expand_evicts_over_max_bytes(self):
+        """
+        Test that expanding a compressed entry evicts to stay within max_bytes.
+        """
+        value = {"data": {"results": [{"id": 1, "name": "Hulk"}] * 20}}
+        budget = estimate_size(value) + 500
+        cache = Cache(maxsize=10, ttl=300, compress_after=60, max_bytes=budget)
+        with patch("time.time", return_value=1000):
+            cache.set("key1", value)
+            cache.compact(now=1100)
+            cache.set("key2", value)
+            cache.get("key1")
+        self.assertLessEqual(cache.current_bytes, budget)
+        self.assertEqual(cache.stats()["evictions"]["max_bytes"], 1)
+
+    def test_compact_disabled(self):
+        """
+        Test that nothing is compressed without compress_after.
+        """
+        self.cache.set("key1", {"name": "Hulk"})
+        self.assertEqual(self.cache.compact(now=10**10), [])
+
+    def test_get_stale_within_stale_if_error(self):
+        """
+        Test that expired entries are kept for get_stale for stale_if_error.
+        """
+        cache = Cache(maxsize=10, ttl=300, stale_if_error=600)
+        with patch("time.time", return_value=1000):
+            cache.set("key1", "value1")
+        with patch("time.time", return_value=1400):
+            self.assertIsNone(cache.get("key1"))
+            self.assertEqual(cache.get_stale("key1"), "value1")
+        with patch("time.time", return_value=1901):
+            self.assertIsNone(cache.get_stale("key1"))
+        self.assertEqual(cache.stats()["stale_if_error_hits"], 1)
+
+    def test_servable(self):
+        """
+        Test that servable covers fresh and stale-window entries without
+        counting a hit or miss.
+        """
+        cache = Cache(maxsize=10, ttl=300, stale_ttl=60)
+        with patch("time.time", return_value=1000):
+            cache.set("key1", "value1")
+        with patch("time.time", return_value=1350):
+            self.assertTrue(cache.servable("key1"))
+        with patch("time.time", return_value=1361):
+            self.assertFalse(cache.servable("key1"))
+        self.assertFalse(cache.servable("key2"))
+        self.assertEqual(cache.stats()["hits"] + cache.stats()["misses"], 0)
+
+    def test_on_remove(self):
+        """
+        Test that on_remove receives evicted, invalidated and cleared keys.
+        """
+        removed = []
+        cache = Cache(maxsize=2, ttl=300, on_remove=removed.append)
+        cache.set("key1", "value1")
+        cache.set("key1", "value1b")
+        cache.set("key2", "value2")
+        cache.set("key3", "value3")
+        cache.invalidate("key2")
+        cache.invalidate("missing")
+        cache.clear()
+        self.assertEqual(removed, ["key1", "key2", "key3"])
+
+    def test_params_stored_with_entry(self):
+        """
+        Test that query parameters are kept until the entry is removed.
         """
-        self.assertEqual(generate_cache_key({"a": 1, "b": 2}), "a=1&b=2")
-        self.assertEqual(generate_cache_key({"b": 1, "a": 2}), "a=2&b=1")
+        self.cache.set("key1", "value1", params={"name": "hulk"})
+        self.cache.set("key1", "value2")
+        self.assertEqual(self.cache.get_params("key1"), {"name": "hulk"})
+        self.cache.invalidate("key1")
+        self.assertIsNone(self.cache.get_params("key1"))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+"""
+Tests for the cache eviction policies.
+"""
+
+import unittest
+
+from app.utils.cache import Cache
+from app.utils.cache_policy import (
+    CountMinSketch,
+    LRUPolicy,
+    WTinyLFUPolicy,
+    make_policy,
+)
+
+
+class TestCachePolicy(unittest.TestCase):
+    """
+    Tests for the cache eviction policies.
+    """
+
+    def test_lru_keeps_recently_read_keys(self):
+        """
+        Test that a read protects a key from LRU eviction.
+        """
+        cache = Cache(maxsize=3, ttl=300, policy="lru")
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.set("key3", "value3")
+        cache.get("key1")
+        cache.set("key4", "value4")  # Should evict "key2"
+
+        self.assertEqual(cache.get("key1"), "value1")
+        self.assertIsNone(cache.get("key2"))
+
+    def test_fifo_ignores_reads(self):
+        """
+        Test that FIFO evicts in insertion order regardless of reads.
+        """
+        cache = Cache(maxsize=3, ttl=300, policy="fifo")
+        cache.set("key1", "value1")
+        cache.set("key2", "value2")
+        cache.set("key3", "value3")
+        cache.get("key1")
+        cache.set("key4", "value4")  # Should evict "key1"
+
+        self.assertIsNone(cache.get("key1"))
+        self.assertEqual(cache.get("key2"), "value2")
+
+    def test_tinylfu_resists_scans(self):
+        """
+        Test that one-off keys do not evict frequently read keys.
+        Hot keys keep being read during the scan, since the sketch ages
+        frequencies and rightly forgets keys no longer read.
+        """
+        cache = Cache(maxsize=10, ttl=300, policy="tinylfu")
+        hot_keys = [f"hot{i}" for i in range(5)]
+        for _ in range(5):
+            for key in hot_keys:
+                if cache.get(key) is None:
+                    cache.set(key, key)
+
+        for i in range(100):
+            cache.set(f"scan{i}", i)
+            if i % 10 == 9:
+                for key in hot_keys:
+                    self.assertEqual(cache.get(key), key, f"Hot key {key} was evicted.")
+        self.assertEqual(len(cache.keys()), 10)
+
+    def test_count_min_sketch(self):
+        """
+        Test that the sketch counts, saturates and ages frequencies.
+        """
+        sketch = CountMinSketch(capacity=256)
+        for _ in range(3):
+            sketch.increment("key1")
+        self.assertGreaterEqual(sketch.frequency("key1"), 3)
+
+        for _ in range(sketch.sample_size):
+            sketch.increment("key2")
+        self.assertLessEqual(sketch.frequency("key2"), CountMinSketch.MAX_COUNT)
+        self.assertLessEqual(sketch.frequency("key1"), 1)
+
+    def test_make_policy(self):
+        """
+        Test building policies by name or passing an instance through.
+        """
+        self.assertIsInstance(make_policy("LRU", 10), LRUPolicy)
+        self.assertIsInstance(make_policy("tinylfu", 10), WTinyLFUPolicy)
+        policy = LRUPolicy(maxsize=10)
+        self.assertIs(make_policy(policy, 10), policy)
+        with self.assertRaises(ValueError):
+            make_policy("random", 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
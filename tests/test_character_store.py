@@ -0,0 +1,182 @@
+"""
+Tests for the local character store.
+"""
+
+import unittest
+
+from app.utils.bloom_filter import BloomFilter
+from app.utils.character_store import CharacterStore
+
+NAMES = ["Spider-Man", "Spider-Woman", "Spider-Girl", "Hulk", "Iron Man", "Spiral"]
+
+
+def make_response(results: list) -> dict:
+    """
+    Build a Marvel API response around a list of characters.
+    """
+    return {
+        "code": 200,
+        "attributionText": "Data provided by Marvel.",
+        "data": {"total": len(results), "count": len(results), "results": results},
+    }
+
+
+class TestCharacterStore(unittest.TestCase):
+    """
+    Tests for the CharacterStore class.
+    """
+
+    def setUp(self):
+        self.store = CharacterStore()
+        self.store.load(
+            make_response(
+                [
+                    {"id": i, "name": name, "modified": f"2020-01-0{i}"}
+                    for i, name in enumerate(NAMES, start=1)
+                ]
+            )
+        )
+        self.store.mark_complete()
+
+    def names(self, response: dict) -> list:
+        return [result["name"] for result in response["data"]["results"]]
+
+    def test_prefix_query(self):
+        """
+        Test that name_starts_with matches case-insensitively in name order.
+        """
+        response = self.store.query({"name_starts_with": "SPIDER"})
+        self.assertEqual(
+            self.names(response), ["Spider-Girl", "Spider-Man", "Spider-Woman"]
+        )
+        self.assertEqual(response["data"]["total"], 3)
+        self.assertEqual(response["attributionText"], "Data provided by Marvel.")
+
+    def test_failed_response_keeps_attribution(self):
+        """
+        Test that only successful responses replace the attribution.
+        """
+        self.store.load({"code": 404, "data": {"results": []}})
+        response = self.store.query({"name": "hulk"})
+        self.assertEqual(response["code"], 200)
+        self.assertEqual(response["attributionText"], "Data provided by Marvel.")
+
+    def test_exact_name_query(self):
+        """
+        Test that name only matches the full name.
+        """
+        response = self.store.query({"name": "spider-man"})
+        self.assertEqual(self.names(response), ["Spider-Man"])
+        self.assertEqual(self.store.query({"name": "Spider"})["data"]["count"], 0)
+
+    def test_order_and_paging(self):
+        """
+        Test ordering by modified date and slicing with offset and limit.
+        """
+        response = self.store.query(
+            {
+                "name_starts_with": "spi",
+                "order_by": "-modified",
+                "limit": 2,
+                "offset": 1,
+            }
+        )
+        self.assertEqual(self.names(response), ["Spider-Girl", "Spider-Woman"])
+        self.assertEqual(response["data"]["total"], 4)
+        self.assertEqual(
+            (response["data"]["offset"], response["data"]["limit"]), (1, 2)
+        )
+
+        response = self.store.query({"order_by": "-name", "limit": 1})
+        self.assertEqual(self.names(response), ["Spiral"])
+
+    def test_falls_back_when_unanswerable(self):
+        """
+        Test that unsupported filters and an incomplete mirror return None.
+        """
+        self.assertIsNone(self.store.query({"name": "Hulk", "comics": [1]}))
+        self.assertIsNone(self.store.query({"order_by": "unknown"}))
+
+        incomplete = CharacterStore()
+        incomplete.load(make_response([{"id": 1, "name": "Hulk"}]))
+        self.assertIsNone(incomplete.query({"name": "Hulk"}))
+        self.assertEqual(self.store.stats()["fallbacks"], 2)
+
+    def test_upsert_reindexes(self):
+        """
+        Test that a renamed character is only found under its new name.
+        """
+        self.store.upsert([{"id": 4, "name": "Savage Hulk", "modified": "2021"}])
+        self.assertEqual(self.store.query({"name": "hulk"})["data"]["count"], 0)
+        self.assertEqual(
+            self.names(self.store.query({"name_starts_with": "sav"})), ["Savage Hulk"]
+        )
+        self.assertEqual(len(self.store), len(NAMES))
+        self.assertEqual(len(self.store.name_index), len(NAMES))
+
+    def test_pages_rebuild_store(self):
+        """
+        Test that another store loaded from the pages answers the same queries.
+        """
+        pages = self.store.pages(page_size=4)
+        self.assertEqual([page["data"]["count"] for page in pages], [4, 2])
+
+        copy = CharacterStore()
+        for page in pages:
+            copy.load(page)
+        copy.mark_complete()
+        self.assertEqual(len(copy), len(NAMES))
+        self.assertEqual(
+            copy.query({"name_starts_with": "spi"}),
+            self.store.query({"name_starts_with": "spi"}),
+        )
+
+    def test_excludes_unknown_names(self):
+        """
+        Test that the name filter rules out names once the catalog is complete.
+        """
+        store = CharacterStore(name_filter=BloomFilter(capacity=100))
+        store.upsert([{"id": 1, "name": "Spider-Man"}])
+        self.assertFalse(store.excludes("Spyder-Man"))
+
+        store.mark_complete()
+        self.assertTrue(store.excludes("Spyder-Man"))
+        self.assertFalse(store.excludes("SPIDER-MAN"))
+        self.assertFalse(self.store.excludes("Spyder-Man"))
+        self.assertEqual(store.stats()["excluded_names"], 1)
+
+    def test_filter_query_after_observed_page(self):
+        """
+        Test that a full single-id filter page makes that id answerable.
+        """
+        store = CharacterStore()
+        params = {"comics": [10], "limit": 100, "offset": 0}
+        self.assertIsNone(store.query(params))
+
+        store.observe(
+            params,
+            make_response(
+                [{"id": 2, "name": "Wolverine"}, {"id": 1, "name": "Cyclops"}]
+            ),
+        )
+        response = store.query({"comics": [10], "name_starts_with": "wol"})
+        self.assertEqual(self.names(response), ["Wolverine"])
+        self.assertEqual(
+            self.names(store.query({"comics": [10]})), ["Cyclops", "Wolverine"]
+        )
+        self.assertIsNone(store.query({"comics": [10], "series": [5]}))
+        self.assertIsNone(store.query({"name": "Cyclops"}))
+
+    def test_partial_page_does_not_complete_filter(self):
+        """
+        Test that a page not covering the total leaves the id unanswerable.
+        """
+        store = CharacterStore()
+        page = make_response([{"id": 1, "name": "Cyclops"}])
+        page["data"]["total"] = 40
+        store.observe({"comics": [10], "limit": 1}, page)
+        self.assertIsNone(store.query({"comics": [10]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the circuit breaker.
+"""
+
+import unittest
+
+from app.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Tests for the CircuitBreaker class.
+    """
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(
+            window=10, min_calls=4, failure_rate=0.5, open_seconds=30
+        )
+
+    def fail(self, count: int, now: float = 0):
+        for _ in range(count):
+            self.breaker.record(False, 0.1, now=now)
+
+    def test_opens_on_failure_rate(self):
+        """
+        Test that the circuit opens once enough calls in the window failed.
+        """
+        self.breaker.record(True, 0.1)
+        self.fail(2)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.fail(1)
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow(now=10)
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+
+    def test_slow_calls_count_as_failures(self):
+        """
+        Test that calls slower than the slow call threshold open the circuit.
+        """
+        for _ in range(4):
+            self.breaker.record(True, 10.0, now=0)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_half_open_trial(self):
+        """
+        Test that one trial call is let through after open_seconds.
+        """
+        self.fail(4)
+        self.breaker.allow(now=31)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow(now=32)
+
+        self.breaker.record(False, 0.1, now=33)
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.breaker.allow(now=64)
+        self.breaker.record(True, 0.1, now=64)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.allow(now=65)
+
+    def test_abandoned_trial_is_replaced(self):
+        """
+        Test that a trial call that never reports back does not block forever.
+        """
+        self.fail(4)
+        self.breaker.allow(now=31)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow(now=40)
+        self.breaker.allow(now=61)
+
+    def test_latency_percentile(self):
+        """
+        Test the latency percentile of successful calls.
+        """
+        self.assertIsNone(self.breaker.latency_percentile(0.95))
+        for latency in (0.1, 0.2, 0.3, 0.4):
+            self.breaker.record(True, latency)
+        self.assertEqual(self.breaker.latency_percentile(0.95), 0.4)
+        self.assertEqual(self.breaker.latency_percentile(0.5), 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
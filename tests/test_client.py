@@ -0,0 +1,46 @@
+"""
+Tests for the gRPC client.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.grpc_services.proto import marvel_pb2
+from client import CachingClient
+
+
+class TestCachingClient(unittest.TestCase):
+    """
+    Tests for the CachingClient class.
+    """
+
+    @patch("client.grpc.insecure_channel")
+    def test_reuses_unchanged_response(self, _mock_channel):
+        """
+        Test that the kept response's ETag is sent and reused on Not Modified.
+        """
+        client = CachingClient()
+        client.stub = MagicMock()
+        full = marvel_pb2.CharacterResponse(
+            code=200,
+            etag="page-etag",
+            characters=[marvel_pb2.Character(id=1, name="Hulk")],
+        )
+        client.stub.GetCharacters.side_effect = [
+            full,
+            marvel_pb2.CharacterResponse(code=304, etag="page-etag"),
+        ]
+        request = marvel_pb2.CharacterRequest(name="Hulk")
+
+        self.assertIs(client.get_characters(request), full)
+        self.assertEqual(client.stub.GetCharacters.call_args[0][0].if_none_match, "")
+        self.assertIs(client.get_characters(request), full)
+        self.assertEqual(
+            client.stub.GetCharacters.call_args[0][0].if_none_match, "page-etag"
+        )
+        self.assertEqual(client.not_modified_count, 1)
+        self.assertEqual(request.if_none_match, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+"""
+Tests for cache entry codecs.
+"""
+
+import unittest
+
+from app.utils.compression import ZlibCodec
+
+
+class TestZlibCodec(unittest.TestCase):
+    """
+    Tests for the ZlibCodec class.
+    """
+
+    def test_round_trip(self):
+        """
+        Test that decoding returns an equal value in fewer bytes.
+        """
+        codec = ZlibCodec()
+        value = {"data": {"results": [{"id": 1, "name": "Hulk ✓"}] * 50}}
+        data = codec.encode(value)
+        self.assertIsInstance(data, bytes)
+        self.assertLess(len(data), len(str(value)))
+        self.assertEqual(codec.decode(data), value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+"""
+Tests for RPC deadline accounting.
+"""
+
+import unittest
+
+from app.utils.deadlines import DeadlineTracker
+
+
+class TestDeadlineTracker(unittest.TestCase):
+    """
+    Tests for the DeadlineTracker class.
+    """
+
+    def test_stats(self):
+        """
+        Test the exceeded and cancelled counters.
+        """
+        tracker = DeadlineTracker()
+        tracker.record_exceeded()
+        tracker.record_cancelled()
+        tracker.record_cancelled()
+        self.assertEqual(tracker.stats(), {"exceeded": 1, "cancelled": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Tests for the delta sync.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from app.utils.cache import Cache, generate_cache_key
+from app.utils.character_store import CharacterStore
+from app.utils.delta_sync import DeltaSync, affects, format_modified_since, matches
+
+BASE_URI = "http://gateway.marvel.com/v1/public"
+
+
+def make_character(character_id: int, name: str, comics=(), available=None) -> dict:
+    """
+    Build a character payload appearing in the given comics.
+    """
+    return {
+        "id": character_id,
+        "name": name,
+        "comics": {
+            "available": len(comics) if available is None else available,
+            "returned": len(comics),
+            "items": [{"resourceURI": f"{BASE_URI}/comics/{id_}"} for id_ in comics],
+        },
+    }
+
+
+def make_page(*characters) -> dict:
+    """
+    Build a cached page holding the given characters.
+    """
+    return {"data": {"total": len(characters), "results": list(characters)}}
+
+
+class TestDeltaSync(unittest.TestCase):
+    """
+    Tests for the DeltaSync class and change matching.
+    """
+
+    def setUp(self):
+        self.cache = Cache(maxsize=10, ttl=300)
+        self.params = {}
+        self.delta_sync = DeltaSync(self.cache, params_for=self.params.get)
+
+    def add_entry(self, params: dict, page: dict) -> str:
+        """
+        Cache a page and register its query parameters.
+        """
+        cache_key = generate_cache_key(params)
+        self.params[cache_key] = params
+        self.cache.set(cache_key, page, etag="etag")
+        return cache_key
+
+    def test_format_modified_since(self):
+        """
+        Test formatting a timestamp for the modifiedSince parameter.
+        """
+        self.assertEqual(format_modified_since(0), "1970-01-01T00:00:00+0000")
+
+    def test_matches(self):
+        """
+        Test matching names and resource filters, including truncated lists.
+        """
+        hulk = make_character(1, "Hulk", comics=[10])
+        self.assertTrue(matches({"name_starts_with": "hu", "comics": [10]}, hulk))
+        self.assertFalse(matches({"name": "Thor"}, hulk))
+        self.assertFalse(matches({"comics": "11"}, hulk))
+        truncated = make_character(1, "Hulk", comics=[10], available=40)
+        self.assertIsNone(matches({"comics": [11]}, truncated))
+
+    def test_affects(self):
+        """
+        Test which changes can alter a query's pages.
+        """
+        before = make_character(1, "Hulk", comics=[10])
+        described = {**before, "description": "Green"}
+        self.assertFalse(affects({"name": "Hulk"}, before, described))
+        self.assertTrue(affects({"order_by": "-modified"}, before, described))
+        self.assertTrue(affects({}, before, {**before, "name": "Savage Hulk"}))
+        self.assertFalse(
+            affects({"name": "Thor"}, before, {**before, "name": "Hulk 2"})
+        )
+        self.assertTrue(
+            affects({"comics": [11]}, before, make_character(1, "Hulk", comics=[11]))
+        )
+        self.assertTrue(affects({}, None, described))
+        self.assertFalse(affects({"name": "Thor"}, None, described))
+
+    def test_apply(self):
+        """
+        Test that entries are patched, invalidated or renewed per change.
+        """
+        hulk = make_character(1, "Hulk", comics=[10])
+        thor = make_character(2, "Thor", comics=[20])
+        with patch("time.time", return_value=1000):
+            hulk_key = self.add_entry({"name": "Hulk"}, make_page(hulk))
+            thor_key = self.add_entry({"name": "Thor"}, make_page(thor))
+            recent_key = self.add_entry({"order_by": "-modified"}, make_page(hulk))
+
+        self.assertEqual(self.delta_sync.since(), 1000)
+        changed = {**hulk, "description": "Green"}
+        with patch("time.time", return_value=1200):
+            summary = self.delta_sync.apply([changed], started=1200)
+
+        self.assertEqual(summary, {"patched": 1, "invalidated": 1, "renewed": 1})
+        self.assertEqual(self.cache.store[hulk_key][0]["data"]["results"], [changed])
+        self.assertNotEqual(self.cache.store[hulk_key][0]["etag"], "")
+        self.assertIsNone(self.cache.get_etag(hulk_key))
+        self.assertNotIn(recent_key, self.cache.store)
+        self.assertEqual(self.cache.store[thor_key][1], 1200)
+        self.assertEqual(self.cache.get_etag(thor_key), "etag")
+        self.assertEqual(self.delta_sync.watermark, 1200)
+
+    def test_apply_invalidates_entries_without_params(self):
+        """
+        Test that an entry without query parameters is invalidated by a
+        change rather than aborting the sync.
+        """
+        with patch("time.time", return_value=1000):
+            legacy_key = generate_cache_key({"name": "Hulk"})
+            self.cache.set(legacy_key, make_page(make_character(1, "Hulk")))
+            thor_key = self.add_entry({"name": "Thor"}, make_page())
+
+        summary = self.delta_sync.apply(
+            [make_character(1, "Hulk", comics=[10])], started=1200
+        )
+
+        self.assertEqual(summary["invalidated"], 1)
+        self.assertNotIn(legacy_key, self.cache.store)
+        self.assertIn(thor_key, self.cache.store)
+
+    def test_apply_updates_store(self):
+        """
+        Test that the store supplies previous payloads and receives changes.
+        """
+        store = CharacterStore()
+        store.upsert([make_character(1, "Hulk")])
+        delta_sync = DeltaSync(self.cache, store, params_for=self.params.get)
+        listing_key = self.add_entry({"name_starts_with": "t"}, make_page())
+
+        summary = delta_sync.apply(
+            [{**make_character(1, "Hulk"), "description": "Green"}], started=2000
+        )
+
+        self.assertEqual(summary["invalidated"], 0)
+        self.assertIsNotNone(self.cache.peek(listing_key))
+        self.assertEqual(store.characters[1]["description"], "Green")
+
+
+if __name__ == "__main__":
+    unittest.main()
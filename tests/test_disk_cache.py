@@ -0,0 +1,142 @@
+"""
+Tests for the persistent second cache tier.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from app.utils.cache import Cache
+from app.utils.disk_cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+    """
+    Tests for the DiskCache class and its use as a Cache second tier.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.db")
+        self.l2 = DiskCache(self.path, maxsize=3, trim_interval=1)
+
+    def tearDown(self):
+        self.l2.close()
+        self.tmpdir.cleanup()
+
+    def test_put_get_delete(self):
+        """
+        Test writing, reading and deleting entries.
+        """
+        self.l2.put("key1", {"data": [1, 2]}, "etag1", 1000.0, {"name": "hulk"})
+        self.l2.flush()
+        self.assertEqual(
+            self.l2.get("key1"), ({"data": [1, 2]}, "etag1", 1000.0, {"name": "hulk"})
+        )
+
+        self.l2.delete("key1")
+        self.l2.flush()
+        self.assertIsNone(self.l2.get("key1"))
+
+    def test_values_encoded_by_writer_thread(self):
+        """
+        Test that values are encoded off the calling thread.
+        """
+        threads = []
+        dumps = json.dumps
+
+        def record_dumps(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return dumps(*args, **kwargs)
+
+        with patch("app.utils.disk_cache.json.dumps", side_effect=record_dumps):
+            self.l2.put("key1", {"data": [1, 2]}, "etag1", 1000.0, {"name": "hulk"})
+            self.l2.flush()
+        self.assertEqual(threads, [self.l2.writer, self.l2.writer])
+        self.assertEqual(self.l2.get("key1")[0], {"data": [1, 2]})
+
+    def test_trim_to_maxsize(self):
+        """
+        Test that the oldest entries are trimmed beyond maxsize.
+        """
+        for i in range(5):
+            self.l2.put(f"key{i}", i, "", 1000.0 + i)
+        self.l2.flush()
+
+        keys = [entry[0] for entry in self.l2.load(limit=10)]
+        self.assertEqual(keys, ["key4", "key3", "key2"])
+
+    def test_promote_on_read(self):
+        """
+        Test that entries evicted from memory are promoted back from disk.
+        """
+        cache = Cache(maxsize=1, ttl=300, l2=self.l2)
+        cache.set("key1", {"value": 1}, etag="etag1", params={"name": "hulk"})
+        cache.set("key2", {"value": 2})  # Evicts "key1" from memory only
+        self.l2.flush()
+
+        self.assertEqual(cache.get("key1"), {"value": 1})
+        self.assertEqual(cache.get_etag("key1"), "etag1")
+        self.assertEqual(cache.stats()["l2_hits"], 1)
+
+    def test_expired_entries_are_not_promoted(self):
+        """
+        Test that expired disk entries are treated as misses.
+        """
+        cache = Cache(maxsize=1, ttl=300, l2=self.l2)
+        with patch("time.time", return_value=1000):
+            cache.set("key1", {"value": 1})
+            cache.set("key2", {"value": 2})
+        self.l2.flush()
+
+        with patch("time.time", return_value=1301):
+            self.assertIsNone(cache.get("key1"))
+
+    def test_restore_after_restart(self):
+        """
+        Test that a new cache instance restores servable entries from disk,
+        except those stored without query parameters.
+        """
+        with patch("time.time", return_value=1000):
+            Cache(maxsize=3, ttl=300, l2=self.l2).set("old", {"value": 0})
+        cache = Cache(maxsize=3, ttl=300, l2=self.l2)
+        cache.set("key1", {"value": 1}, etag="etag1", params={"name": "hulk"})
+        cache.set("key2", {"value": 2})
+        self.l2.flush()
+
+        restarted = Cache(maxsize=3, ttl=300, l2=self.l2)
+        self.assertEqual(restarted.restore(), 1)
+        self.assertNotIn("key2", restarted.store)
+        self.assertEqual(restarted.get("key1"), {"value": 1})
+        self.assertEqual(restarted.get_etag("key1"), "etag1")
+        self.assertEqual(restarted.get_params("key1"), {"name": "hulk"})
+        self.assertEqual(restarted.hit_count, 1)
+        self.assertIsNone(restarted.get("key2"))
+        self.l2.flush()
+        self.assertIsNone(self.l2.get("key2"))
+
+    def test_adds_params_column_to_old_database(self):
+        """
+        Test that a database written without query parameters is upgraded.
+        """
+        path = os.path.join(self.tmpdir.name, "old.db")
+        connection = sqlite3.connect(path)
+        connection.execute(
+            "CREATE TABLE entries "
+            "(key TEXT PRIMARY KEY, value TEXT, etag TEXT, timestamp REAL)"
+        )
+        connection.execute("INSERT INTO entries VALUES ('key1', '1', '', 1000.0)")
+        connection.commit()
+        connection.close()
+
+        l2 = DiskCache(path)
+        self.assertEqual(l2.get("key1"), (1, "", 1000.0, None))
+        l2.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
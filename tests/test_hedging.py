@@ -0,0 +1,79 @@
+"""
+Tests for hedged requests.
+"""
+
+import asyncio
+import unittest
+
+from app.utils.hedging import HedgeBudget, hedged
+
+
+class TestHedging(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests for hedged calls and the hedge budget.
+    """
+
+    def setUp(self):
+        self.budget = HedgeBudget(ratio=1, burst=1)
+
+    def make_call(self, delays: list):
+        """
+        Build a call whose successive attempts take the given delays.
+        """
+        attempts = []
+
+        async def call():
+            attempt = len(attempts)
+            attempts.append(attempt)
+            await asyncio.sleep(delays[attempt])
+            return attempt
+
+        return call, attempts
+
+    async def test_slow_call_is_hedged(self):
+        """
+        Test that a second attempt wins when the first is slow.
+        """
+        call, attempts = self.make_call([1.0, 0.01])
+        self.assertEqual(await hedged(call, 0.01, self.budget), 1)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(self.budget.stats()["hedge_wins"], 1)
+
+    async def test_fast_call_is_not_hedged(self):
+        """
+        Test that a call finishing within the delay is not hedged.
+        """
+        call, attempts = self.make_call([0.0, 0.0])
+        self.assertEqual(await hedged(call, 0.05, self.budget), 0)
+        self.assertEqual(len(attempts), 1)
+
+    async def test_budget_limits_hedges(self):
+        """
+        Test that hedges stop once the budget is spent.
+        """
+        budget = HedgeBudget(ratio=0.5, burst=1)
+        call, attempts = self.make_call([0.05, 0.05, 0.0])
+        await hedged(call, 0.01, budget)
+        self.assertEqual(len(attempts), 1)
+        await hedged(call, 0.01, budget)
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(budget.stats()["hedges"], 1)
+
+    async def test_failed_attempt_falls_back_to_other(self):
+        """
+        Test that a failing hedge does not fail a call the first attempt answers.
+        """
+        attempts = []
+
+        async def call():
+            attempts.append(None)
+            if len(attempts) == 2:
+                raise RuntimeError("hedge failed")
+            await asyncio.sleep(0.05)
+            return "first"
+
+        self.assertEqual(await hedged(call, 0.01, self.budget), "first")
+
+
+if __name__ == "__main__":
+    unittest.main()
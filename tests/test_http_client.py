@@ -0,0 +1,71 @@
+"""
+Tests for the shared upstream HTTP client.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from app.api.http_client import UpstreamClient
+
+
+class TestUpstreamClient(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests for the shared upstream HTTP client.
+    """
+
+    def setUp(self):
+        self.upstream = UpstreamClient(max_connections=5, max_keepalive_connections=2)
+
+    async def asyncTearDown(self):
+        await self.upstream.close()
+
+    async def test_open_reuses_client(self):
+        """
+        Test that the same httpx client is returned until closed.
+        """
+        client = self.upstream.open()
+        self.assertIs(self.upstream.open(), client)
+
+        await self.upstream.close()
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(self.upstream.open(), client)
+
+    def test_http2_falls_back_without_h2(self):
+        """
+        Test that HTTP/2 is disabled when the h2 package is missing.
+        """
+        upstream = UpstreamClient(http2=True)
+        with patch.dict("sys.modules", {"h2": None}):
+            client = upstream.open()
+        self.assertIsInstance(client, httpx.AsyncClient)
+
+    async def test_pool_stats(self):
+        """
+        Test that connection reuse and wait time are recorded from trace events.
+        """
+        events = [
+            ["connection.connect_tcp.started", "http11.send_request_headers.started"],
+            ["http11.send_request_headers.started"],
+            ["http11.send_request_headers.started"],
+        ]
+
+        async def fake_get(_url, extensions=None, **_):
+            for event_name in events.pop(0):
+                await extensions["trace"](event_name, {})
+            return httpx.Response(200)
+
+        with patch.object(httpx.AsyncClient, "get", side_effect=fake_get):
+            for _ in range(3):
+                await self.upstream.get("https://example.com")
+
+        stats = self.upstream.stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertAlmostEqual(stats["reuse_ratio"], 2 / 3)
+        self.assertGreaterEqual(stats["max_wait_ms"], stats["avg_wait_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the inverted resource indexes.
+"""
+
+import unittest
+from array import array
+
+from app.utils.inverted_index import InvertedIndex, intersect, resource_id, union
+
+BASE_URI = "http://gateway.marvel.com/v1/public"
+
+
+def make_character(character_id: int, comics: list, available: int = None) -> dict:
+    """
+    Build a character payload appearing in the given comics.
+    """
+    return {
+        "id": character_id,
+        "comics": {
+            "available": len(comics) if available is None else available,
+            "returned": len(comics),
+            "items": [{"resourceURI": f"{BASE_URI}/comics/{id_}"} for id_ in comics],
+        },
+    }
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """
+    Tests for the InvertedIndex class and posting list helpers.
+    """
+
+    def setUp(self):
+        self.index = InvertedIndex()
+
+    def test_resource_id(self):
+        """
+        Test extracting ids from resource URIs.
+        """
+        self.assertEqual(resource_id(f"{BASE_URI}/comics/21366"), 21366)
+        self.assertIsNone(resource_id(f"{BASE_URI}/comics/"))
+
+    def test_intersect_and_union(self):
+        """
+        Test combining sorted posting lists.
+        """
+        first, second = array("q", [1, 3, 5, 7]), array("q", [3, 4, 7])
+        self.assertEqual(list(intersect([first, second])), [3, 7])
+        self.assertEqual(list(union([first, second])), [1, 3, 4, 5, 7])
+        self.assertEqual(list(intersect([first, array("q")])), [])
+
+    def test_match(self):
+        """
+        Test that types are intersected and ids within a type are unioned.
+        """
+        self.index.add({**make_character(1, [10, 11]), "events": None})
+        self.index.add(make_character(2, [11]))
+        self.index.add(make_character(3, [12]))
+        self.assertEqual(list(self.index.match({"comics": [11]})), [1, 2])
+        self.assertEqual(list(self.index.match({"comics": [10, 12]})), [1, 3])
+        self.assertEqual(list(self.index.match({"comics": [99]})), [])
+
+    def test_full_list_replaces_postings(self):
+        """
+        Test that a full list drops stale postings and a truncated one does not.
+        """
+        self.index.add(make_character(1, [10, 11]))
+        self.index.add(make_character(1, [11, 12], available=5))
+        self.assertEqual(list(self.index.match({"comics": [10]})), [1])
+        self.assertIn(1, self.index.truncated["comics"])
+
+        self.index.add(make_character(1, [12]))
+        self.assertEqual(list(self.index.match({"comics": [10]})), [])
+        self.assertEqual(list(self.index.match({"comics": [12]})), [1])
+        self.assertNotIn(1, self.index.truncated["comics"])
+
+    def test_completeness(self):
+        """
+        Test when posting lists are trusted.
+        """
+        self.index.add(make_character(1, [10]))
+        self.assertFalse(self.index.is_complete("comics", [10]))
+        self.assertTrue(self.index.is_complete("comics", [10], catalog_complete=True))
+
+        self.index.add(make_character(2, [11], available=30))
+        self.assertFalse(self.index.is_complete("comics", [10], catalog_complete=True))
+
+        self.index.set_complete("comics", 10, [1, 4])
+        self.assertTrue(self.index.is_complete("comics", [10]))
+        self.assertEqual(list(self.index.match({"comics": [10]})), [1, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
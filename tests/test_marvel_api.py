@@ -4,7 +4,9 @@ Tests for the Marvel API.
 
 import unittest
 from unittest.mock import AsyncMock, patch
+
 from app.api.marvel_api import get_marvel_characters
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 
 class TestMarvelAPI(unittest.IsolatedAsyncioTestCase):
@@ -45,6 +47,22 @@ class TestMarvelAPI(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(response.status_code, 304)
         mock_httpx_get.assert_called_once()
 
+    @patch("app.api.marvel_api.httpx.AsyncClient.get")
+    async def test_get_marvel_characters_circuit_open(self, mock_httpx_get):
+        """
+        Test that failures open the circuit and later calls fail fast.
+        """
+        mock_httpx_get.side_effect = TimeoutError("timed out")
+        breaker = CircuitBreaker(min_calls=2, failure_rate=1.0)
+        with patch("app.api.marvel_api.upstream_breaker", breaker):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    await get_marvel_characters(name="Spider-Man")
+            with self.assertRaises(CircuitOpenError):
+                await get_marvel_characters(name="Spider-Man")
+
+        self.assertEqual(mock_httpx_get.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
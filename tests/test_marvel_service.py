@@ -7,7 +7,16 @@ import unittest
 import asyncio
 from unittest.mock import patch, MagicMock
 
-from app.grpc_services.marvel_service import MarvelService
+import grpc
+import httpx
+
+from app.api.cache import NEGATIVE_CACHE_TTL, cache
+from app.api.marvel_api import upstream_deadlines
+from app.utils.admission import AdmissionController
+from app.utils.cache import Cache, generate_cache_key
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.character_store import CharacterStore
+from app.grpc_services.marvel_service import MarvelService, serialize_response
 from app.grpc_services.proto import marvel_pb2
 
 
@@ -22,6 +31,7 @@ class TestMarvelService(unittest.TestCase):
             name="Spider-Man", limit=10, offset=0
         )
         self.mock_context = MagicMock()
+        self.mock_context.time_remaining.return_value = None
 
     def test_get_characters_successful_api_call(self):
         """
@@ -110,6 +120,96 @@ class TestMarvelService(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_get_characters_if_none_match(self):
+        """
+        Test that a matching if_none_match gets a Not Modified response.
+        """
+
+        async def run_test():
+            cached_data = {
+                "etag": "page-etag",
+                "data": {"results": [{"id": 1009610, "name": "Spider-Man"}]},
+            }
+            with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                mock_cache.get.return_value = cached_data
+                request = marvel_pb2.CharacterRequest(
+                    name="Spider-Man", if_none_match="page-etag"
+                )
+                response = await self.marvel_service.GetCharacters(
+                    request, self.mock_context
+                )
+                self.assertEqual(response.code, 304)
+                self.assertEqual(response.etag, "page-etag")
+                self.assertEqual(len(response.characters), 0)
+
+                request.if_none_match = "old-etag"
+                response = await self.marvel_service.GetCharacters(
+                    request, self.mock_context
+                )
+                self.assertEqual(response.etag, "page-etag")
+                self.assertEqual(response.characters[0].name, "Spider-Man")
+
+        asyncio.run(run_test())
+
+    def test_get_characters_field_mask(self):
+        """
+        Test that only masked fields are built, with a projection per mask.
+        """
+
+        async def run_test():
+            cached_data = {
+                "data": {
+                    "results": [
+                        {
+                            "id": 1009610,
+                            "name": "Spider-Man",
+                            "description": "Bitten by a radioactive spider",
+                            "comics": {"available": 1, "items": []},
+                        }
+                    ]
+                }
+            }
+            masked = marvel_pb2.CharacterRequest(name="Spider-Man")
+            masked.field_mask.paths.extend(["id", "name"])
+
+            with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                mock_cache.get.return_value = cached_data
+                response = await self.marvel_service.GetCharacters(
+                    masked, self.mock_context
+                )
+                character = response.characters[0]
+                self.assertEqual(character.name, "Spider-Man")
+                self.assertEqual(character.description, "")
+                self.assertFalse(character.HasField("comics"))
+
+                full = await self.marvel_service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+                self.assertTrue(full.characters[0].HasField("comics"))
+
+                second = await self.marvel_service.GetCharacters(
+                    masked, self.mock_context
+                )
+                self.assertEqual(
+                    marvel_pb2.CharacterResponse.FromString(second), response
+                )
+
+        asyncio.run(run_test())
+
+    def test_get_characters_unknown_field_mask(self):
+        """
+        Test that masks naming unknown fields are rejected.
+        """
+        request = marvel_pb2.CharacterRequest(name="Spider-Man")
+        request.field_mask.paths.append("powers")
+        response = asyncio.run(
+            self.marvel_service.GetCharacters(request, self.mock_context)
+        )
+        self.assertEqual(response, marvel_pb2.CharacterResponse())
+        self.mock_context.set_code.assert_called_once_with(
+            grpc.StatusCode.INVALID_ARGUMENT
+        )
+
     def test_get_characters_error_handling(self):
         """
         Test the GetCharacters method when the API call fails.
@@ -182,6 +282,738 @@ class TestMarvelService(unittest.TestCase):
 
         asyncio.run(run_test())
 
+    def test_get_characters_coalesces_concurrent_misses(self):
+        """
+        Test that concurrent misses for the same query share one upstream call.
+        """
+
+        async def run_test():
+            release = asyncio.Event()
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {
+                "data": {"results": [{"id": 1009610, "name": "Spider-Man"}]}
+            }
+            mock_response.headers = {"Etag": "test-etag"}
+
+            async def slow_upstream(**_):
+                await release.wait()
+                return mock_response
+
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=slow_upstream,
+            ) as mock_get_characters:
+                with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                    mock_cache.get.return_value = None
+                    mock_cache.get_etag.return_value = None
+
+                    calls = [
+                        asyncio.create_task(
+                            self.marvel_service.GetCharacters(
+                                self.mock_request, self.mock_context
+                            )
+                        )
+                        for _ in range(5)
+                    ]
+                    await asyncio.sleep(0)
+                    release.set()
+                    responses = await asyncio.gather(*calls)
+
+                    self.assertEqual(mock_get_characters.call_count, 1)
+                    mock_cache.set.assert_called_once()
+                    for response in responses:
+                        self.assertEqual(response.characters[0].name, "Spider-Man")
+
+        asyncio.run(run_test())
+
+    def test_get_characters_deadline(self):
+        """
+        Test that the RPC fails once its deadline passes and that the
+        upstream call is abandoned when no other RPC waits on it.
+        """
+
+        async def run_test():
+            upstream_cancelled = asyncio.Event()
+
+            async def slow_upstream(**_):
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    upstream_cancelled.set()
+                    raise
+
+            self.mock_context.time_remaining.return_value = 0.1
+            exceeded = upstream_deadlines.stats()["exceeded"]
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=slow_upstream,
+            ), patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                mock_cache.get.return_value = None
+                mock_cache.get_etag.return_value = None
+                response = await self.marvel_service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+                await asyncio.sleep(0)
+
+            self.assertEqual(response, marvel_pb2.CharacterResponse())
+            self.mock_context.set_code.assert_called_once_with(
+                grpc.StatusCode.DEADLINE_EXCEEDED
+            )
+            self.assertTrue(upstream_cancelled.is_set())
+            self.assertEqual(upstream_deadlines.stats()["exceeded"], exceeded + 1)
+
+        asyncio.run(run_test())
+
+    def test_get_characters_shared_call_outlives_short_deadline(self):
+        """
+        Test that a shared upstream call keeps the full timeout when the RPC
+        that started it has a short deadline.
+        """
+
+        async def run_test():
+            mock_response = MagicMock(status_code=200, headers={})
+            mock_response.json.return_value = {
+                "data": {"results": [{"id": 1009610, "name": "Spider-Man"}]}
+            }
+
+            async def slow_upstream(**kwargs):
+                self.assertNotIn("timeout", kwargs)
+                await asyncio.sleep(0.1)
+                return mock_response
+
+            short_context = MagicMock()
+            short_context.time_remaining.return_value = 0.02
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=slow_upstream,
+            ) as mock_get, patch(
+                "app.grpc_services.marvel_service.cache"
+            ) as mock_cache:
+                mock_cache.get.return_value = None
+                mock_cache.get_etag.return_value = None
+                short_call = asyncio.create_task(
+                    self.marvel_service.GetCharacters(self.mock_request, short_context)
+                )
+                await asyncio.sleep(0)
+                response = await self.marvel_service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+                await short_call
+
+                mock_get.assert_called_once()
+            short_context.set_code.assert_called_once_with(
+                grpc.StatusCode.DEADLINE_EXCEEDED
+            )
+            self.assertEqual(response.characters[0].name, "Spider-Man")
+
+        asyncio.run(run_test())
+
+    def test_get_characters_cancelled_call_still_cached(self):
+        """
+        Test that a shared upstream call outlives a cancelled RPC and is cached.
+        """
+
+        async def run_test():
+            release = asyncio.Event()
+            mock_response = MagicMock(status_code=200, headers={})
+            mock_response.json.return_value = {
+                "data": {"results": [{"id": 1009610, "name": "Spider-Man"}]}
+            }
+
+            async def slow_upstream(**_):
+                await release.wait()
+                return mock_response
+
+            cancelled = upstream_deadlines.stats()["cancelled"]
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=slow_upstream,
+            ), patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                mock_cache.get.return_value = None
+                mock_cache.get_etag.return_value = None
+                calls = [
+                    asyncio.create_task(
+                        self.marvel_service.GetCharacters(
+                            self.mock_request, self.mock_context
+                        )
+                    )
+                    for _ in range(2)
+                ]
+                await asyncio.sleep(0)
+                calls[0].cancel()
+                await asyncio.sleep(0)
+                release.set()
+                response = await calls[1]
+
+                mock_cache.set.assert_called_once()
+            self.assertEqual(response.characters[0].name, "Spider-Man")
+            self.assertTrue(calls[0].cancelled())
+            self.assertEqual(upstream_deadlines.stats()["cancelled"], cancelled + 1)
+
+        asyncio.run(run_test())
+
+    def test_get_characters_serialized_cache_hit(self):
+        """
+        Test that repeated cache hits are served as pre-serialized bytes.
+        """
+
+        async def run_test():
+            cached_data = {"data": {"results": [{"id": 1009610, "name": "Spider-Man"}]}}
+
+            with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                mock_cache.get.return_value = cached_data
+
+                first = await self.marvel_service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+                second = await self.marvel_service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+
+                self.assertIsInstance(first, marvel_pb2.CharacterResponse)
+                self.assertIsInstance(second, bytes)
+                self.assertEqual(marvel_pb2.CharacterResponse.FromString(second), first)
+
+                # A replaced cache value must not be served from stale bytes
+                mock_cache.get.return_value = {
+                    "data": {"results": [{"id": 1009610, "name": "Peter Parker"}]}
+                }
+                third = await self.marvel_service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+                self.assertEqual(third.characters[0].name, "Peter Parker")
+
+        asyncio.run(run_test())
+
+    def test_evicted_entry_drops_serialized_response(self):
+        """
+        Test that a serialized response is dropped with its cache entry.
+        """
+
+        async def run_test():
+            small_cache = Cache(
+                maxsize=1, ttl=300, on_remove=self.marvel_service.forget
+            )
+            with patch("app.grpc_services.marvel_service.cache", small_cache):
+                small_cache.set(
+                    generate_cache_key(
+                        self.marvel_service._query_params(self.mock_request)
+                    ),
+                    {"data": {"results": [{"id": 1009610, "name": "Spider-Man"}]}},
+                )
+                await self.marvel_service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+                self.assertEqual(len(self.marvel_service.serialized), 1)
+
+                small_cache.set("other", {"data": {"results": []}})
+                self.assertEqual(len(self.marvel_service.serialized), 0)
+
+        asyncio.run(run_test())
+
+    def test_serialize_response(self):
+        """
+        Test that the response serializer passes bytes through unchanged.
+        """
+        response = marvel_pb2.CharacterResponse(code=200)
+        self.assertEqual(serialize_response(b"raw"), b"raw")
+        self.assertEqual(serialize_response(response), response.SerializeToString())
+
+    def test_stream_characters_fetches_pages_concurrently(self):
+        """
+        Test that StreamCharacters streams every page with bounded concurrency.
+        """
+
+        async def run_test():
+            in_flight = 0
+            max_in_flight = 0
+
+            async def fake_upstream(limit, offset, **_):
+                nonlocal in_flight, max_in_flight
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                response = MagicMock(status_code=200, headers={})
+                response.json.return_value = {
+                    "data": {
+                        "total": 450,
+                        "results": [
+                            {"id": i, "name": f"Character {i}"}
+                            for i in range(offset, min(offset + limit, 450))
+                        ],
+                    }
+                }
+                return response
+
+            service = MarvelService(stream_concurrency=2)
+            request = marvel_pb2.CharacterRequest(name_starts_with="S", limit=100)
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=fake_upstream,
+            ) as mock_get_characters:
+                with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                    mock_cache.get.return_value = None
+                    mock_cache.peek.return_value = None
+                    mock_cache.get_etag.return_value = None
+
+                    characters = [
+                        character
+                        async for character in service.StreamCharacters(
+                            request, self.mock_context
+                        )
+                    ]
+
+            self.assertEqual(sorted(c.id for c in characters), list(range(450)))
+            self.assertEqual(mock_get_characters.call_count, 5)
+            self.assertEqual(max_in_flight, 2)
+
+        asyncio.run(run_test())
+
+    def test_stream_characters_uses_cached_pages(self):
+        """
+        Test that StreamCharacters reuses per-page cache entries.
+        """
+
+        async def run_test():
+            pages = {
+                generate_cache_key({"name": "Thor", "limit": 2, "offset": 0}): {
+                    "data": {"total": 3, "results": [{"id": 1}, {"id": 2}]}
+                },
+                generate_cache_key({"name": "Thor", "limit": 2, "offset": 2}): {
+                    "data": {"total": 3, "results": [{"id": 3}]}
+                },
+            }
+            request = marvel_pb2.CharacterRequest(name="Thor", limit=2)
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters"
+            ) as mock_get_characters:
+                with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                    mock_cache.get.side_effect = pages.get
+                    characters = [
+                        character
+                        async for character in self.marvel_service.StreamCharacters(
+                            request, self.mock_context
+                        )
+                    ]
+
+            self.assertEqual([c.id for c in characters], [1, 2, 3])
+            mock_get_characters.assert_not_called()
+
+        asyncio.run(run_test())
+
+    def test_stream_characters_error_handling(self):
+        """
+        Test that a failed page ends the stream with an INTERNAL status.
+        """
+
+        async def run_test():
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=Exception("API Error"),
+            ):
+                with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                    mock_cache.get.return_value = None
+                    mock_cache.get_stale.return_value = None
+                    characters = [
+                        character
+                        async for character in self.marvel_service.StreamCharacters(
+                            self.mock_request, self.mock_context
+                        )
+                    ]
+
+            self.assertEqual(characters, [])
+            self.mock_context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
+
+        asyncio.run(run_test())
+
+    def test_batch_get_characters(self):
+        """
+        Test that BatchGetCharacters deduplicates queries, answers hits from
+        the cache and reports per-item failures.
+        """
+
+        async def run_test():
+            hit = marvel_pb2.CharacterRequest(name="Thor", limit=1)
+            miss = marvel_pb2.CharacterRequest(name="Hulk", limit=1)
+            failing = marvel_pb2.CharacterRequest(name="Broken", limit=1)
+            request = marvel_pb2.BatchCharacterRequest(
+                requests=[hit, miss, failing, miss, hit]
+            )
+            cached = {"data": {"results": [{"id": 1, "name": "Thor"}]}}
+
+            async def fake_upstream(name, **_):
+                if name == "broken":
+                    raise RuntimeError("API Error")
+                response = MagicMock(status_code=200, headers={})
+                response.json.return_value = {
+                    "data": {"results": [{"id": 2, "name": name.title()}]}
+                }
+                return response
+
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=fake_upstream,
+            ) as mock_get_characters:
+                with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                    thor_key = generate_cache_key({"name": "Thor", "limit": 1})
+                    mock_cache.get.side_effect = lambda key: (
+                        cached if key == thor_key else None
+                    )
+                    mock_cache.get_etag.return_value = None
+                    mock_cache.get_stale.return_value = None
+
+                    response = await self.marvel_service.BatchGetCharacters(
+                        request, self.mock_context
+                    )
+
+            self.assertEqual(mock_get_characters.call_count, 2)
+            mock_cache.get_stale.assert_called_once()
+            statuses = [result.status for result in response.results]
+            self.assertEqual(statuses, [0, 0, grpc.StatusCode.INTERNAL.value[0], 0, 0])
+            names = [
+                result.response.characters[0].name
+                for result in response.results
+                if result.status == 0
+            ]
+            self.assertEqual(names, ["Thor", "Hulk", "Hulk", "Thor"])
+            self.assertEqual(response.results[2].error, "Failed to fetch characters.")
+
+        asyncio.run(run_test())
+
+    def test_batch_get_characters_invalid_field_mask(self):
+        """
+        Test that an item with an invalid field mask fails on its own.
+        """
+
+        async def run_test():
+            invalid = marvel_pb2.CharacterRequest(name="Thor")
+            invalid.field_mask.paths.append("powers")
+            valid = marvel_pb2.CharacterRequest(name="Thor")
+            valid.field_mask.paths.append("name")
+            request = marvel_pb2.BatchCharacterRequest(requests=[valid, invalid, valid])
+
+            with patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                mock_cache.get.return_value = {
+                    "data": {"results": [{"id": 1, "name": "Thor"}]}
+                }
+                response = await self.marvel_service.BatchGetCharacters(
+                    request, self.mock_context
+                )
+
+            statuses = [result.status for result in response.results]
+            self.assertEqual(
+                statuses, [0, grpc.StatusCode.INVALID_ARGUMENT.value[0], 0]
+            )
+            self.assertIn("powers", response.results[1].error)
+            self.assertEqual(response.results[2].response.characters[0].name, "Thor")
+            self.mock_context.set_code.assert_not_called()
+
+        asyncio.run(run_test())
+
+    def test_batch_get_characters_too_large(self):
+        """
+        Test that oversized batches are rejected.
+        """
+
+        async def run_test():
+            request = marvel_pb2.BatchCharacterRequest(
+                requests=[self.mock_request] * 51
+            )
+            response = await self.marvel_service.BatchGetCharacters(
+                request, self.mock_context
+            )
+            self.assertEqual(len(response.results), 0)
+            self.mock_context.set_code.assert_called_with(
+                grpc.StatusCode.INVALID_ARGUMENT
+            )
+
+        asyncio.run(run_test())
+
+    def test_get_characters_from_covering_page(self):
+        """
+        Test that a sub-page is sliced out of a cached larger page.
+        """
+
+        async def run_test():
+            large = marvel_pb2.CharacterRequest(name_starts_with="spi", limit=100)
+            small = marvel_pb2.CharacterRequest(
+                name_starts_with="spi", limit=10, offset=20
+            )
+            mock_response = MagicMock(status_code=200, headers={})
+            mock_response.json.return_value = {
+                "data": {
+                    "offset": 0,
+                    "limit": 100,
+                    "total": 100,
+                    "count": 100,
+                    "results": [{"id": i, "name": f"Spider {i}"} for i in range(100)],
+                }
+            }
+            cache.clear()
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                return_value=mock_response,
+            ) as mock_get_characters:
+                await self.marvel_service.GetCharacters(large, self.mock_context)
+                response = await self.marvel_service.GetCharacters(
+                    small, self.mock_context
+                )
+
+            mock_get_characters.assert_called_once()
+            self.assertEqual([c.id for c in response.characters], list(range(20, 30)))
+            self.assertEqual((response.offset, response.limit), (20, 10))
+            self.assertEqual(response.count, 10)
+            self.assertEqual(cache.stats()["containment_hits"], 1)
+            cache.clear()
+
+        asyncio.run(run_test())
+
+    def test_get_characters_caches_not_found(self):
+        """
+        Test that a Not Found response is cached as an empty negative entry.
+        """
+
+        async def run_test():
+            not_found = httpx.HTTPStatusError(
+                "Not Found",
+                request=httpx.Request("GET", "https://example.com"),
+                response=httpx.Response(404),
+            )
+            request = marvel_pb2.CharacterRequest(name="Spyder-Man")
+            cache.clear()
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=not_found,
+            ) as mock_get_characters, patch(
+                "app.grpc_services.marvel_service.character_store.observe"
+            ) as mock_observe:
+                first = await self.marvel_service.GetCharacters(
+                    request, self.mock_context
+                )
+                second = await self.marvel_service.GetCharacters(
+                    request, self.mock_context
+                )
+
+            mock_get_characters.assert_called_once()
+            mock_observe.assert_not_called()
+            self.assertEqual((first.code, first.count), (404, 0))
+            self.assertEqual(serialize_response(second), first.SerializeToString())
+            cache_key = generate_cache_key({"name": "Spyder-Man"})
+            self.assertEqual(cache.entry_ttl(cache_key), NEGATIVE_CACHE_TTL)
+            cache.clear()
+
+        asyncio.run(run_test())
+
+    def test_get_characters_serves_expired_entry_when_circuit_open(self):
+        """
+        Test that an expired entry is served when the upstream is unavailable.
+        """
+
+        async def run_test():
+            request = marvel_pb2.CharacterRequest(name="Thor")
+            cache_key = generate_cache_key({"name": "Thor"})
+            cached = {"data": {"results": [{"id": 1, "name": "Thor"}]}}
+            cache.clear()
+            with patch("time.time", return_value=1000):
+                cache.set(cache_key, cached)
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=CircuitOpenError("Upstream circuit is open."),
+            ), patch("time.time", return_value=1000 + cache.ttl + 1):
+                response = await self.marvel_service.GetCharacters(
+                    request, self.mock_context
+                )
+
+            self.assertEqual([c.name for c in response.characters], ["Thor"])
+            self.mock_context.set_code.assert_not_called()
+            cache.clear()
+
+        asyncio.run(run_test())
+
+    def test_get_characters_from_character_store(self):
+        """
+        Test that a name query is answered by a complete character mirror.
+        """
+
+        async def run_test():
+            store = CharacterStore()
+            store.load({"data": {"results": [{"id": 1, "name": "Spider-Man"}]}})
+            store.mark_complete()
+            request = marvel_pb2.CharacterRequest(name_starts_with="spider")
+            cache.clear()
+            with patch(
+                "app.grpc_services.marvel_service.character_store", store
+            ), patch(
+                "app.grpc_services.marvel_service.get_marvel_characters"
+            ) as mock_get_characters:
+                response = await self.marvel_service.GetCharacters(
+                    request, self.mock_context
+                )
+
+            mock_get_characters.assert_not_called()
+            self.assertEqual([c.name for c in response.characters], ["Spider-Man"])
+            self.assertEqual(store.stats()["hits"], 1)
+
+        asyncio.run(run_test())
+
+    def test_get_characters_from_observed_filter(self):
+        """
+        Test that a filter query is answered locally once every character
+        of its filter was observed, before the mirror is complete.
+        """
+
+        async def run_test():
+            store = CharacterStore()
+            store.observe(
+                {"comics": [42], "limit": 100, "offset": 0},
+                {
+                    "code": 200,
+                    "data": {
+                        "total": 2,
+                        "count": 2,
+                        "results": [
+                            {"id": 1, "name": "Thor", "comics": {"items": []}},
+                            {"id": 2, "name": "Loki", "comics": {"items": []}},
+                        ],
+                    },
+                },
+            )
+            request = marvel_pb2.CharacterRequest(comics=[42], limit=1)
+            cache.clear()
+            with patch(
+                "app.grpc_services.marvel_service.character_store", store
+            ), patch(
+                "app.grpc_services.marvel_service.get_marvel_characters"
+            ) as mock_get_characters:
+                response = await self.marvel_service.GetCharacters(
+                    request, self.mock_context
+                )
+
+            mock_get_characters.assert_not_called()
+            self.assertEqual([c.name for c in response.characters], ["Loki"])
+
+        asyncio.run(run_test())
+
+    def test_get_characters_admission_rejected(self):
+        """
+        Test that a miss turned away by admission control fails with
+        RESOURCE_EXHAUSTED while a cache hit is still answered.
+        """
+
+        async def run_test():
+            controller = AdmissionController(max_concurrent=1, latency_target=0.01)
+            controller.active = 1
+            controller.average_latency = 1.0
+            service = MarvelService(admission=controller)
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters"
+            ) as mock_get_characters, patch(
+                "app.grpc_services.marvel_service.cache"
+            ) as mock_cache:
+                mock_cache.get.return_value = None
+                mock_cache.get_etag.return_value = None
+                mock_cache.get_stale.return_value = None
+                response = await service.GetCharacters(
+                    self.mock_request, self.mock_context
+                )
+                mock_get_characters.assert_not_called()
+
+                mock_cache.get.return_value = {
+                    "data": {"results": [{"id": 1009610, "name": "Spider-Man"}]}
+                }
+                hit_context = MagicMock()
+                hit = await service.GetCharacters(self.mock_request, hit_context)
+
+            self.assertEqual(response, marvel_pb2.CharacterResponse())
+            self.mock_context.set_code.assert_called_once_with(
+                grpc.StatusCode.RESOURCE_EXHAUSTED
+            )
+            self.assertEqual(hit.characters[0].name, "Spider-Man")
+            hit_context.set_code.assert_not_called()
+            self.assertEqual(controller.stats()["rejected"], 1)
+
+        asyncio.run(run_test())
+
+    def test_stream_characters_admits_each_page(self):
+        """
+        Test that a stream takes an upstream slot per page fetch and holds
+        none while its reader is idle.
+        """
+
+        async def run_test():
+            controller = AdmissionController(max_concurrent=1, latency_target=1.0)
+            service = MarvelService(stream_concurrency=1, admission=controller)
+
+            async def fake_upstream(limit, offset, **_):
+                self.assertEqual(controller.active, 1)
+                response = MagicMock(status_code=200, headers={})
+                response.json.return_value = {
+                    "data": {
+                        "total": 3,
+                        "results": [{"id": offset, "name": f"Character {offset}"}],
+                    }
+                }
+                return response
+
+            request = marvel_pb2.CharacterRequest(name_starts_with="C", limit=1)
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters",
+                side_effect=fake_upstream,
+            ), patch("app.grpc_services.marvel_service.cache") as mock_cache:
+                mock_cache.get.return_value = None
+                mock_cache.peek.return_value = None
+                mock_cache.get_etag.return_value = None
+                ids = []
+                async for character in service.StreamCharacters(
+                    request, self.mock_context
+                ):
+                    self.assertEqual(controller.active, 0)
+                    ids.append(character.id)
+
+            self.assertEqual(ids, [0, 1, 2])
+            self.assertEqual(controller.stats()["admitted"], 3)
+
+        asyncio.run(run_test())
+
+    def test_batch_get_characters_admission_rejected(self):
+        """
+        Test that a batch item whose upstream call is turned away gets
+        RESOURCE_EXHAUSTED without failing the others.
+        """
+
+        async def run_test():
+            controller = AdmissionController(max_concurrent=1, latency_target=0.01)
+            controller.active = 1
+            controller.average_latency = 1.0
+            service = MarvelService(admission=controller)
+            hit = marvel_pb2.CharacterRequest(name="Thor", limit=10)
+            miss = marvel_pb2.CharacterRequest(name="Loki", limit=10)
+            hit_key = generate_cache_key(service._query_params(hit))
+            cached = {"data": {"results": [{"id": 1009664, "name": "Thor"}]}}
+            with patch(
+                "app.grpc_services.marvel_service.get_marvel_characters"
+            ) as mock_get_characters, patch(
+                "app.grpc_services.marvel_service.cache"
+            ) as mock_cache:
+                mock_cache.get.side_effect = {hit_key: cached}.get
+                mock_cache.get_etag.return_value = None
+                mock_cache.get_stale.return_value = None
+                response = await service.BatchGetCharacters(
+                    marvel_pb2.BatchCharacterRequest(requests=[hit, miss]),
+                    self.mock_context,
+                )
+
+            mock_get_characters.assert_not_called()
+            self.assertEqual(response.results[0].status, grpc.StatusCode.OK.value[0])
+            self.assertEqual(
+                response.results[1].status,
+                grpc.StatusCode.RESOURCE_EXHAUSTED.value[0],
+            )
+
+        asyncio.run(run_test())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,10 +2,27 @@
 Tests for the Marvel task.
 """
 
+import asyncio
+import os
+import tempfile
 import unittest
 from unittest.mock import AsyncMock, patch, MagicMock
-from app.tasks.marvel_task import update_marvel_cache, enqueue_marvel_tasks
+from app.tasks.marvel_task import (
+    update_marvel_cache,
+    enqueue_marvel_tasks,
+    schedule_revalidation,
+    sync_character_store,
+    delta_sync_marvel_cache,
+    load_character_store,
+    publish_character_store,
+)
 from app.api.cache import cache
+from app.utils.cache import canonical_params, generate_cache_key
+from app.utils.character_store import CharacterStore
+from app.utils.shared_cache import SharedCache
+
+PARAMS = canonical_params({"name": "Spider-Man", "limit": 10})
+CACHE_KEY = generate_cache_key(PARAMS)
 
 
 class TestMarvelTask(unittest.IsolatedAsyncioTestCase):
@@ -33,8 +50,8 @@ class TestMarvelTask(unittest.IsolatedAsyncioTestCase):
             headers={"Etag": "etag-value"},
         )
 
-        cache_key = "name=Spider-Man&limit=10"
-        cache.set(cache_key, None)  # Simulate no cache entry
+        cache_key = CACHE_KEY
+        cache.set(cache_key, None, params=PARAMS)  # Simulate no cache entry
         await update_marvel_cache(cache_key)
 
         self.assertIsNotNone(cache.get(cache_key))
@@ -48,13 +65,149 @@ class TestMarvelTask(unittest.IsolatedAsyncioTestCase):
         """
         mock_get_marvel_characters.return_value = MagicMock(status_code=304)
 
-        cache_key = "name=Spider-Man&limit=10"
-        cache.set(cache_key, {"cached": "data"}, etag="etag-value")  # Simulate cache
+        cache_key = CACHE_KEY
+        cache.set(
+            cache_key, {"cached": "data"}, etag="etag-value", params=PARAMS
+        )  # Simulate cache
         await update_marvel_cache(cache_key)
 
         self.assertEqual(cache.get(cache_key), {"cached": "data"})
         mock_get_marvel_characters.assert_awaited_once()
 
+    @patch("app.tasks.marvel_task.get_marvel_characters", new_callable=AsyncMock)
+    async def test_update_marvel_cache_not_modified_renews_entry(
+        self, mock_get_marvel_characters
+    ):
+        """
+        Test that a not-modified revalidation renews the entry and ends it.
+        """
+        mock_get_marvel_characters.return_value = MagicMock(status_code=304)
+
+        cache_key = CACHE_KEY
+        with patch("time.time", return_value=1000):
+            cache.set(cache_key, {"cached": "data"}, etag="etag-value", params=PARAMS)
+        cache.revalidating.add(cache_key)
+        with patch("time.time", return_value=1290):
+            await update_marvel_cache(cache_key)
+        with patch("time.time", return_value=1350):
+            self.assertEqual(cache.get(cache_key), {"cached": "data"})
+        self.assertNotIn(cache_key, cache.revalidating)
+
+    @patch("app.tasks.marvel_task.update_marvel_cache.kiq", new_callable=AsyncMock)
+    async def test_schedule_revalidation(self, mock_update_marvel_cache_kiq):
+        """
+        Test that a revalidation is enqueued on the running loop.
+        """
+        self.assertTrue(schedule_revalidation("key1"))
+        await asyncio.sleep(0)
+        mock_update_marvel_cache_kiq.assert_awaited_once_with("key1")
+
+    def test_schedule_revalidation_without_loop(self):
+        """
+        Test that nothing is scheduled outside of an event loop.
+        """
+        self.assertFalse(schedule_revalidation("key1"))
+
+    @patch("app.tasks.marvel_task.get_marvel_characters", new_callable=AsyncMock)
+    async def test_sync_character_store(self, mock_get_marvel_characters):
+        """
+        Test that every catalog page is loaded before the store is complete.
+        """
+
+        async def fake_get(order_by, limit, offset):
+            results = [
+                {"id": i, "name": f"Character {i}"}
+                for i in range(offset, min(offset + limit, 250))
+            ]
+            return MagicMock(
+                json=MagicMock(
+                    return_value={"data": {"total": 250, "results": results}}
+                )
+            )
+
+        mock_get_marvel_characters.side_effect = fake_get
+        store = CharacterStore()
+        with patch("app.tasks.marvel_task.character_store", store):
+            await sync_character_store()
+
+        self.assertTrue(store.complete)
+        self.assertEqual(mock_get_marvel_characters.await_count, 3)
+        self.assertEqual(len(store), 250)
+
+    async def test_load_published_character_store(self):
+        """
+        Test that a worker loads the character store another one published,
+        only once and only if every page belongs to the same copy.
+        """
+        tmpdir = tempfile.TemporaryDirectory()
+        shared = SharedCache(
+            os.path.join(tmpdir.name, "characters.shm"),
+            slots=64,
+            data_size=1024 * 1024,
+        )
+        leader = CharacterStore()
+        leader.load(
+            {
+                "code": 200,
+                "data": {
+                    "results": [{"id": i, "name": f"Character {i}"} for i in range(250)]
+                },
+            }
+        )
+        leader.mark_complete()
+        follower = CharacterStore()
+
+        with patch("app.tasks.marvel_task.shared_character_store", shared):
+            with patch("app.tasks.marvel_task.character_store", leader):
+                publish_character_store()
+                shared.flush()
+            with patch("app.tasks.marvel_task.character_store", follower):
+                # A page of a newer copy that is still being written
+                page, etag, published_at, params = shared.get("characters:1")
+                shared.put("characters:1", page, etag, published_at + 1, params)
+                shared.flush()
+                await load_character_store()
+                self.assertFalse(follower.complete)
+
+                shared.put("characters:1", page, etag, published_at, params)
+                shared.flush()
+                await load_character_store()
+                self.assertTrue(follower.complete)
+                self.assertEqual(len(follower), 250)
+
+                synced_at = follower.synced_at
+                await load_character_store()
+                self.assertEqual(follower.synced_at, synced_at)
+
+        shared.close()
+        tmpdir.cleanup()
+
+    @patch("app.tasks.marvel_task.delta_sync")
+    @patch("app.tasks.marvel_task.get_marvel_characters", new_callable=AsyncMock)
+    async def test_delta_sync_marvel_cache(
+        self, mock_get_marvel_characters, mock_delta_sync
+    ):
+        """
+        Test that every page of modified characters is applied at once.
+        """
+        pages = [
+            {"data": {"total": 3, "count": 2, "results": [{"id": 1}, {"id": 2}]}},
+            {"data": {"total": 3, "count": 1, "results": [{"id": 3}]}},
+        ]
+        mock_get_marvel_characters.side_effect = [
+            MagicMock(json=MagicMock(return_value=page)) for page in pages
+        ]
+        mock_delta_sync.modified_since.return_value = "2024-01-01T00:00:00+0000"
+
+        await delta_sync_marvel_cache()
+
+        self.assertEqual(mock_get_marvel_characters.await_count, 2)
+        _, kwargs = mock_get_marvel_characters.await_args
+        self.assertEqual(kwargs["modified_since"], "2024-01-01T00:00:00+0000")
+        self.assertEqual((kwargs["order_by"], kwargs["offset"]), ("-modified", 2))
+        changed, _ = mock_delta_sync.apply.call_args.args
+        self.assertEqual([character["id"] for character in changed], [1, 2, 3])
+
     @patch("app.tasks.marvel_task.get_marvel_characters", new_callable=AsyncMock)
     async def test_update_marvel_cache_invalid_response(
         self, mock_get_marvel_characters
@@ -67,8 +220,8 @@ class TestMarvelTask(unittest.IsolatedAsyncioTestCase):
             json=MagicMock(return_value={}),
         )
 
-        cache_key = "name=Spider-Man&limit=10"
-        cache.set(cache_key, None)  # Simulate no cache entry
+        cache_key = CACHE_KEY
+        cache.set(cache_key, None, params=PARAMS)  # Simulate no cache entry
         await update_marvel_cache(cache_key)
 
         self.assertIsNone(cache.get(cache_key))
@@ -79,14 +232,36 @@ class TestMarvelTask(unittest.IsolatedAsyncioTestCase):
         """
         Test the enqueue_marvel_tasks function.
         """
-        cache.set("key1", {"some": "data"})
-        cache.set("key2", {"other": "data"})
+        with patch("time.time", return_value=1000):
+            cache.set("key1", {"some": "data"})
+            cache.set("key2", {"other": "data"})
 
-        await enqueue_marvel_tasks()
+        with patch("time.time", return_value=1250):  # Both keys due for refresh
+            await enqueue_marvel_tasks()
 
         self.assertEqual(mock_update_marvel_cache_kiq.await_count, 2)
         mock_update_marvel_cache_kiq.assert_any_await("key1")
         mock_update_marvel_cache_kiq.assert_any_await("key2")
+        self.assertEqual(cache.revalidating, {"key1", "key2"})
+
+    @patch("app.tasks.marvel_task.update_marvel_cache.kiq", new_callable=AsyncMock)
+    async def test_enqueue_marvel_tasks_skips_in_flight_and_fresh(
+        self, mock_update_marvel_cache_kiq
+    ):
+        """
+        Test that fresh keys and keys with a refresh in flight are not enqueued.
+        """
+        with patch("time.time", return_value=1000):
+            cache.set("key1", {"some": "data"})
+            cache.set("key2", {"other": "data"})
+        with patch("time.time", return_value=1200):
+            cache.set("key3", {"fresh": "data"})
+        cache.revalidating.add("key1")
+
+        with patch("time.time", return_value=1250):
+            await enqueue_marvel_tasks()
+
+        mock_update_marvel_cache_kiq.assert_awaited_once_with("key2")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+"""
+Tests for the page index.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from app.utils.cache import Cache, generate_cache_key
+from app.utils.page_index import PageIndex, generate_filter_key
+
+
+def make_page(offset: int, limit: int, total: int) -> dict:
+    """
+    Build a cached page of characters with sequential ids.
+    """
+    results = [{"id": i} for i in range(offset, min(offset + limit, total))]
+    return {
+        "code": 200,
+        "data": {
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "count": len(results),
+            "results": results,
+        },
+    }
+
+
+class TestPageIndex(unittest.TestCase):
+    """
+    Tests for the PageIndex class.
+    """
+
+    def setUp(self):
+        self.cache = Cache(maxsize=10, ttl=300)
+        self.index = PageIndex()
+        self.params = {"name_starts_with": "spi", "limit": 100, "offset": 0}
+        self.add_page(self.params, make_page(0, 100, 250))
+
+    def add_page(self, params: dict, page: dict):
+        """
+        Cache a page and register it in the index.
+        """
+        cache_key = generate_cache_key(params)
+        self.cache.set(cache_key, page)
+        self.index.add(cache_key, params, self.cache)
+
+    def test_removed_with_cache_entry(self):
+        """
+        Test that windows are forgotten when their cache entries are removed.
+        """
+        self.cache.on_remove = self.index.remove
+        other = {"name_starts_with": "hul", "limit": 100, "offset": 0}
+        self.add_page(other, make_page(0, 100, 100))
+        self.assertEqual(len(self.index.windows), 2)
+
+        self.cache.invalidate(generate_cache_key(other))
+        self.assertEqual(len(self.index.windows), 1)
+        self.cache.clear()
+        self.assertEqual(self.index.windows, {})
+        self.assertEqual(self.index.filter_keys, {})
+
+    def test_filter_key_ignores_paging(self):
+        """
+        Test that the filter key only depends on non-paging parameters.
+        """
+        self.assertEqual(
+            generate_filter_key({"name": "a", "limit": 10, "offset": 5}),
+            generate_filter_key({"name": "a", "limit": 20}),
+        )
+
+    def test_find_covered_window(self):
+        """
+        Test slicing a sub-page out of a covering page.
+        """
+        page = self.index.find(
+            self.cache, {"name_starts_with": "spi", "limit": 10, "offset": 20}
+        )
+        self.assertEqual(
+            [r["id"] for r in page["data"]["results"]], list(range(20, 30))
+        )
+        self.assertEqual(page["data"]["offset"], 20)
+        self.assertEqual(page["data"]["limit"], 10)
+        self.assertEqual(page["data"]["count"], 10)
+        self.assertEqual(page["data"]["total"], 250)
+        self.assertEqual(page["code"], 200)
+
+    def test_window_not_covered(self):
+        """
+        Test that windows past the cached page or other filters are not answered.
+        """
+        self.assertIsNone(
+            self.index.find(
+                self.cache, {"name_starts_with": "spi", "limit": 10, "offset": 95}
+            )
+        )
+        self.assertIsNone(
+            self.index.find(
+                self.cache, {"name_starts_with": "thor", "limit": 10, "offset": 0}
+            )
+        )
+
+    def test_last_page_covers_tail(self):
+        """
+        Test that a page reaching the end of the results covers any tail window.
+        """
+        params = {"name_starts_with": "spi", "limit": 100, "offset": 200}
+        self.add_page(params, make_page(200, 100, 250))
+        page = self.index.find(
+            self.cache, {"name_starts_with": "spi", "limit": 20, "offset": 240}
+        )
+        self.assertEqual(
+            [r["id"] for r in page["data"]["results"]], list(range(240, 250))
+        )
+        self.assertEqual(page["data"]["count"], 10)
+
+    def test_expired_pages_are_ignored(self):
+        """
+        Test that expired pages are not used and are dropped from the index.
+        """
+        with patch("time.time", return_value=10**10):
+            self.assertIsNone(
+                self.index.find(
+                    self.cache, {"name_starts_with": "spi", "limit": 10, "offset": 0}
+                )
+            )
+        self.assertNotIn(generate_filter_key(self.params), self.index.windows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for the refresh planner.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from app.utils.cache import Cache
+from app.utils.refresh_planner import CallBudget, RefreshPlanner
+
+
+class TestCallBudget(unittest.TestCase):
+    """
+    Tests for the CallBudget class.
+    """
+
+    def test_minute_budget(self):
+        """
+        Test that the per-minute budget refills after the window passes.
+        """
+        budget = CallBudget(per_minute=2, per_day=100)
+        self.assertTrue(budget.consume(now=1000))
+        self.assertTrue(budget.consume(now=1010))
+        self.assertFalse(budget.consume(now=1020))
+        self.assertTrue(budget.consume(now=1061))
+
+    def test_day_budget(self):
+        """
+        Test that the per-day budget resets on a new UTC day.
+        """
+        budget = CallBudget(per_minute=100, per_day=1)
+        self.assertTrue(budget.consume(now=86400 * 10))
+        self.assertFalse(budget.consume(now=86400 * 10 + 3600))
+        self.assertTrue(budget.consume(now=86400 * 11))
+        self.assertEqual(budget.stats(now=86400 * 11)["day_used"], 1)
+
+
+class TestRefreshPlanner(unittest.TestCase):
+    """
+    Tests for the RefreshPlanner class.
+    """
+
+    def setUp(self):
+        self.cache = Cache(maxsize=10, ttl=300)
+        with patch("time.time", return_value=1000):
+            for key in ("cold", "warm", "hot"):
+                self.cache.set(key, {"key": key})
+        with patch("time.time", return_value=1100):
+            for _ in range(5):
+                self.cache.get("hot")
+            self.cache.get("warm")
+
+    def test_plan_ranks_by_access(self):
+        """
+        Test that due keys are ordered by access frequency and recency.
+        """
+        planner = RefreshPlanner(self.cache, CallBudget(), refresh_ahead=60)
+        plan = planner.plan(now=1250)
+        self.assertEqual(plan["scheduled"], ["hot", "warm", "cold"])
+        self.assertEqual(plan["deferred"], [])
+
+    def test_plan_only_due_keys(self):
+        """
+        Test that keys far from expiry are not refreshed.
+        """
+        planner = RefreshPlanner(self.cache, CallBudget(), refresh_ahead=60)
+        plan = planner.plan(now=1100)
+        self.assertEqual(plan["scheduled"], [])
+
+    def test_plan_defers_over_budget(self):
+        """
+        Test that keys over the call budget are deferred and reported.
+        """
+        planner = RefreshPlanner(self.cache, CallBudget(per_minute=1), refresh_ahead=60)
+        plan = planner.plan(now=1250)
+        self.assertEqual(plan["scheduled"], ["hot"])
+        self.assertEqual(plan["deferred"], ["warm", "cold"])
+        self.assertEqual(planner.stats()["deferred"], 2)
+        self.assertEqual(planner.stats()["last_deferred"], ["warm", "cold"])
+
+    def test_plan_skips_negative_entries(self):
+        """
+        Test that entries with their own TTL are never scheduled.
+        """
+        with patch("time.time", return_value=1240):
+            self.cache.set("missing", {"data": {"results": []}}, ttl=60)
+        planner = RefreshPlanner(self.cache, CallBudget(), refresh_ahead=60)
+        for now in (1240, 1290, 1310):
+            self.assertNotIn("missing", planner.plan(now=now)["scheduled"])
+
+    def test_plan_respects_concurrency(self):
+        """
+        Test that in-flight refreshes count against the concurrency cap.
+        """
+        self.cache.revalidating.add("hot")
+        planner = RefreshPlanner(
+            self.cache, CallBudget(), max_concurrent=2, refresh_ahead=60
+        )
+        plan = planner.plan(now=1250)
+        self.assertEqual(plan["scheduled"], ["warm"])
+        self.assertEqual(plan["deferred"], ["cold"])
+        self.assertEqual(plan["in_flight"], ["hot"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Tests for the second cache tier shared between processes.
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from app.utils.cache import Cache
+from app.utils.refresh_planner import CallBudget, RefreshPlanner
+from app.utils.shared_cache import SharedCache
+
+
+def put_entry(path: str):
+    """
+    Store an entry from another process.
+    """
+    shared = SharedCache(path, slots=64, data_size=64 * 1024)
+    shared.put("key1", {"name": "Hulk"}, "etag1", 1000.0, {"name": "hulk"})
+    shared.close()
+
+
+class TestSharedCache(unittest.TestCase):
+    """
+    Tests for the SharedCache class and its use as a Cache second tier.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.shm")
+        self.l2 = SharedCache(self.path, slots=64, data_size=64 * 1024)
+
+    def tearDown(self):
+        self.l2.close()
+        self.tmpdir.cleanup()
+
+    def test_put_get_delete(self):
+        """
+        Test writing, reading, touching and deleting entries.
+        """
+        self.l2.put("key1", {"data": [1, 2]}, "etag1", 1000.0, {"name": "hulk"})
+        self.l2.flush()
+        self.assertEqual(
+            self.l2.get("key1"), ({"data": [1, 2]}, "etag1", 1000.0, {"name": "hulk"})
+        )
+        self.l2.touch("key1", 2000.0)
+        self.l2.flush()
+        self.assertEqual(self.l2.timestamp("key1"), 2000.0)
+
+        self.l2.delete("key1")
+        self.l2.flush()
+        self.assertIsNone(self.l2.get("key1"))
+        self.assertIsNone(self.l2.timestamp("key1"))
+
+    def test_values_encoded_by_writer_thread(self):
+        """
+        Test that values are encoded off the calling thread.
+        """
+        threads = []
+        dumps = json.dumps
+
+        def record_dumps(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return dumps(*args, **kwargs)
+
+        with patch("app.utils.shared_cache.json.dumps", side_effect=record_dumps):
+            self.l2.put("key1", {"data": [1, 2]}, "etag1", 1000.0, {"name": "hulk"})
+            self.l2.flush()
+        self.assertEqual(threads, [self.l2.writer, self.l2.writer])
+        self.assertEqual(self.l2.get("key1")[0], {"data": [1, 2]})
+
+    def test_load_newest_first(self):
+        """
+        Test loading the newest entries after a minimum timestamp.
+        """
+        for i in range(4):
+            self.l2.put(f"key{i}", i, "", 1000.0 + i)
+        self.l2.flush()
+        entries = self.l2.load(2, min_timestamp=1001.0)
+        self.assertEqual(
+            [(key, value) for key, value, _, _, _ in entries],
+            [("key3", 3), ("key2", 2)],
+        )
+
+    def test_overwritten_record_is_a_miss(self):
+        """
+        Test that an entry whose record the ring buffer overwrote is not read.
+        """
+        l2 = SharedCache(
+            os.path.join(self.tmpdir.name, "small.shm"), slots=64, data_size=256
+        )
+        l2.put("key1", "a" * 100, "", 1000.0)
+        l2.put("key2", "b" * 100, "", 1001.0)
+        l2.put("key3", "c" * 100, "", 1002.0)
+        l2.flush()
+        self.assertIsNone(l2.get("key1"))
+        self.assertEqual(l2.get("key3")[0], "c" * 100)
+        l2.close()
+
+    def test_replaces_oldest_entry_when_full(self):
+        """
+        Test that the oldest entry is replaced when a key's slots are taken.
+        """
+        l2 = SharedCache(
+            os.path.join(self.tmpdir.name, "full.shm"),
+            slots=2,
+            data_size=64 * 1024,
+            probe=2,
+        )
+        l2.put("key1", 1, "", 1000.0)
+        l2.put("key2", 2, "", 1001.0)
+        l2.put("key3", 3, "", 1002.0)
+        l2.flush()
+        self.assertIsNone(l2.get("key1"))
+        self.assertEqual(l2.get("key2")[0], 2)
+        self.assertEqual(l2.get("key3")[0], 3)
+        l2.close()
+
+    def test_visible_to_other_processes(self):
+        """
+        Test that an entry stored by one process is read by another.
+        """
+        process = multiprocessing.get_context("spawn").Process(
+            target=put_entry, args=(self.path,)
+        )
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(
+            self.l2.get("key1"), ({"name": "Hulk"}, "etag1", 1000.0, {"name": "hulk"})
+        )
+
+    def test_cache_reads_entries_of_other_workers(self):
+        """
+        Test that caches sharing a tier see each other's new and updated
+        entries.
+        """
+        worker1 = Cache(maxsize=10, ttl=300, l2=self.l2)
+        worker2 = Cache(
+            maxsize=10,
+            ttl=300,
+            l2=SharedCache(self.path, slots=64, data_size=64 * 1024),
+        )
+        with patch("time.time", return_value=1000):
+            worker1.set("key1", {"name": "Hulk"}, "etag1", params={"name": "hulk"})
+            worker1.l2.flush()
+            self.assertTrue(worker2.servable("key1"))
+            self.assertEqual(worker2.get("key1"), {"name": "Hulk"})
+        with patch("time.time", return_value=1100):
+            worker1.set(
+                "key1", {"name": "She-Hulk"}, "etag2", params={"name": "she-hulk"}
+            )
+            worker1.l2.flush()
+            self.assertEqual(worker2.get("key1"), {"name": "She-Hulk"})
+            self.assertEqual(worker2.get_etag("key1"), "etag2")
+        self.assertEqual(worker2.stats()["l2_hits"], 2)
+        worker2.l2.close()
+
+    def test_sync_shared_plans_keys_of_other_workers(self):
+        """
+        Test that keys only another worker fetched are loaded by a sync and
+        planned for refresh.
+        """
+        leader = Cache(maxsize=10, ttl=300, l2=self.l2)
+        worker = Cache(
+            maxsize=10,
+            ttl=300,
+            l2=SharedCache(self.path, slots=64, data_size=64 * 1024),
+        )
+        with patch("time.time", return_value=1000):
+            leader.set("key1", {"name": "Hulk"}, params={"name": "hulk"})
+            worker.set("key2", {"name": "Thor"}, "etag2", params={"name": "thor"})
+            leader.l2.flush()
+            worker.l2.flush()
+        with patch("time.time", return_value=1100):
+            self.assertEqual(leader.sync_shared(), 1)
+            self.assertEqual(leader.sync_shared(), 0)
+        self.assertEqual(leader.get_params("key2"), {"name": "thor"})
+        self.assertEqual(leader.get_etag("key2"), "etag2")
+
+        planner = RefreshPlanner(leader, CallBudget())
+        plan = planner.plan(now=1250)
+        self.assertEqual(sorted(plan["scheduled"]), ["key1", "key2"])
+        worker.l2.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
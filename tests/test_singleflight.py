@@ -0,0 +1,121 @@
+"""
+Tests for the SingleFlight registry.
+"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+
+from app.utils.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests for the SingleFlight registry.
+    """
+
+    def setUp(self):
+        self.flight = SingleFlight()
+
+    async def test_concurrent_calls_are_coalesced(self):
+        """
+        Test that concurrent callers for the same key share one call.
+        """
+        release = asyncio.Event()
+        func = AsyncMock(return_value="value")
+
+        async def slow():
+            await release.wait()
+            return await func()
+
+        waiters = [asyncio.create_task(self.flight.do("key", slow)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        self.assertEqual(results, ["value"] * 5)
+        func.assert_awaited_once()
+        self.assertEqual(self.flight.stats()["calls"], 1)
+        self.assertEqual(self.flight.stats()["coalesced"], 4)
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    async def test_different_keys_are_not_coalesced(self):
+        """
+        Test that different keys run their own calls.
+        """
+        func = AsyncMock(return_value="value")
+
+        await asyncio.gather(self.flight.do("key1", func), self.flight.do("key2", func))
+
+        self.assertEqual(func.await_count, 2)
+        self.assertEqual(self.flight.stats()["coalesced"], 0)
+
+    async def test_error_propagates_to_every_waiter(self):
+        """
+        Test that an exception from the shared call reaches all waiters.
+        """
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise RuntimeError("upstream down")
+
+        waiters = [
+            asyncio.create_task(self.flight.do("key", failing)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(self.flight.in_flight(), 0)
+
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        """
+        Test that cancelling one waiter leaves the shared call running.
+        """
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "value"
+
+        first = asyncio.create_task(self.flight.do("key", slow))
+        second = asyncio.create_task(self.flight.do("key", slow))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await second, "value")
+        self.assertTrue(first.cancelled())
+        self.assertEqual(self.flight.stats()["cancelled"], 0)
+
+    async def test_last_waiter_cancel_cancels_call(self):
+        """
+        Test that the shared call is cancelled once every waiter is gone.
+        """
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.create_task(self.flight.do("key", slow))
+        await started.wait()
+        waiter.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        self.assertEqual(self.flight.stats()["cancelled"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
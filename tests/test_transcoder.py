@@ -0,0 +1,116 @@
+"""
+Tests for the Marvel API response transcoder.
+"""
+
+import json
+import unittest
+
+from app.grpc_services.transcoder import Transcoder, transcoder_for
+
+API_RESPONSE = {
+    "code": 200,
+    "status": "Ok",
+    "etag": "page-etag",
+    "data": {
+        "offset": 0,
+        "limit": 20,
+        "total": 1,
+        "count": 1,
+        "results": [
+            {
+                "id": 1009351,
+                "name": "Hulk",
+                "description": None,
+                "thumbnail": {"path": "http://example.com/hulk", "extension": "jpg"},
+                "comics": {
+                    "available": 2,
+                    "returned": 1,
+                    "collectionURI": "http://example.com/hulk/comics",
+                    "items": [{"resourceURI": "http://example.com/1", "name": "One"}],
+                },
+                "stories": {
+                    "items": [
+                        {
+                            "resourceURI": "http://example.com/2",
+                            "name": "Two",
+                            "type": "cover",
+                        }
+                    ]
+                },
+            }
+        ],
+    },
+}
+
+
+class TestTranscoder(unittest.TestCase):
+    """
+    Tests for the Transcoder class.
+    """
+
+    def test_response(self):
+        """
+        Test converting a full API response.
+        """
+        response = Transcoder().response(API_RESPONSE)
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.etag, "page-etag")
+        self.assertEqual(response.total, 1)
+        character = response.characters[0]
+        self.assertEqual(character.name, "Hulk")
+        self.assertEqual(character.description, "")
+        self.assertEqual(character.thumbnail.extension, "jpg")
+        self.assertEqual(character.comics.available, 2)
+        self.assertEqual(character.comics.comics[0].name, "One")
+        self.assertEqual(character.stories.stories[0].type, "cover")
+        self.assertTrue(character.HasField("series"))
+
+    def test_response_from_bytes(self):
+        """
+        Test converting a raw response body.
+        """
+        content = json.dumps(API_RESPONSE).encode()
+        self.assertEqual(
+            Transcoder().response_from_bytes(content),
+            Transcoder().response(API_RESPONSE),
+        )
+
+    def test_field_mask(self):
+        """
+        Test that only the masked fields are filled in.
+        """
+        character = Transcoder(frozenset({"id", "comics"})).character(
+            API_RESPONSE["data"]["results"][0]
+        )
+        self.assertEqual(character.id, 1009351)
+        self.assertEqual(character.name, "")
+        self.assertFalse(character.HasField("thumbnail"))
+        self.assertFalse(character.HasField("stories"))
+        self.assertEqual(len(character.comics.comics), 1)
+
+    def test_unknown_item_fields(self):
+        """
+        Test that items with fields the messages lack are still converted.
+        """
+        result = {
+            "id": 1,
+            "comics": {"items": [{"resourceURI": "uri", "name": "One", "new": 1}]},
+        }
+        api_response = {"data": {"results": [result]}}
+        response = Transcoder().response(api_response)
+        self.assertEqual(response.characters[0].comics.comics[0].name, "One")
+        character = Transcoder().character(result)
+        self.assertEqual(character.comics.comics[0].resourceURI, "uri")
+
+    def test_transcoder_for(self):
+        """
+        Test that transcoders are resolved once per field mask.
+        """
+        self.assertIs(transcoder_for(None), transcoder_for(None))
+        self.assertIs(
+            transcoder_for(frozenset({"id"})), transcoder_for(frozenset({"id"}))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()